@@ -1,11 +1,23 @@
 import os
 import time
-from flask import Flask, request, jsonify, render_template_string, send_from_directory, url_for
+from flask import Flask, Response, request, jsonify, render_template_string, send_file, stream_with_context
+from werkzeug.security import safe_join
 from werkzeug.utils import secure_filename
-import threading, uuid, subprocess, shutil
+import threading, uuid, queue, json, hashlib
+from collections import OrderedDict
 
 # Reuse existing clone function
-from clone_voice import clone_voice as do_clone, warm_model, is_model_loaded
+from clone_voice import clone_voice as do_clone, stream_voice, warm_model, is_model_loaded, model_replicas, synthesis_params
+from clone_voice import batch_stats, latent_cache_stats, worker_pool_stats, prepare_voice
+from clone_voice import REFERENCE_MAX_SECONDS, REFERENCE_PREPROCESS, REFERENCE_SAMPLE_RATE, VOICES_DIR
+from scheduler import PRIORITIES, JobScheduler, QueueFull
+from output_cache import OutputCache
+from reference_store import STORAGE_CLASS as UPLOAD_STORAGE_CLASS, ReferenceStore
+from storage import StorageManager
+from voices import VoiceRegistry
+from job_store import apply_step, create_job_store
+from audio_io import OUTPUT_FORMATS, AudioDecodeError, encode_audio, to_pcm16, wav_stream_header
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
 
 app = Flask(__name__)
 
@@ -25,27 +37,9 @@ ALLOWED_EXTENSIONS = {"wav", "mp3", "m4a", "flac", "ogg", "opus", "webm"}
 def allowed_file(filename: str) -> bool:
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
-# Audio conversion helpers
-_CONVERT_TO_WAV_EXTS = {"webm", "mp4", "m4a"}
-
-def _ffmpeg_path() -> str | None:
-    return shutil.which("ffmpeg")
-
-def _should_convert_to_wav(path: str) -> bool:
-    ext = os.path.splitext(path)[1].lower().lstrip(".")
-    return ext in _CONVERT_TO_WAV_EXTS
-
-def _convert_to_wav(input_path: str) -> str:
-    ffmpeg = _ffmpeg_path()
-    if not ffmpeg:
-        raise RuntimeError("ffmpeg not found on PATH. Install ffmpeg or upload WAV/OGG/OPUS/MP3/M4A.")
-    output_path = input_path + ".wav"
-    cmd = [ffmpeg, "-y", "-i", input_path, "-ac", "1", "-ar", "22050", "-vn", output_path]
-    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    if proc.returncode != 0:
-        tail = (proc.stderr or "").splitlines()[-10:]
-        raise RuntimeError("Audio conversion failed. " + "\n".join(tail))
-    return output_path
+# Reference uploads (including WEBM/M4A recordings) are decoded in-process by
+# audio_io.load_reference when conditioning is computed; ffmpeg is only used as
+# a decoder of last resort, over a pipe.
 
 
 INDEX_HTML = r'''
@@ -427,14 +421,16 @@ INDEX_HTML = r'''
     const stepsRoot = document.getElementById('steps');
     const progressError = document.getElementById('progressError');
 
-    // Single polling loop guards
+    // Single progress watcher guards (SSE stream, or polling loop as fallback)
     let pollHandle = null;
     let pollJobId = null;
     let pollController = null;
+    let eventSource = null;
 
     function stopPolling() {
       if (pollHandle) { clearTimeout(pollHandle); pollHandle = null; }
       if (pollController) { try { pollController.abort(); } catch (_) {} pollController = null; }
+      if (eventSource) { eventSource.close(); eventSource = null; }
       pollJobId = null;
     }
 
@@ -487,6 +483,39 @@ INDEX_HTML = r'''
       message.innerHTML = `<div class="error">${msg}</div>`;
     }
 
+    // Play the smallest format this browser supports (encoded once on the server)
+    const playbackFormat = audioPlayer.canPlayType('audio/ogg; codecs="opus"') ? 'opus'
+      : (audioPlayer.canPlayType('audio/flac') ? 'flac' : 'wav');
+    function playbackUrl(url) { return playbackFormat === 'wav' ? url : `${url}?format=${playbackFormat}`; }
+
+    // Apply a status payload; returns true once the job has finished
+    function applyStatus(json) {
+      const steps = json.steps || [];
+      steps.forEach((st, i) => { setStepState(i, st.status); setStepSub(i, st.sub); });
+
+      if (json.status === 'done') {
+        if (json.audio_url) { audioPlayer.src = playbackUrl(json.audio_url); audioPlayer.load(); }
+        progressClose.style.display = 'inline-flex';
+        setTimeout(() => {
+          closeProgress();
+          resultBox.style.display = 'block';
+          audioPlayer.play().catch(()=>{});
+        }, 350);
+        stopPolling();
+        return true;
+      }
+      if (json.status === 'error') {
+        progressError.style.display = 'block';
+        progressError.textContent = json.error || 'Unexpected error';
+        progressClose.style.display = 'inline-flex';
+        progressClose.onclick = closeProgress;
+        showError(progressError.textContent);
+        stopPolling();
+        return true;
+      }
+      return false;
+    }
+
     function schedulePoll(jobId) {
       // Ensure only one polling loop per job
       if (pollJobId !== jobId) return;
@@ -495,26 +524,7 @@ INDEX_HTML = r'''
         .then(res => res.json().then(json => ({ ok: res.ok, json })))
         .then(({ ok, json }) => {
           if (!ok || !json.success) throw new Error(json.error || 'Failed to get status');
-          const steps = json.steps || [];
-          steps.forEach((st, i) => { setStepState(i, st.status); setStepSub(i, st.sub); });
-
-          if (json.status === 'done') {
-            if (json.audio_url) { audioPlayer.src = json.audio_url; audioPlayer.load(); }
-            progressClose.style.display = 'inline-flex';
-            setTimeout(() => {
-              closeProgress();
-              resultBox.style.display = 'block';
-              audioPlayer.play().catch(()=>{});
-            }, 350);
-            stopPolling();
-          } else if (json.status === 'error') {
-            progressError.style.display = 'block';
-            progressError.textContent = json.error || 'Unexpected error';
-            progressClose.style.display = 'inline-flex';
-            progressClose.onclick = closeProgress;
-            showError(progressError.textContent);
-            stopPolling();
-          } else {
+          if (!applyStatus(json)) {
             // Schedule next poll after current completes
             pollHandle = setTimeout(() => schedulePoll(jobId), 1200);
           }
@@ -529,6 +539,20 @@ INDEX_HTML = r'''
         });
     }
 
+    function watchJob(jobId) {
+      // Prefer pushed updates; fall back to polling if SSE is unavailable or drops
+      if (!window.EventSource) { schedulePoll(jobId); return; }
+      eventSource = new EventSource(`/api/clone_events/${jobId}`);
+      eventSource.onmessage = (ev) => {
+        if (pollJobId !== jobId) return;
+        try { applyStatus(JSON.parse(ev.data)); } catch (_) {}
+      };
+      eventSource.onerror = () => {
+        if (eventSource) { eventSource.close(); eventSource = null; }
+        if (pollJobId === jobId) schedulePoll(jobId);
+      };
+    }
+
     async function runClone(data) {
       resultBox.style.display = 'none';
       openProgress();
@@ -543,7 +567,7 @@ INDEX_HTML = r'''
         }
         const jobId = startJson.job_id;
         pollJobId = jobId;
-        schedulePoll(jobId); // start immediate poll cycle
+        watchJob(jobId); // stream progress (polls if SSE is unavailable)
       } catch (err) {
         progressError.style.display = 'block';
         progressError.textContent = (err && err.message) ? err.message : 'Unexpected error';
@@ -856,8 +880,8 @@ RECORD_HTML = r'''
     const stepsRoot = document.getElementById('steps');
     const progressError = document.getElementById('progressError');
 
-    let pollHandle = null; let pollJobId = null; let pollController = null;
-    function stopPolling(){ if (pollHandle){ clearTimeout(pollHandle); pollHandle=null; } if (pollController){ try{pollController.abort();}catch(_){} pollController=null; } pollJobId=null; }
+    let pollHandle = null; let pollJobId = null; let pollController = null; let eventSource = null;
+    function stopPolling(){ if (pollHandle){ clearTimeout(pollHandle); pollHandle=null; } if (pollController){ try{pollController.abort();}catch(_){} pollController=null; } if (eventSource){ eventSource.close(); eventSource=null; } pollJobId=null; }
 
     function openConfirm(onProceed){
       confirmOverlay.classList.add('active');
@@ -873,6 +897,24 @@ RECORD_HTML = r'''
     function closeProgress(){ progressOverlay.classList.remove('active'); submitBtn.disabled=false; stopPolling(); }
     function showError(msg){ message.innerHTML = `<div class="error">${msg}</div>`; }
 
+    const playbackFormat = audioPlayer.canPlayType('audio/ogg; codecs="opus"') ? 'opus' : (audioPlayer.canPlayType('audio/flac') ? 'flac' : 'wav');
+    function playbackUrl(url){ return playbackFormat === 'wav' ? url : `${url}?format=${playbackFormat}`; }
+
+    function applyStatus(json){
+      const steps = json.steps || [];
+      steps.forEach((st,i)=>{ setStepState(i, st.status); setStepSub(i, st.sub); });
+      if (json.status === 'done'){
+        if (json.audio_url){ audioPlayer.src = playbackUrl(json.audio_url); audioPlayer.load(); }
+        progressClose.style.display = 'inline-flex';
+        setTimeout(()=>{ closeProgress(); resultBox.style.display='block'; audioPlayer.play().catch(()=>{}); }, 350);
+        stopPolling(); return true;
+      }
+      if (json.status === 'error'){
+        progressError.style.display='block'; progressError.textContent = json.error || 'Unexpected error'; progressClose.style.display='inline-flex'; progressClose.onclick = closeProgress; showError(progressError.textContent); stopPolling(); return true;
+      }
+      return false;
+    }
+
     function schedulePoll(jobId){
       if (pollJobId !== jobId) return;
       pollController = new AbortController();
@@ -880,22 +922,18 @@ RECORD_HTML = r'''
       .then(res => res.json().then(json => ({ ok: res.ok, json })))
       .then(({ ok, json }) => {
         if (!ok || !json.success) throw new Error(json.error || 'Failed to get status');
-        const steps = json.steps || [];
-        steps.forEach((st,i)=>{ setStepState(i, st.status); setStepSub(i, st.sub); });
-        if (json.status === 'done'){
-          if (json.audio_url){ audioPlayer.src = json.audio_url; audioPlayer.load(); }
-          progressClose.style.display = 'inline-flex';
-          setTimeout(()=>{ closeProgress(); resultBox.style.display='block'; audioPlayer.play().catch(()=>{}); }, 350);
-          stopPolling();
-        } else if (json.status === 'error'){
-          progressError.style.display='block'; progressError.textContent = json.error || 'Unexpected error'; progressClose.style.display='inline-flex'; progressClose.onclick = closeProgress; showError(progressError.textContent); stopPolling();
-        } else {
-          pollHandle = setTimeout(()=>schedulePoll(jobId), 1200);
-        }
+        if (!applyStatus(json)) pollHandle = setTimeout(()=>schedulePoll(jobId), 1200);
       })
       .catch(e=>{ progressError.style.display='block'; progressError.textContent = (e&&e.message)?e.message:'Unexpected error'; progressClose.style.display='inline-flex'; progressClose.onclick=closeProgress; showError(progressError.textContent); stopPolling(); });
     }
 
+    function watchJob(jobId){
+      if (!window.EventSource){ schedulePoll(jobId); return; }
+      eventSource = new EventSource(`/api/clone_events/${jobId}`);
+      eventSource.onmessage = (ev)=>{ if (pollJobId !== jobId) return; try { applyStatus(JSON.parse(ev.data)); } catch(_){} };
+      eventSource.onerror = ()=>{ if (eventSource){ eventSource.close(); eventSource=null; } if (pollJobId === jobId) schedulePoll(jobId); };
+    }
+
     async function runClone(){
       resultBox.style.display='none';
       if (!recordedBlob){ showError('Please record your voice before cloning.'); return; }
@@ -910,7 +948,7 @@ RECORD_HTML = r'''
         const startRes = await fetch('/api/clone_start', { method:'POST', body: fd });
         const startJson = await startRes.json();
         if (!startRes.ok || !startJson.success){ throw new Error(startJson.error || 'Failed to start job'); }
-        const jobId = startJson.job_id; pollJobId = jobId; schedulePoll(jobId);
+        const jobId = startJson.job_id; pollJobId = jobId; watchJob(jobId);
       } catch (err){ progressError.style.display='block'; progressError.textContent=(err&&err.message)?err.message:'Unexpected error'; progressClose.style.display='inline-flex'; progressClose.onclick=closeProgress; showError(progressError.textContent); stopPolling(); }
     }
 
@@ -929,14 +967,110 @@ def index():
     return render_template_string(INDEX_HTML)
 
 
+# Output delivery: outputs never change once written, so responses are cacheable
+# as immutable with a content-hash ETag. FLAC/Opus variants are encoded on first
+# request and stored next to the WAV.
+OUTPUT_MAX_AGE = 365 * 24 * 3600
+_ACCEPT_FORMATS = {"audio/wav": "wav", "audio/flac": "flac", "audio/ogg": "opus"}
+_ETAGS: "OrderedDict[tuple, str]" = OrderedDict()  # (path, mtime_ns, size) -> sha256
+_ETAGS_MAX = 4096
+_ETAGS_LOCK = threading.Lock()
+_ENCODE_LOCKS: dict[str, threading.Lock] = {}
+_ENCODE_LOCKS_LOCK = threading.Lock()
+
+
+def _negotiate_format(fmt: str | None, accept) -> str | None:
+    """Requested output format: ?format= first, then the Accept header (a werkzeug MIMEAccept; WAV by default)."""
+    fmt = (fmt or "").strip().lower()
+    if fmt:
+        return fmt if fmt in OUTPUT_FORMATS else None
+    return _ACCEPT_FORMATS[accept.best_match(list(_ACCEPT_FORMATS), default="audio/wav")]
+
+
+def _content_etag(path: str) -> str:
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    with _ETAGS_LOCK:
+        etag = _ETAGS.get(key)
+        if etag is not None:
+            _ETAGS.move_to_end(key)
+            return etag
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    etag = h.hexdigest()
+    with _ETAGS_LOCK:
+        _ETAGS[key] = etag
+        while len(_ETAGS) > _ETAGS_MAX:
+            _ETAGS.popitem(last=False)
+    return etag
+
+
+def _encoded_variant(wav_path: str, fmt: str) -> str:
+    """Path of `wav_path` encoded as `fmt`, encoding it once if needed."""
+    dest = os.path.splitext(wav_path)[0] + OUTPUT_FORMATS[fmt][1]
+    if os.path.isfile(dest):
+        return dest
+    with _ENCODE_LOCKS_LOCK:
+        lock = _ENCODE_LOCKS.setdefault(dest, threading.Lock())
+    try:
+        with lock:
+            if not os.path.isfile(dest):
+                started = time.perf_counter()
+                encode_audio(wav_path, dest, fmt)
+                if os.path.dirname(os.path.abspath(dest)) == os.path.abspath(OUTPUT_CACHE_DIR):
+                    # Copies of cached outputs belong to the output cache, which evicts them with their WAV
+                    OUTPUT_CACHE.add_variant(dest)
+                else:
+                    STORAGE.add(dest, "outputs")
+                print(f"[INFO] Encoded {os.path.basename(dest)} in {(time.perf_counter() - started) * 1000:.0f} ms", flush=True)
+    finally:
+        with _ENCODE_LOCKS_LOCK:
+            _ENCODE_LOCKS.pop(dest, None)
+    return dest
+
+
+def _resolve_output(filename: str, fmt: str):
+    """(path, mimetype, etag, cache_control) of an output in the requested format, or None if it does not exist."""
+    path = safe_join(OUTPUT_DIR, filename)
+    if path is None or not os.path.isfile(path):
+        return None
+    cache_control = f"public, max-age={OUTPUT_MAX_AGE}, immutable"
+    mimetype = None
+    if path.endswith(".wav"):
+        mimetype = OUTPUT_FORMATS["wav"][0]
+        if fmt != "wav":
+            try:
+                path = _encoded_variant(path, fmt)
+                mimetype = OUTPUT_FORMATS[fmt][0]
+            except Exception as e:
+                # Still playable: fall back to the WAV rather than failing the request,
+                # but never let clients cache it under the URL of the requested format
+                print(f"[WARN] Could not encode {filename} as {fmt}: {e}", flush=True)
+                cache_control = "no-store"
+    STORAGE.touch(path)
+    return path, mimetype, _content_etag(path), cache_control
+
+
 @app.route("/outputs/<path:filename>")
 def serve_output(filename: str):
-    return send_from_directory(OUTPUT_DIR, filename, as_attachment=False)
+    """Serve an output as WAV, FLAC or Opus, with Range support and immutable caching."""
+    fmt = _negotiate_format(request.args.get("format"), request.accept_mimetypes)
+    if fmt is None:
+        return jsonify({"success": False, "error": "Unsupported format. Use wav, flac or opus."}), 400
+    resolved = _resolve_output(filename, fmt)
+    if resolved is None:
+        return jsonify({"success": False, "error": "Not found"}), 404
+    path, mimetype, etag, cache_control = resolved
+    # Range, If-Range and If-None-Match are handled by send_file(conditional=True)
+    resp = send_file(path, mimetype=mimetype, conditional=True, etag=etag, max_age=OUTPUT_MAX_AGE)
+    resp.headers["Cache-Control"] = cache_control
+    if "format" not in request.args:
+        resp.vary.add("Accept")
+    return resp
 
 # ---------------- Progress tracking and async job execution ---------------- #
-JOBS = {}
-JOBS_LOCK = threading.Lock()
-
 STEPS_TEMPLATE = [
     {"label": "Preparing", "sub": "Validating inputs", "status": "pending"},
     {"label": "Uploading reference", "sub": "Saving audio", "status": "pending"},
@@ -950,83 +1084,311 @@ STEPS_TEMPLATE = [
 def _new_job() -> dict:
     return {
         "status": "pending",
-        "steps": [dict(label=s["label"], sub=s["sub"], status="pending") for s in STEPS_TEMPLATE],
+        "steps": [
+            dict(label=s["label"], sub=s["sub"], status="pending", started=None, ended=None, duration=None)
+            for s in STEPS_TEMPLATE
+        ],
         "error": None,
         "audio_url": None,
         "created": time.time(),
+        "version": 0,
     }
 
-# Cleanup policy for job registry
+# Cleanup policy for job registry (enforced by a background reaper thread)
 JOB_TTL_SECONDS = 3600  # 1 hour
 MAX_JOBS = 500
+JOB_REAP_INTERVAL_SECONDS = 30
 
+# Job store backend: "memory" (default, single process) or "sqlite" so several
+# web worker processes share job state and survive restarts.
+JOB_STORE_BACKEND = os.environ.get("VC_JOB_STORE", "memory")
+JOB_STORE_PATH = os.environ.get("VC_JOB_DB") or os.path.join(BASE_DIR, "jobs.sqlite3")
 
-def _cleanup_jobs() -> None:
-    now = time.time()
-    with JOBS_LOCK:
-        # Remove jobs older than TTL
-        to_delete = [jid for jid, job in JOBS.items() if now - job.get("created", now) > JOB_TTL_SECONDS]
-        # If too many jobs, remove oldest finished (done/error)
-        if len(JOBS) > MAX_JOBS:
-            finished = [jid for jid, job in JOBS.items() if job.get("status") in ("done", "error")]
-            finished.sort(key=lambda j: JOBS[j].get("created", 0))
-            overflow = max(0, len(JOBS) - MAX_JOBS)
-            to_delete.extend(finished[:overflow])
-        for jid in set(to_delete):
-            JOBS.pop(jid, None)
-
-
-def _set_step(job_id: str, idx: int, status: str, sub: str | None = None) -> None:
-    with JOBS_LOCK:
-        job = JOBS.get(job_id)
-        if not job:
-            return
-        st = job["steps"][idx]
-        st["status"] = status
-        if sub is not None:
-            st["sub"] = sub
+JOBS = create_job_store(JOB_STORE_BACKEND, JOB_TTL_SECONDS, MAX_JOBS, JOB_REAP_INTERVAL_SECONDS, JOB_STORE_PATH)
+JOBS.start_reaper()
+
+# Push notifications for job progress (SSE)
+SSE_KEEPALIVE_SECONDS = 15
+SSE_MAX_SECONDS = 600
+
+
+def _job_payload(job: dict) -> dict:
+    return {
+        "success": True,
+        "status": job["status"],
+        "steps": job["steps"],
+        "error": job["error"],
+        "audio_url": job["audio_url"],
+    }
+
+
+# Per-step durations; the store stamps steps and returns the duration when one ends
+STEP_SECONDS = REGISTRY.histogram("vc_job_step_seconds", "Duration of each job step.", labels=("step",))
+
+
+def _observe_step(idx: int, duration: float | None) -> None:
+    if duration is not None:
+        STEP_SECONDS.observe(duration, step=STEPS_TEMPLATE[idx]["label"])
+
+
+def _set_step(job_id: str, idx: int, status: str, sub: str | None = None, stages: dict | None = None) -> None:
+    _observe_step(idx, JOBS.set_step(job_id, idx, status, sub, stages))
+
+
+def _stamp_request_steps(job: dict, received: float, prepared: float, uploaded: float) -> None:
+    """Record steps 0-1, which run inside the start request: validation, then saving the upload."""
+    job["steps"][0]["started"] = received
+    _observe_step(0, apply_step(job["steps"][0], "done", now=prepared))
+    job["steps"][1]["started"] = prepared
+    _observe_step(1, apply_step(job["steps"][1], "done", now=uploaded))
+
+
+def _log_job_timing(job_id: str, *, language: str, text: str) -> None:
+    """Write one structured log line with the step and synthesis stage timings of a finished job."""
+    job = JOBS.get(job_id)
+    if not job:
+        return
+    steps = job["steps"]
+    started = [st["started"] for st in steps if st.get("started") is not None]
+    ended = [st["ended"] for st in steps if st.get("ended") is not None]
+    record = {
+        "job_id": job_id,
+        "status": job["status"],
+        "language": language,
+        "text_chars": len(text),
+        "total_s": round(max(ended) - min(started), 4) if started and ended else None,
+        "steps": {st["label"]: st.get("duration") for st in steps},
+        "synthesis": steps[4].get("stages"),
+    }
+    print(f"[INFO] job_timing {json.dumps(record, sort_keys=True)}", flush=True)
 
 
 def _set_job_status(job_id: str, status: str) -> None:
-    with JOBS_LOCK:
-        job = JOBS.get(job_id)
-        if job:
-            job["status"] = status
+    JOBS.set_status(job_id, status)
 
 
 def _set_job_error(job_id: str, msg: str) -> None:
-    with JOBS_LOCK:
-        job = JOBS.get(job_id)
-        if job:
-            job["status"] = "error"
-            job["error"] = msg
+    JOBS.set_error(job_id, msg)
 
 
 def _set_job_audio(job_id: str, audio_url: str) -> None:
-    with JOBS_LOCK:
-        job = JOBS.get(job_id)
-        if job:
-            job["audio_url"] = audio_url
+    JOBS.set_audio(job_id, audio_url)
 
 
-def _run_job(job_id: str, *, text: str, language: str, device: str | None, input_path: str, output_name: str, output_path: str) -> None:
-    current_step = -1
+# Inference scheduling: a fixed worker pool (one worker per model replica unless
+# overridden) in front of a bounded queue. Full queue => 429 with Retry-After.
+# Interactive requests run before batch ones, clients (API key, else address) share
+# the model fairly, and each client's shortest texts run first.
+INFERENCE_WORKERS = int(os.environ.get("VC_INFERENCE_WORKERS", "0")) or model_replicas()
+MAX_QUEUE_DEPTH = int(os.environ.get("VC_MAX_QUEUE_DEPTH", "32"))
+MAX_QUEUE_PER_CLIENT = int(os.environ.get("VC_MAX_QUEUE_PER_CLIENT", "0")) or max(1, MAX_QUEUE_DEPTH // 2)
+BATCH_MAX_WAIT_SECONDS = float(os.environ.get("VC_BATCH_MAX_WAIT_SECONDS", "120"))
+# Scheduling cost of a voice registration (decode + conditioning), in characters of text
+VOICE_REGISTRATION_COST = 200
+
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "vc_queue_wait_seconds",
+    "Time jobs waited for an inference worker, by priority class.",
+    labels=("priority",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+
+
+# Async jobs waiting in the scheduler queue. Other tasks (synchronous clones, streams,
+# voice registrations) have no job record, so their positions are not stored.
+_QUEUED_JOBS: set[str] = set()
+
+
+def _on_queue_position(job_id: str, position: int) -> None:
+    if job_id in _QUEUED_JOBS:
+        _set_step(job_id, 2, "active", sub=f"Position {position} in queue")
+
+
+def _on_dispatch(job_id: str, priority: str, wait_seconds: float) -> None:
+    QUEUE_WAIT_SECONDS.observe(wait_seconds, priority=priority)
+
+
+SCHEDULER = JobScheduler(
+    INFERENCE_WORKERS,
+    MAX_QUEUE_DEPTH,
+    on_position=_on_queue_position,
+    max_per_client=MAX_QUEUE_PER_CLIENT,
+    batch_max_wait=BATCH_MAX_WAIT_SECONDS,
+    on_dispatch=_on_dispatch,
+)
+
+
+def _client_key(api_key: str | None, address: str | None) -> str:
+    """Fair-share identity of a request: its API key (hashed, never stored), else its address."""
+    if api_key:
+        return "key:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    return f"addr:{address or 'unknown'}"
+
+
+def _request_client() -> str:
+    return _client_key(request.headers.get("X-API-Key"), request.remote_addr)
+
+
+def _priority(value: str | None) -> str | None:
+    """Requested priority class (interactive by default), or None if unknown."""
+    value = (value or PRIORITIES[0]).strip().lower()
+    return value if value in PRIORITIES else None
+
+
+def _bad_priority():
+    return {"success": False, "error": f"Unsupported priority. Use {' or '.join(PRIORITIES)}."}, 400
+
+# Scrape-time gauges read counters that are maintained on the write path
+REGISTRY.gauge("vc_jobs", "Jobs in the registry by status.", lambda: JOBS.status_counts(), labels=("status",))
+REGISTRY.gauge("vc_queue_depth", "Jobs waiting for an inference worker.", lambda: SCHEDULER.depth()[0])
+REGISTRY.gauge("vc_queue_running", "Jobs currently running on an inference worker.", lambda: SCHEDULER.depth()[1])
+REGISTRY.gauge("vc_queue_capacity", "Maximum number of waiting jobs.", lambda: SCHEDULER.max_queue)
+REGISTRY.gauge("vc_queue_waiting", "Jobs waiting for an inference worker, by priority class.", lambda: SCHEDULER.waiting_by_priority(), labels=("priority",))
+REGISTRY.gauge("vc_model_loaded", "1 once the model is loaded in this process.", lambda: int(is_model_loaded()))
+JOBS_SUBMITTED = REGISTRY.counter("vc_jobs_submitted_total", "Clone jobs accepted, by result source.", labels=("source",))
+JOBS_REJECTED = REGISTRY.counter("vc_jobs_rejected_total", "Clone requests rejected because the queue was full.")
+
+
+# Output cache: repeated (text, language, voice) requests are served from disk.
+# Entries live under outputs/cache so /outputs serves them directly.
+OUTPUT_CACHE_DIR = os.path.join(OUTPUT_DIR, "cache")
+OUTPUT_CACHE_MAX_BYTES = int(float(os.environ.get("VC_OUTPUT_CACHE_MB", "1024")) * 1024 * 1024)
+OUTPUT_CACHE = OutputCache(OUTPUT_CACHE_DIR, OUTPUT_CACHE_MAX_BYTES)
+
+
+# Storage manager: uploads/ and outputs/ (but not outputs/cache, which the output
+# cache bounds itself) share a byte quota, and each expires files idle longer than
+# its TTL (0 = never). Files used by queued or running requests are held, never deleted.
+# Reference uploads are stored once per distinct file content.
+STORAGE_MAX_BYTES = int(float(os.environ.get("VC_STORAGE_MAX_GB", "10")) * 1024 ** 3)
+UPLOAD_TTL_SECONDS = float(os.environ.get("VC_UPLOAD_TTL_HOURS", "24")) * 3600
+OUTPUT_TTL_SECONDS = float(os.environ.get("VC_OUTPUT_TTL_HOURS", "24")) * 3600
+STORAGE = StorageManager(STORAGE_MAX_BYTES)
+REFERENCES = ReferenceStore(UPLOAD_DIR, STORAGE)
+STORAGE.add_class(UPLOAD_STORAGE_CLASS, UPLOAD_DIR, UPLOAD_TTL_SECONDS, on_evict=REFERENCES.forget)
+STORAGE.add_class("outputs", OUTPUT_DIR, OUTPUT_TTL_SECONDS)
+STORAGE.start()
+REGISTRY.gauge("vc_storage_files", "Files tracked by the storage manager.", lambda: {k: v[0] for k, v in STORAGE.usage().items()}, labels=("class",))
+REGISTRY.gauge("vc_storage_bytes", "Bytes tracked by the storage manager.", lambda: {k: v[1] for k, v in STORAGE.usage().items()}, labels=("class",))
+
+
+# Voice registry: references registered once via /api/voices and named by voice_id in
+# clone requests. Stored preprocessed next to their conditioning latents, outside the
+# storage quota (voices are kept until deleted).
+VOICES = VoiceRegistry(VOICES_DIR, REFERENCE_SAMPLE_RATE, REFERENCE_MAX_SECONDS if REFERENCE_PREPROCESS else None)
+
+
+def _release_files(paths) -> None:
+    for path in paths:
+        if VOICES.owns(path):
+            VOICES.release(path)
+        else:
+            STORAGE.release(path)
+
+
+def _resolve_reference(voice_id: str | None, filename: str | None, stream):
+    """Reference clip of a clone request: a registered voice, else the uploaded file.
+
+    Returns (reference_hash, path, None) with the clip held until _release_files(),
+    or (None, None, (error_payload, status)). Shared by the Flask and ASGI apps.
+    """
+    voice_id = (voice_id or "").strip()
+    if voice_id:
+        voice = VOICES.hold(voice_id)
+        if voice is None:
+            return None, None, ({"success": False, "error": "Unknown voice_id."}, 404)
+        return voice[0], voice[1], None
+    if not filename:
+        return None, None, ({"success": False, "error": "Reference audio file or voice_id is required."}, 400)
+    if not allowed_file(filename):
+        return None, None, ({"success": False, "error": "Unsupported file type. Use wav, mp3, m4a, flac, ogg, or opus."}, 400)
+    reference_hash, path = REFERENCES.save(stream, secure_filename(filename))
+    return reference_hash, path, None
+
+
+def _request_reference():
+    file = request.files.get("reference")
+    return _resolve_reference(request.form.get("voice_id"), file.filename if file else None, file.stream if file else None)
+
+
+def _output_cache_key(text: str, language: str, reference_hash: str) -> str | None:
+    if not OUTPUT_CACHE.enabled:
+        return None
+    return OutputCache.make_key(text, language, reference_hash, synthesis_params())
+
+
+def _cached_output_url(cache_key: str | None) -> str | None:
+    if cache_key and OUTPUT_CACHE.get(cache_key):
+        return f"/outputs/cache/{OUTPUT_CACHE.filename(cache_key)}"
+    return None
+
+
+def _busy(retry_after: int) -> tuple[dict, int]:
+    JOBS_REJECTED.inc()
+    return {"success": False, "error": "Server is busy. Please retry shortly.", "retry_after": retry_after}, 429
+
+
+def _json_response(payload: dict, status: int = 200):
+    resp = jsonify(payload)
+    resp.status_code = status
+    if status in (429, 503):
+        resp.headers["Retry-After"] = str(payload["retry_after"])
+    return resp
+
+
+def _busy_response(retry_after: int):
+    return _json_response(*_busy(retry_after))
+
+
+# Startup warm-up: torch/TTS are imported lazily, so the app boots quickly and the
+# model is loaded by a background thread. /readyz turns ready once it is in memory.
+WARMUP_ON_START = os.environ.get("VC_WARMUP", "1").strip().lower() not in ("", "0", "false", "no")
+WARMUP = {"status": "idle", "error": None, "seconds": None}
+
+
+def _warm_up() -> None:
+    WARMUP["status"] = "loading"
+    started = time.perf_counter()
     try:
-        _set_job_status(job_id, "running")
-        # Step 0: Preparing
-        current_step = 0
-        _set_step(job_id, 0, "active")
-        _set_step(job_id, 0, "done")
+        warm_model()
+    except Exception as e:
+        WARMUP.update(status="error", error=str(e))
+        print(f"[WARN] Background warm-up failed: {e}", flush=True)
+        return
+    WARMUP.update(status="ready", seconds=round(time.perf_counter() - started, 2))
+    print(f"[INFO] Background warm-up finished in {WARMUP['seconds']} s", flush=True)
+
+
+if WARMUP_ON_START:
+    threading.Thread(target=_warm_up, name="model-warmup", daemon=True).start()
+
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return jsonify({"status": "ok"})
+
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    """Readiness: 200 only once the model is loaded, 503 while the worker is cold."""
+    ready = is_model_loaded()
+    resp = jsonify({"ready": ready, "warmup": WARMUP["status"], "error": WARMUP["error"]})
+    resp.status_code = 200 if ready else 503
+    if not ready:
+        resp.headers["Retry-After"] = "5"
+    return resp
 
-        # Step 1: Uploading reference (already saved by start endpoint)
-        current_step = 1
-        _set_step(job_id, 1, "active")
-        _set_step(job_id, 1, "done")
 
-        # Step 2: Waiting for server (queue)
+def _run_job(job_id: str, *, text: str, language: str, device: str | None, input_path: str, output_name: str, output_path: str, cache_key: str | None = None, held: tuple = ()) -> None:
+    current_step = -1
+    _QUEUED_JOBS.discard(job_id)
+    try:
+        _set_job_status(job_id, "running")
+        # Steps 0-1 (preparing, upload) are completed by the start endpoint.
+        # Step 2: Waiting for server (queue) ends when a worker picks the job up
         current_step = 2
-        _set_step(job_id, 2, "active")
-        _set_step(job_id, 2, "done")
+        _set_step(job_id, 2, "done", sub="Worker assigned")
 
         # Step 3: Loading model
         current_step = 3
@@ -1037,19 +1399,15 @@ def _run_job(job_id: str, *, text: str, language: str, device: str | None, input
         else:
             _set_step(job_id, 3, "done", sub="Model already in memory")
 
-        # Step 4: Generating audio
+        # Step 4: Generating audio (timed per synthesis stage)
         current_step = 4
         _set_step(job_id, 4, "active", sub="Synthesizing speech")
-        ref_path = input_path
-        if _should_convert_to_wav(input_path):
-            if _ffmpeg_path():
-                _set_step(job_id, 4, "active", sub="Converting reference audio")
-                ref_path = _convert_to_wav(input_path)
-                _set_step(job_id, 4, "active", sub="Synthesizing speech")
-            else:
-                raise RuntimeError("Reference format not supported by backend. Please install ffmpeg or upload WAV/OGG/OPUS/MP3/M4A.")
-        do_clone(text=text, speaker_wav=ref_path, language=language, output=output_path, device=device)
-        _set_step(job_id, 4, "done")
+        timings: dict = {}
+        do_clone(text=text, speaker_wav=input_path, language=language, output=output_path, device=device, timings=timings)
+        STORAGE.add(output_path, "outputs")
+        if cache_key:
+            OUTPUT_CACHE.put(cache_key, output_path)
+        _set_step(job_id, 4, "done", stages={k: round(v, 4) for k, v in timings.items()})
 
         # Step 5: Finalizing
         current_step = 5
@@ -1063,104 +1421,455 @@ def _run_job(job_id: str, *, text: str, language: str, device: str | None, input
         failed_step = current_step if current_step >= 0 else 0
         _set_step(job_id, failed_step, "error")
         _set_job_error(job_id, str(e))
+    finally:
+        _release_files(held)
+    _log_job_timing(job_id, language=language, text=text)
+
+
+def _start_job(*, text: str, language: str, device: str | None, reference_hash: str, input_path: str, received: float, prepared: float, uploaded: float, priority: str, client: str) -> tuple[dict, int]:
+    """Create a clone job for a resolved reference and queue it; return (payload, status).
+
+    Takes over the hold on `input_path`: the job releases it when finished.
+    """
+    job_id = uuid.uuid4().hex
+    # Named after the job, so concurrent jobs never share an output file
+    output_name = f"clone_{job_id}.wav"
+    output_path = os.path.join(OUTPUT_DIR, output_name)
+
+    cache_key = _output_cache_key(text, language, reference_hash)
+    cached_url = _cached_output_url(cache_key)
+    if cached_url:
+        _release_files((input_path,))
+        # Cache hit: the job is complete without touching the queue or the model
+        job = _new_job()
+        job["status"] = "done"
+        job["audio_url"] = cached_url
+        _stamp_request_steps(job, received, prepared, uploaded)
+        for st in job["steps"][2:]:
+            apply_step(st, "done")
+        job["steps"][4]["sub"] = "Served from cache"
+        JOBS.add(job_id, job)
+        JOBS_SUBMITTED.inc(source="cache")
+        return {"success": True, "job_id": job_id, "cached": True}, 200
+
+    STORAGE.hold(output_path)
+    job = _new_job()
+    job["status"] = "queued"
+    _stamp_request_steps(job, received, prepared, uploaded)
+    apply_step(job["steps"][2], "active")
+    JOBS.add(job_id, job)
+    _QUEUED_JOBS.add(job_id)
+
+    try:
+        SCHEDULER.submit(
+            job_id,
+            _run_job,
+            priority=priority,
+            client=client,
+            cost=len(text),
+            job_id=job_id,
+            text=text,
+            language=language,
+            device=device,
+            input_path=input_path,
+            output_name=output_name,
+            output_path=output_path,
+            cache_key=cache_key,
+            held=(input_path, output_path),
+        )
+    except BaseException as e:
+        # Never leave a job queued forever or its files held
+        _QUEUED_JOBS.discard(job_id)
+        JOBS.remove(job_id)
+        _release_files((input_path, output_path))
+        if isinstance(e, QueueFull):
+            return _busy(e.retry_after)
+        raise
+
+    JOBS_SUBMITTED.inc(source="model")
+    return {"success": True, "job_id": job_id}, 200
 
 
 @app.route("/api/clone_start", methods=["POST"])
 def api_clone_start():
-    _cleanup_jobs()
+    received = time.monotonic()
+    if SCHEDULER.is_full():
+        return _busy_response(SCHEDULER.retry_after())
     text = (request.form.get("text") or "").strip()
     language = (request.form.get("language") or "en").strip()
     device = (request.form.get("device") or None)
+    priority = _priority(request.form.get("priority"))
 
-    file = request.files.get("reference")
     if not text:
         return jsonify({"success": False, "error": "Text is required."}), 400
-    if not file or file.filename == "":
-        return jsonify({"success": False, "error": "Reference audio file is required."}), 400
-    if not allowed_file(file.filename):
-        return jsonify({"success": False, "error": "Unsupported file type. Use wav, mp3, m4a, flac, ogg, or opus."}), 400
-
-    filename = secure_filename(file.filename)
-    ts = int(time.time() * 1000)
-    input_path = os.path.join(UPLOAD_DIR, f"{ts}_{filename}")
-    output_name = f"clone_{ts}.wav"
-    output_path = os.path.join(OUTPUT_DIR, output_name)
-
-    # Save upload before returning job id
-    file.save(input_path)
-
-    job_id = uuid.uuid4().hex
-    with JOBS_LOCK:
-        JOBS[job_id] = _new_job()
-
-    threading.Thread(
-        target=_run_job,
-        kwargs={
-            "job_id": job_id,
-            "text": text,
-            "language": language,
-            "device": device,
-            "input_path": input_path,
-            "output_name": output_name,
-            "output_path": output_path,
-        },
-        daemon=True,
-    ).start()
-
-    return jsonify({"success": True, "job_id": job_id})
+    if priority is None:
+        return _json_response(*_bad_priority())
+
+    # Save upload (or hold the registered voice) before returning job id; the job releases it
+    prepared = time.monotonic()
+    reference_hash, input_path, error = _request_reference()
+    if error:
+        return _json_response(*error)
+    uploaded = time.monotonic()
+
+    return _json_response(*_start_job(
+        text=text,
+        language=language,
+        device=device,
+        reference_hash=reference_hash,
+        input_path=input_path,
+        received=received,
+        prepared=prepared,
+        uploaded=uploaded,
+        priority=priority,
+        client=_request_client(),
+    ))
 
 
 @app.route("/api/clone_status/<job_id>", methods=["GET"])
 def api_clone_status(job_id: str):
-    _cleanup_jobs()
-    with JOBS_LOCK:
-        job = JOBS.get(job_id)
-        if not job:
-            return jsonify({"success": False, "error": "Invalid job id"}), 404
-        return jsonify({"success": True, "status": job["status"], "steps": job["steps"], "error": job["error"], "audio_url": job["audio_url"]})
+    job = JOBS.get(job_id)
+    if not job:
+        return jsonify({"success": False, "error": "Invalid job id"}), 404
+    return jsonify(_job_payload(job))
+
+
+@app.route("/api/clone_events/<job_id>", methods=["GET"])
+def api_clone_events(job_id: str):
+    """Server-Sent Events stream of job status; each message has the status payload.
+
+    The stream ends after the job is done or failed. Clients that cannot use
+    SSE can keep polling /api/clone_status/<job_id>.
+    """
+    if JOBS.get(job_id) is None:
+        return jsonify({"success": False, "error": "Invalid job id"}), 404
+
+    def generate():
+        version = -1
+        deadline = time.monotonic() + SSE_MAX_SECONDS
+        yield "retry: 2000\n\n"
+        while time.monotonic() < deadline:
+            result = JOBS.wait_for_change(job_id, version, SSE_KEEPALIVE_SECONDS)
+            if result is None:
+                yield "event: gone\ndata: {\"success\": false, \"error\": \"Invalid job id\"}\n\n"
+                return
+            version, job = result
+            if job is None:
+                yield ": keepalive\n\n"
+                continue
+            payload = _job_payload(job)
+            yield f"data: {json.dumps(payload)}\n\n"
+            if payload["status"] in ("done", "error"):
+                return
+
+    resp = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+
+@app.route("/api/stats", methods=["GET"])
+def api_stats():
+    return jsonify({
+        "success": True,
+        "scheduler": SCHEDULER.stats(),
+        "jobs": JOBS.stats(),
+        "output_cache": OUTPUT_CACHE.stats(),
+        "uploads": REFERENCES.stats(),
+        "storage": STORAGE.stats(),
+        "voices": VOICES.stats(),
+        "latent_cache": latent_cache_stats(),
+        "batching": batch_stats(),
+        "worker_pool": worker_pool_stats(),
+    })
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus text exposition of queue, job, latency and process metrics."""
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
+
+
+def _submit_clone(*, text: str, language: str, device: str | None, reference_hash: str, input_path: str, priority: str, client: str):
+    """Answer a synchronous clone request from the output cache, or queue its synthesis.
+
+    Returns ((payload, status), None) when the request is already answered, or
+    (None, pending); the caller waits for pending["future"] and hands the outcome
+    to _finish_clone(). Takes over the hold on `input_path`.
+    """
+    task_id = uuid.uuid4().hex
+    # Unique per request, so concurrent requests never share an output file
+    output_name = f"clone_{task_id}.wav"
+    output_path = os.path.join(OUTPUT_DIR, output_name)
+
+    cache_key = _output_cache_key(text, language, reference_hash)
+    cached_url = _cached_output_url(cache_key)
+    if cached_url:
+        _release_files((input_path,))
+        JOBS_SUBMITTED.inc(source="cache")
+        return ({"success": True, "audio_url": cached_url, "cached": True}, 200), None
+
+    STORAGE.hold(output_path)
+    try:
+        # Perform cloning on the shared worker pool; the caller waits for the result
+        future = SCHEDULER.submit(
+            task_id,
+            do_clone,
+            priority=priority,
+            client=client,
+            cost=len(text),
+            text=text,
+            speaker_wav=input_path,
+            language=language,
+            output=output_path,
+            device=device,
+        )
+    except BaseException as e:
+        _release_files((input_path, output_path))
+        if isinstance(e, QueueFull):
+            return _busy(e.retry_after), None
+        raise
+    JOBS_SUBMITTED.inc(source="model")
+    return None, {"future": future, "input_path": input_path, "output_name": output_name, "output_path": output_path, "cache_key": cache_key}
+
+
+def _finish_clone(pending: dict, error: BaseException | None) -> tuple[dict, int]:
+    """Record a finished synthesis from _submit_clone(), release its files and build the reply."""
+    try:
+        if error is None:
+            STORAGE.add(pending["output_path"], "outputs")
+            if pending["cache_key"]:
+                OUTPUT_CACHE.put(pending["cache_key"], pending["output_path"])
+    finally:
+        _release_files((pending["input_path"], pending["output_path"]))
+    if isinstance(error, AudioDecodeError):
+        return {"success": False, "error": str(error)}, 400
+    if error is not None:
+        return {"success": False, "error": str(error)}, 500
+    return {"success": True, "audio_url": f"/outputs/{pending['output_name']}"}, 200
 
 
 @app.route("/api/clone", methods=["POST"])
 def api_clone():
+    if SCHEDULER.is_full():
+        return _busy_response(SCHEDULER.retry_after())
     text = (request.form.get("text") or "").strip()
     language = (request.form.get("language") or "en").strip()
     device = (request.form.get("device") or None)
 
-    file = request.files.get("reference")
+    priority = _priority(request.form.get("priority"))
+
     if not text:
         return jsonify({"success": False, "error": "Text is required."}), 400
+    if priority is None:
+        return _json_response(*_bad_priority())
+
+    reference_hash, input_path, error = _request_reference()
+    if error:
+        return _json_response(*error)
+
+    response, pending = _submit_clone(
+        text=text,
+        language=language,
+        device=device,
+        reference_hash=reference_hash,
+        input_path=input_path,
+        priority=priority,
+        client=_request_client(),
+    )
+    if response:
+        return _json_response(*response)
+    try:
+        pending["future"].result()
+        error = None
+    except Exception as e:
+        error = e
+    return _json_response(*_finish_clone(pending, error))
+
+
+@app.route("/api/voices", methods=["POST"])
+def api_voices_create():
+    """Register a reference clip once; clone requests can then pass the returned voice_id."""
+    if SCHEDULER.is_full():
+        return _busy_response(SCHEDULER.retry_after())
+    name = (request.form.get("name") or "").strip()
+    device = (request.form.get("device") or None)
+
+    file = request.files.get("reference")
     if not file or file.filename == "":
         return jsonify({"success": False, "error": "Reference audio file is required."}), 400
     if not allowed_file(file.filename):
         return jsonify({"success": False, "error": "Unsupported file type. Use wav, mp3, m4a, flac, ogg, or opus."}), 400
 
-    filename = secure_filename(file.filename)
-    ts = int(time.time() * 1000)
-    input_path = os.path.join(UPLOAD_DIR, f"{ts}_{filename}")
-    output_name = f"clone_{ts}.wav"
-    output_path = os.path.join(OUTPUT_DIR, output_name)
+    reference_hash, input_path = REFERENCES.save(file.stream, secure_filename(file.filename))
+    try:
+        # Decoding and conditioning run on the shared worker pool, like a clone job
+        future = SCHEDULER.submit(
+            uuid.uuid4().hex,
+            VOICES.create,
+            client=_request_client(),
+            cost=VOICE_REGISTRATION_COST,
+            source=input_path,
+            name=name or os.path.splitext(file.filename)[0],
+            prepare=lambda path: prepare_voice(path, device),
+            source_sha256=reference_hash,
+        )
+        voice = future.result()
+    except QueueFull as e:
+        return _busy_response(e.retry_after)
+    except AudioDecodeError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    finally:
+        _release_files((input_path,))
 
-    file.save(input_path)
+    return jsonify({"success": True, **voice}), 201
 
-    # Convert to WAV if necessary (for formats like WEBM/M4A)
-    ref_path = input_path
-    if _should_convert_to_wav(input_path):
-        if _ffmpeg_path():
-            try:
-                ref_path = _convert_to_wav(input_path)
-            except Exception as e:
-                return jsonify({"success": False, "error": str(e)}), 400
-        else:
-            return jsonify({"success": False, "error": "Reference format not supported by backend. Install ffmpeg or upload WAV/OGG/OPUS/MP3/M4A."}), 400
 
+@app.route("/api/voices", methods=["GET"])
+def api_voices_list():
+    return jsonify({"success": True, "voices": VOICES.list()})
+
+
+@app.route("/api/voices/<voice_id>", methods=["GET"])
+def api_voices_get(voice_id: str):
+    voice = VOICES.get(voice_id)
+    if voice is None:
+        return jsonify({"success": False, "error": "Unknown voice_id."}), 404
+    return jsonify({"success": True, **voice})
+
+
+@app.route("/api/voices/<voice_id>", methods=["DELETE"])
+def api_voices_delete(voice_id: str):
+    if not VOICES.delete(voice_id):
+        return jsonify({"success": False, "error": "Unknown voice_id."}), 404
+    return jsonify({"success": True})
+
+
+# Longest a stream request waits for a worker to start its synthesis
+STREAM_START_TIMEOUT_SECONDS = float(os.environ.get("VC_STREAM_START_TIMEOUT_SECONDS", "60"))
+
+
+def _stream_not_started(future, cancelled: threading.Event, input_path: str) -> tuple[dict, int]:
+    """Give up on a stream whose synthesis did not start in time; return the 503 reply."""
+    cancelled.set()
+    if future.cancel():
+        # Still queued: the job will never run, so it cannot release its reference
+        _release_files((input_path,))
+    payload = {"success": False, "error": "Timed out waiting for a free worker. Please retry shortly.", "retry_after": SCHEDULER.retry_after()}
+    return payload, 503
+
+
+def _stream_job(chunks: queue.Queue, cancelled: threading.Event, *, text: str, speaker_wav: str, language: str, device: str | None, held: tuple = ()) -> None:
+    """Scheduler task: push (sample_rate, chunk, chunk, ..., None) into `chunks`."""
     try:
-        # Perform cloning
-        do_clone(text=text, speaker_wav=ref_path, language=language, output=output_path, device=device)
+        sample_rate, stream = stream_voice(text, speaker_wav, language, device)
+        try:
+            # Pull the first chunk before announcing the stream, so decode and
+            # conditioning errors are still reported as a JSON error response
+            first = next(stream, None)
+            chunks.put(sample_rate)
+            if first is not None:
+                chunks.put(first)
+            for chunk in stream:
+                if cancelled.is_set():
+                    break
+                chunks.put(chunk)
+        finally:
+            stream.close()
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        chunks.put(e)
+    finally:
+        _release_files(held)
+        chunks.put(None)
+
+
+@app.route("/api/clone_stream", methods=["POST"])
+def api_clone_stream():
+    """Synthesize and send audio over a chunked response as it is vocoded.
+
+    `format=wav` (default) sends a WAV header followed by PCM data;
+    `format=pcm` sends raw 16-bit little-endian mono PCM.
+    """
+    started = time.perf_counter()
+    if SCHEDULER.is_full():
+        return _busy_response(SCHEDULER.retry_after())
+    text = (request.form.get("text") or "").strip()
+    language = (request.form.get("language") or "en").strip()
+    device = (request.form.get("device") or None)
+    fmt = (request.form.get("format") or "wav").strip().lower()
+    priority = _priority(request.form.get("priority"))
+
+    if not text:
+        return jsonify({"success": False, "error": "Text is required."}), 400
+    if fmt not in ("wav", "pcm"):
+        return jsonify({"success": False, "error": "Unsupported format. Use wav or pcm."}), 400
+    if priority is None:
+        return _json_response(*_bad_priority())
+
+    _, input_path, error = _request_reference()
+    if error:
+        return _json_response(*error)
 
-    audio_url = url_for("serve_output", filename=output_name)
-    return jsonify({"success": True, "audio_url": audio_url})
+    chunks: queue.Queue = queue.Queue()
+    cancelled = threading.Event()
+    try:
+        future = SCHEDULER.submit(
+            uuid.uuid4().hex,
+            _stream_job,
+            priority=priority,
+            client=_request_client(),
+            cost=len(text),
+            chunks=chunks,
+            cancelled=cancelled,
+            text=text,
+            speaker_wav=input_path,
+            language=language,
+            device=device,
+            held=(input_path,),
+        )
+    except BaseException as e:
+        _release_files((input_path,))
+        if isinstance(e, QueueFull):
+            return _busy_response(e.retry_after)
+        raise
+
+    # Wait for the worker to start so errors before the first chunk become a JSON error
+    try:
+        first = chunks.get(timeout=STREAM_START_TIMEOUT_SECONDS)
+    except queue.Empty:
+        return _json_response(*_stream_not_started(future, cancelled, input_path))
+    if isinstance(first, Exception) or first is None:
+        cancelled.set()
+        code = 400 if isinstance(first, AudioDecodeError) else 500
+        return jsonify({"success": False, "error": str(first or "Synthesis produced no audio")}), code
+    sample_rate = int(first)
+
+    def generate():
+        sent_first = False
+        try:
+            if fmt == "wav":
+                yield wav_stream_header(sample_rate)
+            while True:
+                item = chunks.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    print(f"[ERROR] Streaming synthesis failed: {item}", flush=True)
+                    break
+                if not sent_first:
+                    sent_first = True
+                    print(f"[INFO] First stream chunk sent after {(time.perf_counter() - started) * 1000:.0f} ms", flush=True)
+                yield to_pcm16(item, normalize=False).tobytes()
+        finally:
+            cancelled.set()
+
+    mimetype = "audio/wav" if fmt == "wav" else f"audio/L16;rate={sample_rate};channels=1"
+    resp = Response(stream_with_context(generate()), mimetype=mimetype)
+    resp.headers["X-Sample-Rate"] = str(sample_rate)
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
 
 
 if __name__ == "__main__":
@@ -0,0 +1,390 @@
+"""
+Async (ASGI) serving mode for the web app.
+- Serves /api/clone, /api/clone_start, /api/clone_status, /api/clone_events, /api/clone_stream
+  and /outputs on an event loop (Starlette), sharing app.py's scheduler, stores and caches
+- Uploads are parsed and spooled without blocking; hashing, encoding and other file work runs
+  on a small thread pool, and model calls still run on the scheduler's fixed workers
+- Waiting requests hold no thread: /api/clone awaits the scheduler future, and progress
+  streams are woken by job store callbacks, so idle connections cost only a socket
+- Every other route (pages, voice registry, stats, metrics) is served by the Flask app
+  through a WSGI bridge
+- Run with: uvicorn asgi_app:app --host 127.0.0.1 --port 5000
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+import app as web
+from audio_io import AudioDecodeError, to_pcm16, wav_stream_header
+from job_store import MemoryJobStore
+from scheduler import QueueFull
+
+MAX_UPLOAD_BYTES = web.app.config["MAX_CONTENT_LENGTH"]
+# Threads serving the Flask routes behind the WSGI bridge
+WSGI_THREADS = 16
+# How often a waiting /api/clone request checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = 1.0
+
+
+def _json(payload: dict, status: int = 200) -> JSONResponse:
+    headers = {"Retry-After": str(payload["retry_after"])} if status in (429, 503) else None
+    return JSONResponse(payload, status_code=status, headers=headers)
+
+
+def _too_large() -> JSONResponse:
+    return _json({"success": False, "error": f"Upload exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB."}, 413)
+
+
+async def _jobs(fn, *args):
+    """Call a job store method; SQLite calls run on a thread so disk I/O never blocks the loop."""
+    if isinstance(web.JOBS, MemoryJobStore):
+        return fn(*args)
+    return await run_in_threadpool(fn, *args)
+
+
+class _UploadTooLarge(Exception):
+    pass
+
+
+def _limited(request) -> Request:
+    """The same request, but reading more than MAX_UPLOAD_BYTES of body raises _UploadTooLarge."""
+    received = 0
+
+    async def receive():
+        nonlocal received
+        message = await request.receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > MAX_UPLOAD_BYTES:
+                raise _UploadTooLarge()
+        return message
+
+    return Request(request.scope, receive)
+
+
+async def _read_form(request):
+    """Parse the multipart form; None when the body is over the upload limit."""
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > MAX_UPLOAD_BYTES:
+        return None
+    # Chunked bodies carry no Content-Length: bytes are counted as they stream in,
+    # so an oversized upload is rejected before it is spooled in full
+    try:
+        return await _limited(request).form()
+    except _UploadTooLarge:
+        return None
+
+
+def _clone_fields(form) -> tuple:
+    text = (form.get("text") or "").strip()
+    language = (form.get("language") or "en").strip()
+    device = form.get("device") or None
+    return text, language, device
+
+
+def _client(request) -> str:
+    return web._client_key(request.headers.get("x-api-key"), request.client.host if request.client else None)
+
+
+async def _reference(form):
+    upload = form.get("reference")
+    filename = getattr(upload, "filename", None)
+    return await run_in_threadpool(web._resolve_reference, form.get("voice_id"), filename, upload.file if filename else None)
+
+
+# ---------------- clone endpoints ---------------- #
+async def api_clone(request):
+    if web.SCHEDULER.is_full():
+        return _json(*web._busy(web.SCHEDULER.retry_after()))
+    form = await _read_form(request)
+    if form is None:
+        return _too_large()
+    try:
+        text, language, device = _clone_fields(form)
+        priority = web._priority(form.get("priority"))
+        if not text:
+            return _json({"success": False, "error": "Text is required."}, 400)
+        if priority is None:
+            return _json(*web._bad_priority())
+        reference_hash, input_path, error = await _reference(form)
+    finally:
+        await form.close()
+    if error:
+        return _json(*error)
+
+    response, pending = await run_in_threadpool(
+        web._submit_clone,
+        text=text,
+        language=language,
+        device=device,
+        reference_hash=reference_hash,
+        input_path=input_path,
+        priority=priority,
+        client=_client(request),
+    )
+    if response:
+        return _json(*response)
+    future = pending["future"]
+    waiter = asyncio.wrap_future(future)
+    while not (await asyncio.wait({waiter}, timeout=DISCONNECT_POLL_SECONDS))[0]:
+        if not await request.is_disconnected():
+            continue
+        # Client went away: a queued synthesis is dropped (the scheduler skips
+        # cancelled futures), a running one still finishes and fills the output
+        # cache; either way the files are released
+        if future.cancel():
+            await run_in_threadpool(web._finish_clone, pending, RuntimeError("Request cancelled."))
+        else:
+            future.add_done_callback(lambda f: web._finish_clone(pending, f.exception()))
+        waiter.cancel()
+        return Response(status_code=499)
+    return _json(*await run_in_threadpool(web._finish_clone, pending, waiter.exception()))
+
+
+async def api_clone_start(request):
+    received = time.monotonic()
+    if web.SCHEDULER.is_full():
+        return _json(*web._busy(web.SCHEDULER.retry_after()))
+    form = await _read_form(request)
+    if form is None:
+        return _too_large()
+    try:
+        text, language, device = _clone_fields(form)
+        priority = web._priority(form.get("priority"))
+        if not text:
+            return _json({"success": False, "error": "Text is required."}, 400)
+        if priority is None:
+            return _json(*web._bad_priority())
+        prepared = time.monotonic()
+        reference_hash, input_path, error = await _reference(form)
+        uploaded = time.monotonic()
+    finally:
+        await form.close()
+    if error:
+        return _json(*error)
+
+    return _json(*await run_in_threadpool(
+        web._start_job,
+        text=text,
+        language=language,
+        device=device,
+        reference_hash=reference_hash,
+        input_path=input_path,
+        received=received,
+        prepared=prepared,
+        uploaded=uploaded,
+        priority=priority,
+        client=_client(request),
+    ))
+
+
+async def api_clone_status(request):
+    job = await _jobs(web.JOBS.get, request.path_params["job_id"])
+    if not job:
+        return _json({"success": False, "error": "Invalid job id"}, 404)
+    return _json(web._job_payload(job))
+
+
+async def _wait_for_change(job_id: str, since: int, timeout: float):
+    """Event-loop version of JobStore.wait_for_change (same return values).
+
+    Woken by job store callbacks for changes made in this process; with the
+    SQLite store, changes from other processes are picked up by polling.
+    """
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+
+    def wake() -> None:
+        loop.call_soon_threadsafe(changed.set)
+
+    deadline = loop.time() + timeout
+    poll = getattr(web.JOBS, "poll_interval", None)
+    while True:
+        # Registered before the read, so a change in between still wakes us
+        web.JOBS.watch(job_id, wake)
+        try:
+            job = await _jobs(web.JOBS.get, job_id)
+            if job is None:
+                return None
+            if job["version"] != since:
+                return job["version"], job
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return since, None
+            try:
+                await asyncio.wait_for(changed.wait(), min(remaining, poll) if poll else remaining)
+            except asyncio.TimeoutError:
+                pass
+        finally:
+            web.JOBS.unwatch(job_id, wake)
+        changed.clear()
+
+
+async def api_clone_events(request):
+    """Server-Sent Events stream of job status, as in the Flask app."""
+    job_id = request.path_params["job_id"]
+    if await _jobs(web.JOBS.get, job_id) is None:
+        return _json({"success": False, "error": "Invalid job id"}, 404)
+
+    async def generate():
+        version = -1
+        deadline = time.monotonic() + web.SSE_MAX_SECONDS
+        yield "retry: 2000\n\n"
+        while time.monotonic() < deadline:
+            result = await _wait_for_change(job_id, version, web.SSE_KEEPALIVE_SECONDS)
+            if result is None:
+                yield "event: gone\ndata: {\"success\": false, \"error\": \"Invalid job id\"}\n\n"
+                return
+            version, job = result
+            if job is None:
+                yield ": keepalive\n\n"
+                continue
+            payload = web._job_payload(job)
+            yield f"data: {json.dumps(payload)}\n\n"
+            if payload["status"] in ("done", "error"):
+                return
+
+    return StreamingResponse(generate(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+class _LoopQueue:
+    """Stands in for the queue.Queue of app._stream_job, handing items to the event loop."""
+
+    def __init__(self, loop) -> None:
+        self._loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    def put(self, item) -> None:
+        self._loop.call_soon_threadsafe(self.queue.put_nowait, item)
+
+
+async def api_clone_stream(request):
+    """Chunked streaming synthesis (format=wav or pcm), as in the Flask app."""
+    started = time.perf_counter()
+    if web.SCHEDULER.is_full():
+        return _json(*web._busy(web.SCHEDULER.retry_after()))
+    form = await _read_form(request)
+    if form is None:
+        return _too_large()
+    try:
+        text, language, device = _clone_fields(form)
+        fmt = (form.get("format") or "wav").strip().lower()
+        priority = web._priority(form.get("priority"))
+        if not text:
+            return _json({"success": False, "error": "Text is required."}, 400)
+        if fmt not in ("wav", "pcm"):
+            return _json({"success": False, "error": "Unsupported format. Use wav or pcm."}, 400)
+        if priority is None:
+            return _json(*web._bad_priority())
+        _, input_path, error = await _reference(form)
+    finally:
+        await form.close()
+    if error:
+        return _json(*error)
+
+    chunks = _LoopQueue(asyncio.get_running_loop())
+    cancelled = threading.Event()
+    try:
+        future = web.SCHEDULER.submit(
+            uuid.uuid4().hex,
+            web._stream_job,
+            priority=priority,
+            client=_client(request),
+            cost=len(text),
+            chunks=chunks,
+            cancelled=cancelled,
+            text=text,
+            speaker_wav=input_path,
+            language=language,
+            device=device,
+            held=(input_path,),
+        )
+    except QueueFull as e:
+        web._release_files((input_path,))
+        return _json(*web._busy(e.retry_after))
+
+    # Wait for the worker to start so errors before the first chunk become a JSON error
+    try:
+        first = await asyncio.wait_for(chunks.queue.get(), web.STREAM_START_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        return _json(*await run_in_threadpool(web._stream_not_started, future, cancelled, input_path))
+    if isinstance(first, Exception) or first is None:
+        cancelled.set()
+        code = 400 if isinstance(first, AudioDecodeError) else 500
+        return _json({"success": False, "error": str(first or "Synthesis produced no audio")}, code)
+    sample_rate = int(first)
+
+    async def generate():
+        sent_first = False
+        try:
+            if fmt == "wav":
+                yield wav_stream_header(sample_rate)
+            while True:
+                item = await chunks.queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    print(f"[ERROR] Streaming synthesis failed: {item}", flush=True)
+                    break
+                if not sent_first:
+                    sent_first = True
+                    print(f"[INFO] First stream chunk sent after {(time.perf_counter() - started) * 1000:.0f} ms", flush=True)
+                yield to_pcm16(item, normalize=False).tobytes()
+        finally:
+            cancelled.set()
+
+    media_type = "audio/wav" if fmt == "wav" else f"audio/L16;rate={sample_rate};channels=1"
+    return StreamingResponse(generate(), media_type=media_type, headers={"X-Sample-Rate": str(sample_rate), "Cache-Control": "no-store"})
+
+
+# ---------------- output delivery ---------------- #
+async def serve_output(request):
+    """Serve an output as WAV, FLAC or Opus, with Range support and immutable caching."""
+    accept = parse_accept_header(request.headers.get("accept"), MIMEAccept)
+    fmt = web._negotiate_format(request.query_params.get("format"), accept)
+    if fmt is None:
+        return _json({"success": False, "error": "Unsupported format. Use wav, flac or opus."}, 400)
+    # Encoding a variant and hashing for the ETag touch the disk; done off the loop
+    resolved = await run_in_threadpool(web._resolve_output, request.path_params["filename"], fmt)
+    if resolved is None:
+        return _json({"success": False, "error": "Not found"}, 404)
+    path, mimetype, etag, cache_control = resolved
+    headers = {"ETag": f'"{etag}"', "Cache-Control": cache_control}
+    if "format" not in request.query_params:
+        headers["Vary"] = "Accept"
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or headers["ETag"] in (t.strip() for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    # FileResponse streams from a thread and answers Range/If-Range requests
+    return FileResponse(path, media_type=mimetype, headers=headers)
+
+
+app = Starlette(
+    routes=[
+        Route("/api/clone", api_clone, methods=["POST"]),
+        Route("/api/clone_start", api_clone_start, methods=["POST"]),
+        Route("/api/clone_status/{job_id}", api_clone_status, methods=["GET"]),
+        Route("/api/clone_events/{job_id}", api_clone_events, methods=["GET"]),
+        Route("/api/clone_stream", api_clone_stream, methods=["POST"]),
+        Route("/outputs/{filename:path}", serve_output, methods=["GET", "HEAD"]),
+        Mount("/", app=WSGIMiddleware(web.app, workers=WSGI_THREADS)),
+    ]
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="127.0.0.1", port=5000)
@@ -0,0 +1,363 @@
+"""
+Audio helpers shared by the model service and the web app.
+- Converts float waveforms to 16-bit PCM the same way Coqui's synthesizer does
+- Writes WAV files with the standard library (no extra audio dependencies)
+- Encodes finished WAVs to FLAC or Ogg Opus for delivery (soundfile, else ffmpeg)
+- Builds WAV headers for streamed responses of unknown length
+- Joins chunked synthesis output with a vectorized crossfade
+- Probes and decodes reference uploads in-process and resamples them once per target rate
+- Trims silence, caps reference duration to the most voiced window and peak-normalizes
+  (vectorized energy VAD), so conditioning cost does not grow with upload length
+"""
+
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import wave
+from typing import Optional
+
+import numpy as np
+
+
+class AudioDecodeError(ValueError):
+    """Raised when a reference upload cannot be decoded."""
+
+
+def to_pcm16(wav, normalize: bool = True) -> np.ndarray:
+    """Convert a float waveform (list, array or tensor) to int16 samples.
+
+    With `normalize`, the signal is peak-normalized exactly like
+    TTS.utils.audio.numpy_transforms.save_wav, so files match the stock output.
+    """
+    if hasattr(wav, "detach"):
+        wav = wav.detach().cpu().numpy()
+    wav = np.asarray(wav, dtype=np.float32).reshape(-1)
+    if normalize:
+        peak = float(np.max(np.abs(wav))) if wav.size else 0.0
+        wav = wav * (32767 / max(0.01, peak))
+    else:
+        wav = np.clip(wav, -1.0, 1.0) * 32767
+    return wav.astype(np.int16)
+
+
+def write_wav(path: str, wav, sample_rate: int, normalize: bool = True) -> None:
+    """Write a mono float waveform to a 16-bit PCM WAV file (peak-normalized unless `normalize` is False)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    pcm = to_pcm16(wav, normalize=normalize)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(int(sample_rate))
+        wf.writeframes(pcm.tobytes())
+
+
+def wav_stream_header(sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """Return a RIFF/WAVE header for a PCM stream whose length is not known yet.
+
+    The RIFF and data sizes are set to the maximum value, which browsers and
+    most decoders treat as "read until end of stream".
+    """
+    byte_rate = sample_rate * channels * sample_width
+    block_align = channels * sample_width
+    return (
+        b"RIFF"
+        + struct.pack("<I", 0xFFFFFFFF)
+        + b"WAVEfmt "
+        + struct.pack("<IHHIIHH", 16, 1, channels, int(sample_rate), byte_rate, block_align, sample_width * 8)
+        + b"data"
+        + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
+def crossfade_concat(chunks, fade_samples: int) -> np.ndarray:
+    """Join waveforms in order with a linear crossfade of `fade_samples`.
+
+    Each overlap is clamped to half the length of the shorter neighbour. The
+    output buffer is allocated once and every chunk is added with vectorized
+    ramps, so the cost is linear in the total number of samples.
+    """
+    chunks = [np.asarray(c, dtype=np.float32).reshape(-1) for c in chunks]
+    chunks = [c for c in chunks if c.size]
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    if len(chunks) == 1:
+        return chunks[0]
+
+    lengths = np.array([c.size for c in chunks])
+    fades = np.minimum(max(0, int(fade_samples)), np.minimum(lengths[:-1], lengths[1:]) // 2)
+    # Start offset of each chunk: previous offsets + lengths, minus overlaps
+    starts = np.concatenate(([0], np.cumsum(lengths[:-1] - fades)))
+    out = np.zeros(int(starts[-1] + lengths[-1]), dtype=np.float32)
+
+    for i, c in enumerate(chunks):
+        c = c.copy()
+        fade_in = fades[i - 1] if i > 0 else 0
+        fade_out = fades[i] if i < len(fades) else 0
+        if fade_in:
+            c[:fade_in] *= np.linspace(0.0, 1.0, fade_in, endpoint=False, dtype=np.float32)
+        if fade_out:
+            c[-fade_out:] *= np.linspace(1.0, 0.0, fade_out, endpoint=False, dtype=np.float32)
+        out[starts[i] : starts[i] + c.size] += c
+    return out
+
+
+def probe_format(path: str) -> str:
+    """Identify the container from the file header (not the extension)."""
+    with open(path, "rb") as f:
+        head = f.read(64)
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"OggS":
+        return "opus" if b"OpusHead" in head else "ogg"
+    if head[:3] == b"ID3" or (len(head) > 1 and head[0] == 0xFF and (head[1] & 0xE0) == 0xE0):
+        return "mp3"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    return "unknown"
+
+
+def _decode_wav(path: str):
+    """Decode integer PCM WAV with the standard library."""
+    with wave.open(path, "rb") as wf:
+        channels = wf.getnchannels()
+        width = wf.getsampwidth()
+        sr = wf.getframerate()
+        raw = wf.readframes(wf.getnframes())
+    if width == 1:
+        data = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        data = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+        data = ints.astype(np.float32) / float(1 << 23)
+    elif width == 4:
+        data = np.frombuffer(raw, dtype="<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise AudioDecodeError(f"Unsupported WAV sample width: {width}")
+    return data.reshape(-1, channels).mean(axis=1), sr
+
+
+def _decode_soundfile(path: str):
+    import soundfile as sf
+    data, sr = sf.read(path, dtype="float32", always_2d=True)
+    return data.mean(axis=1), sr
+
+
+def _decode_torchaudio(path: str):
+    import torchaudio
+    audio, sr = torchaudio.load(path)
+    return audio.mean(dim=0).numpy().astype(np.float32, copy=False), sr
+
+
+def _decode_ffmpeg(path: str, sample_rate: int):
+    """Last resort: let ffmpeg decode to raw float32 on a pipe (no temp files)."""
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        raise AudioDecodeError("Reference format not supported by backend. Please install ffmpeg or upload WAV/OGG/OPUS/MP3/FLAC.")
+    cmd = [ffmpeg, "-v", "error", "-i", path, "-vn", "-ac", "1", "-ar", str(sample_rate), "-f", "f32le", "pipe:1"]
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        tail = proc.stderr.decode("utf-8", "replace").splitlines()[-10:]
+        raise AudioDecodeError("Audio conversion failed. " + "\n".join(tail))
+    return np.frombuffer(proc.stdout, dtype="<f4").astype(np.float32), sample_rate
+
+
+# In-process decoders tried per probed container, in order
+_DECODERS = {
+    "wav": (_decode_wav, _decode_soundfile, _decode_torchaudio),
+    "flac": (_decode_soundfile, _decode_torchaudio),
+    "ogg": (_decode_soundfile, _decode_torchaudio),
+    "opus": (_decode_soundfile, _decode_torchaudio),
+    "mp3": (_decode_soundfile, _decode_torchaudio),
+    "webm": (_decode_torchaudio,),
+    "mp4": (_decode_torchaudio,),
+    "unknown": (_decode_soundfile, _decode_torchaudio),
+}
+
+# What the in-process decoders raise for unreadable or unsupported input: wave.Error
+# and EOFError from the stdlib reader, RuntimeError (LibsndfileError) from soundfile
+# and torchaudio, OSError for I/O failures, ValueError (incl. AudioDecodeError).
+_DECODE_ERRORS = (wave.Error, EOFError, RuntimeError, OSError, ValueError)
+
+
+def decode_audio(path: str, fallback_rate: int = 22050):
+    """Decode a file to (mono float32 samples, sample_rate).
+
+    The header is probed to pick an in-process decoder; ffmpeg is only spawned
+    (decoding straight to `fallback_rate`) when none of them can handle it.
+    Decoder failures are logged and reported in the error if ffmpeg fails too.
+    """
+    fmt = probe_format(path)
+    failures = []
+    for decoder in _DECODERS[fmt]:
+        name = decoder.__name__.replace("_decode_", "")
+        try:
+            samples, sr = decoder(path)
+        except ImportError:
+            continue  # optional backend not installed
+        except _DECODE_ERRORS as e:
+            print(f"[WARN] {name} could not decode {fmt} reference: {e}")
+            failures.append(f"{name}: {e}")
+            continue
+        if samples.size:
+            return np.clip(samples, -1.0, 1.0), int(sr)
+        failures.append(f"{name}: no samples")
+    try:
+        samples, sr = _decode_ffmpeg(path, fallback_rate)
+    except AudioDecodeError as e:
+        if not failures:
+            raise
+        raise AudioDecodeError(f"{e} In-process decoders: " + "; ".join(failures)) from e
+    if not samples.size:
+        raise AudioDecodeError("Reference audio is empty.")
+    return np.clip(samples, -1.0, 1.0), sr
+
+
+_warned_scipy_resample = False
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """Resample mono audio (band-limited sinc via torchaudio, else polyphase via SciPy)."""
+    global _warned_scipy_resample
+    if src_rate == dst_rate:
+        return samples
+    try:
+        import torch
+        import torchaudio.functional as AF
+    except ImportError as e:
+        if not _warned_scipy_resample:
+            _warned_scipy_resample = True
+            print(f"[WARN] torchaudio unavailable ({e}); resampling with scipy.signal.resample_poly")
+        from math import gcd
+        from scipy.signal import resample_poly
+        g = gcd(src_rate, dst_rate)
+        return resample_poly(samples, dst_rate // g, src_rate // g).astype(np.float32)
+    out = AF.resample(torch.from_numpy(np.ascontiguousarray(samples)), src_rate, dst_rate)
+    return out.numpy()
+
+
+# Reference preprocessing: 30 ms analysis frames; a frame is voiced when its RMS is
+# within VAD_RANGE_DB of the loudest frame and above VAD_FLOOR_DBFS. Pauses inside
+# speech are kept up to MAX_PAUSE_SECONDS on each side of the voiced audio.
+VAD_FRAME_SECONDS = 0.03
+VAD_RANGE_DB = 35.0
+VAD_FLOOR_DBFS = -55.0
+MAX_PAUSE_SECONDS = 0.15
+REFERENCE_PEAK = 0.9
+
+
+def voiced_frames(samples: np.ndarray, sample_rate: int) -> tuple:
+    """Split audio into VAD frames; return (frames[n, frame_len], voiced mask[n])."""
+    frame_len = max(1, int(sample_rate * VAD_FRAME_SECONDS))
+    n = samples.size // frame_len
+    frames = samples[: n * frame_len].reshape(n, frame_len)
+    if not n:
+        return frames, np.zeros(0, dtype=bool)
+    rms_db = 10.0 * np.log10(np.mean(np.square(frames, dtype=np.float64), axis=1) + 1e-12)
+    threshold = max(float(rms_db.max()) - VAD_RANGE_DB, VAD_FLOOR_DBFS)
+    return frames, rms_db > threshold
+
+
+def preprocess_reference(samples: np.ndarray, sample_rate: int, max_seconds: float = 0.0) -> np.ndarray:
+    """Trim silence, keep the most voiced `max_seconds` (0 = no cap) and peak-normalize.
+
+    Leading/trailing silence is dropped and long pauses are shortened to
+    MAX_PAUSE_SECONDS per side. Audio without any voiced frame is only capped.
+    """
+    frames, voiced = voiced_frames(samples, sample_rate)
+    if voiced.any():
+        idx = np.arange(voiced.size)
+        pad = int(round(MAX_PAUSE_SECONDS / VAD_FRAME_SECONDS))
+        # Distance of every frame to the previous and to the next voiced frame
+        last = np.maximum.accumulate(np.where(voiced, idx, -voiced.size - pad - 1))
+        following = np.minimum.accumulate(np.where(voiced, idx, 2 * voiced.size + pad + 1)[::-1])[::-1]
+        keep = ((idx - last) <= pad) | ((following - idx) <= pad)
+        frames, voiced = frames[keep], voiced[keep]
+        window = int(max_seconds / VAD_FRAME_SECONDS) if max_seconds > 0 else 0
+        if window and voiced.size > window:
+            # Window with the most voiced frames (earliest on ties)
+            counts = np.concatenate(([0], np.cumsum(voiced, dtype=np.int64)))
+            start = int(np.argmax(counts[window:] - counts[:-window]))
+            frames = frames[start : start + window]
+        samples = frames.reshape(-1)
+    elif max_seconds > 0:
+        samples = samples[: int(max_seconds * sample_rate)]
+    peak = float(np.max(np.abs(samples))) if samples.size else 0.0
+    if peak > 1e-4:
+        samples = samples * (REFERENCE_PEAK / peak)
+    return samples.astype(np.float32, copy=False)
+
+
+def load_reference(path: str, rates=(22050,), max_seconds: Optional[float] = None) -> dict:
+    """Decode a reference clip once and return {rate: samples} for every requested rate.
+
+    Each target rate is produced directly from the decoded source, so audio is
+    never resampled twice. With `max_seconds` set (0 = trim only), the clip is
+    preprocessed first at its source rate, so only the kept audio is resampled.
+    """
+    samples, sr = decode_audio(path, fallback_rate=max(rates))
+    if max_seconds is not None:
+        original_s = samples.size / sr
+        samples = preprocess_reference(samples, sr, max_seconds)
+        print(f"[INFO] Reference {os.path.basename(path)}: {original_s:.1f} s -> {samples.size / sr:.1f} s after trimming", flush=True)
+    return {rate: np.clip(resample(samples, sr, rate), -1.0, 1.0) for rate in rates}
+
+
+# Delivery formats for synthesized audio: name -> (mimetype, file extension)
+OUTPUT_FORMATS = {
+    "wav": ("audio/wav", ".wav"),
+    "flac": ("audio/flac", ".flac"),
+    "opus": ("audio/ogg", ".opus"),
+}
+# Sample rates the Opus codec accepts; anything else is resampled to 48 kHz
+_OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+OPUS_BITRATE = "48k"
+
+
+def _encode_soundfile(samples: np.ndarray, sample_rate: int, dst: str, fmt: str) -> None:
+    import soundfile as sf
+    if fmt == "flac":
+        sf.write(dst, samples, sample_rate, format="FLAC", subtype="PCM_16")
+    else:
+        # Ogg Opus needs libsndfile >= 1.0.29
+        sf.write(dst, samples, sample_rate, format="OGG", subtype="OPUS")
+
+
+def _encode_ffmpeg(samples: np.ndarray, sample_rate: int, dst: str, fmt: str) -> None:
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        raise RuntimeError(f"Encoding {fmt} needs soundfile with {fmt} support or ffmpeg on PATH.")
+    codec = ["-c:a", "flac", "-f", "flac"] if fmt == "flac" else ["-c:a", "libopus", "-b:a", OPUS_BITRATE, "-f", "ogg"]
+    cmd = [ffmpeg, "-v", "error", "-y", "-f", "f32le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0", *codec, dst]
+    proc = subprocess.run(cmd, input=samples.astype("<f4").tobytes(), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        tail = proc.stderr.decode("utf-8", "replace").splitlines()[-10:]
+        raise RuntimeError(f"Encoding {fmt} failed. " + "\n".join(tail))
+
+
+def encode_audio(src: str, dst: str, fmt: str) -> None:
+    """Encode the WAV file `src` to `fmt` ("flac" or "opus") at `dst`, atomically."""
+    if fmt not in ("flac", "opus"):
+        raise ValueError(f"Unsupported output format: {fmt}")
+    samples, sr = _decode_wav(src)
+    if fmt == "opus" and sr not in _OPUS_RATES:
+        samples, sr = resample(samples, sr, 48000), 48000
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dst) or ".", suffix=".part")
+    os.close(fd)
+    try:
+        try:
+            _encode_soundfile(samples, sr, tmp, fmt)
+        except Exception:
+            _encode_ffmpeg(samples, sr, tmp, fmt)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
@@ -0,0 +1,131 @@
+"""
+Dynamic micro-batching for synthesis requests.
+- Collects requests that arrive within a short window (or while the model is busy)
+- Groups them by language and hands each group to a batch runner
+- Tracks batch-size statistics for throughput/latency tuning
+"""
+
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List
+
+
+class BatchRequest:
+    __slots__ = ("text", "speaker_wav", "language", "future", "enqueued")
+
+    def __init__(self, text: str, speaker_wav: str, language: str) -> None:
+        self.text = text
+        self.speaker_wav = speaker_wav
+        self.language = language
+        self.future: Future = Future()
+        self.enqueued = time.monotonic()
+
+
+class MicroBatcher:
+    """Groups concurrent requests into per-language batches.
+
+    `run_batch(language, requests)` must return one result per request, in
+    order. Up to `concurrency` batches run at once (one per model replica);
+    while all runners are busy, new requests keep accumulating so the next
+    batch is larger.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[str, List[BatchRequest]], List[Any]],
+        window_ms: float = 20.0,
+        max_batch: int = 8,
+        concurrency: int = 1,
+    ) -> None:
+        self._run_batch = run_batch
+        self.window = max(0.0, float(window_ms)) / 1000.0
+        self.max_batch = max(1, int(max_batch))
+        self.concurrency = max(1, int(concurrency))
+        self._pending: List[BatchRequest] = []
+        self._cond = threading.Condition()
+        self._slots = threading.Semaphore(self.concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch-runner")
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._sizes: Counter = Counter()
+        self._batches = 0
+        self._items = 0
+        self._wait_total = 0.0
+
+    def submit(self, text: str, speaker_wav: str, language: str) -> Any:
+        """Queue one request and block until its batch has been synthesized."""
+        req = BatchRequest(text, speaker_wav, language)
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatch, name="micro-batcher", daemon=True)
+                self._thread.start()
+            self._pending.append(req)
+            self._cond.notify()
+        return req.future.result()
+
+    def _take_batch(self) -> List[BatchRequest]:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = self._pending[0].enqueued + self.window
+            while len(self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[: self.max_batch]
+            del self._pending[: self.max_batch]
+            return batch
+
+    def _dispatch(self) -> None:
+        while True:
+            # Wait for a free runner first so requests pile up while the model is busy
+            self._slots.acquire()
+            batch = self._take_batch()
+            groups: "OrderedDict[str, List[BatchRequest]]" = OrderedDict()
+            for req in batch:
+                groups.setdefault(req.language, []).append(req)
+            items = list(groups.items())
+            for i, (language, reqs) in enumerate(items):
+                if i > 0:
+                    self._slots.acquire()
+                self._executor.submit(self._run_group, language, reqs)
+
+    def _run_group(self, language: str, reqs: List[BatchRequest]) -> None:
+        started = time.monotonic()
+        try:
+            results = self._run_batch(language, reqs)
+            for req, result in zip(reqs, results):
+                req.future.set_result(result)
+        except BaseException as e:
+            for req in reqs:
+                if not req.future.done():
+                    req.future.set_exception(e)
+        finally:
+            self._slots.release()
+            self._record(reqs, started)
+
+    def _record(self, reqs: List[BatchRequest], started: float) -> None:
+        with self._stats_lock:
+            self._batches += 1
+            self._items += len(reqs)
+            self._sizes[len(reqs)] += 1
+            self._wait_total += sum(started - r.enqueued for r in reqs)
+        print(
+            f"[INFO] Batch of {len(reqs)} ({reqs[0].language}) done in {time.monotonic() - started:.2f}s",
+            flush=True,
+        )
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "window_ms": self.window * 1000.0,
+                "max_batch": self.max_batch,
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch_size": (self._items / self._batches) if self._batches else 0.0,
+                "batch_size_histogram": dict(sorted(self._sizes.items())),
+                "mean_queue_wait_ms": (self._wait_total / self._items * 1000.0) if self._items else 0.0,
+            }
@@ -0,0 +1,260 @@
+"""
+Benchmark the synthesis pipeline over a matrix of workloads.
+- Drives clone_voice() (text to WAV file) or a ModelService replica directly
+- Matrix: text length x language x reference duration x concurrency
+- Reports p50/p95/p99 latency, throughput and real-time factor per cell
+- Writes JSON results and compares them against a saved baseline with a threshold
+- --backend stub runs a deterministic fake model (bench/stub_backend.py), so the
+  scheduling, caching and I/O overhead can be measured without weights or network
+
+Usage:
+  python bench/pipeline.py --backend stub --out bench_results.json
+  python bench/pipeline.py --backend stub --baseline bench_results.json --threshold 0.1
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from audio_io import write_wav  # noqa: E402
+
+# Seed text per language; repeated and cut to the requested length
+CORPUS = {
+    "en": "The quick brown fox jumps over the lazy dog. A journey of a thousand miles begins with a single step.",
+    "es": "El veloz murciélago hindú comía feliz cardillo y kiwi. La cigüeña tocaba el saxofón detrás del palenque.",
+    "fr": "Portez ce vieux whisky au juge blond qui fume. Le cœur a ses raisons que la raison ne connaît point.",
+    "de": "Franz jagt im komplett verwahrlosten Taxi quer durch Bayern. Übung macht den Meister, sagt man.",
+    "it": "Ok signore, l'ho completato e qui ci sono i file di riferimento. Chi va piano va sano e va lontano.",
+    "zh": "我们今天去公园散步。天气很好，阳光明媚。大家都很开心。",
+    "ja": "今日はとても良い天気です。公園を散歩しましょう。みんな楽しそうです。",
+}
+# Metrics compared against a baseline, and the direction that counts as worse
+REGRESSION_CHECKS = {"p95_s": "higher", "throughput_rps": "lower", "rtf_mean": "higher"}
+
+
+def make_text(language: str, chars: int) -> str:
+    seed = CORPUS.get(language.split("-")[0], CORPUS["en"])
+    text = ((seed + " ") * (chars // len(seed) + 1))[:chars]
+    # Cut at a word boundary for space-separated languages
+    if text.strip().count(" ") > 1:
+        text = text.rsplit(" ", 1)[0]
+    return text.strip()
+
+
+def make_reference(directory: str, seconds: float, sample_rate: int = 22050) -> str:
+    """Write a deterministic voiced-like reference clip (harmonics plus noise)."""
+    path = os.path.join(directory, f"ref_{seconds:g}s.wav")
+    if not os.path.isfile(path):
+        rng = np.random.default_rng(int(seconds * 1000))
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        f0 = 140 + 20 * np.sin(2 * np.pi * 0.5 * t)
+        phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+        wav = sum(np.sin(k * phase) / k for k in range(1, 6)) * 0.2 + rng.normal(0, 0.01, t.size)
+        write_wav(path, wav.astype(np.float32), sample_rate)
+    return path
+
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _wav_seconds(path: str) -> float:
+    with wave.open(path, "rb") as wf:
+        return wf.getnframes() / float(wf.getframerate())
+
+
+def run_cell(cv, mode: str, text: str, language: str, reference: str, concurrency: int, requests: int, out_dir: str) -> dict:
+    def one(i: int):
+        started = time.perf_counter()
+        timings: dict = {}
+        if mode == "clone":
+            output = os.path.join(out_dir, f"out_{concurrency}_{i}.wav")
+            cv.clone_voice(text=text, speaker_wav=reference, language=language, output=output, timings=timings)
+            audio_s = _wav_seconds(output)
+        else:
+            with cv.acquire_service() as svc:
+                wav = svc.synthesize(text=text, speaker_wav=reference, language=language, timings=timings)
+                audio_s = len(wav) / svc.output_sample_rate
+        return time.perf_counter() - started, audio_s, timings
+
+    errors = 0
+    samples = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(one, i) for i in range(requests)]:
+            try:
+                samples.append(future.result())
+            except Exception as e:
+                errors += 1
+                print(f"[WARN] Request failed: {e}", flush=True)
+    wall = time.perf_counter() - started
+
+    latencies = [s[0] for s in samples]
+    stages: dict = {}
+    for _, _, timings in samples:
+        for stage, seconds in timings.items():
+            stages[stage] = stages.get(stage, 0.0) + seconds
+    if not samples:
+        return {"requests": requests, "errors": errors}
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_s": round(percentile(latencies, 50), 4),
+        "p95_s": round(percentile(latencies, 95), 4),
+        "p99_s": round(percentile(latencies, 99), 4),
+        "mean_s": round(statistics.mean(latencies), 4),
+        "throughput_rps": round(len(samples) / wall, 4),
+        # RTF as in README Notes and vc_synthesis_rtf: wall seconds per second of audio (lower is faster)
+        "rtf_mean": round(statistics.mean(lat / audio for lat, audio, _ in samples if audio > 0), 4),
+        "audio_seconds": round(sum(s[1] for s in samples), 3),
+        "stage_mean_s": {k: round(v / len(samples), 4) for k, v in sorted(stages.items())},
+    }
+
+
+def cell_key(cell: dict) -> str:
+    return f"{cell['mode']}|{cell['language']}|{cell['text_chars']}|{cell['ref_seconds']:g}|{cell['concurrency']}"
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return human-readable regressions of `results` against `baseline`."""
+    base_cells = {cell_key(c): c for c in baseline.get("results", [])}
+    regressions = []
+    for cell in results["results"]:
+        base = base_cells.get(cell_key(cell))
+        if not base:
+            continue
+        for metric, worse in REGRESSION_CHECKS.items():
+            old, new = base.get(metric), cell.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (worse == "higher" and change > threshold) or (worse == "lower" and -change > threshold):
+                regressions.append(f"{cell_key(cell)} {metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def _int_list(value: str) -> list:
+    return [int(v) for v in value.split(",") if v]
+
+
+def _float_list(value: str) -> list:
+    return [float(v) for v in value.split(",") if v]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the voice cloning pipeline.")
+    parser.add_argument("--backend", choices=["stub", "xtts"], default="stub", help="Model backend (default: stub).")
+    parser.add_argument("--mode", choices=["clone", "service"], default="clone", help="Drive clone_voice() or a ModelService.")
+    parser.add_argument("--text-chars", type=_int_list, default=[60, 250, 1000], help="Comma-separated text lengths.")
+    parser.add_argument("--languages", default="en,zh", help="Comma-separated language codes.")
+    parser.add_argument("--ref-seconds", type=_float_list, default=[6.0, 20.0], help="Comma-separated reference durations.")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 4], help="Comma-separated concurrency levels.")
+    parser.add_argument("--requests", type=int, default=8, help="Requests per cell (default: 8).")
+    parser.add_argument("--reference", help="Use this reference file instead of synthetic clips (ignores --ref-seconds).")
+    parser.add_argument("--stub-generation-rtf", type=float, default=0.2, help="Stub GPT cost per audio second.")
+    parser.add_argument("--stub-vocoding-rtf", type=float, default=0.02, help="Stub vocoder cost per audio second.")
+    parser.add_argument("--stub-conditioning-ms", type=float, default=50.0, help="Stub conditioning cost per reference.")
+    parser.add_argument("--stub-busy", action="store_true", help="Stub spins the CPU instead of sleeping.")
+    parser.add_argument("--out", help="Write results JSON here.")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative regression (default: 0.10).")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.backend == "stub":
+        if int(os.environ.get("VC_WORKER_PROCESSES", "0") or 0):
+            print("[ERROR] The stub backend runs in-process; unset VC_WORKER_PROCESSES.", file=sys.stderr)
+            sys.exit(2)
+        from stub_backend import StubCost, install
+        cost = StubCost(
+            generation_rtf=args.stub_generation_rtf,
+            vocoding_rtf=args.stub_vocoding_rtf,
+            conditioning_seconds=args.stub_conditioning_ms / 1000.0,
+            busy=args.stub_busy,
+        )
+        install(cost)
+    import clone_voice as cv
+
+    work_dir = tempfile.mkdtemp(prefix="vc_bench_")
+    references = (
+        {0.0: args.reference} if args.reference else {s: make_reference(work_dir, s) for s in args.ref_seconds}
+    )
+    print(f"[INFO] Loading {args.backend} backend ...", flush=True)
+    started = time.perf_counter()
+    cv.warm_model()
+    load_s = time.perf_counter() - started
+
+    results = []
+    languages = [lang for lang in args.languages.split(",") if lang]
+    for language, chars, (ref_s, reference), concurrency in product(
+        languages, args.text_chars, sorted(references.items()), args.concurrency
+    ):
+        text = make_text(language, chars)
+        cell = {
+            "mode": args.mode,
+            "language": language,
+            "text_chars": chars,
+            "ref_seconds": ref_s,
+            "concurrency": concurrency,
+        }
+        cell.update(run_cell(cv, args.mode, text, language, reference, concurrency, args.requests, work_dir))
+        results.append(cell)
+        print(
+            f"[INFO] {cell_key(cell)}: p50 {cell.get('p50_s')} s, p95 {cell.get('p95_s')} s, "
+            f"{cell.get('throughput_rps')} req/s, RTF {cell.get('rtf_mean')}",
+            flush=True,
+        )
+
+    report = {
+        "meta": {
+            "backend": args.backend,
+            "mode": args.mode,
+            "requests_per_cell": args.requests,
+            "model_load_s": round(load_s, 3),
+            "model_replicas": cv.model_replicas(),
+            "batch_max_size": cv.BATCH_MAX_SIZE,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.backend == "stub":
+        report["meta"]["stub"] = vars(cost)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"[ERROR] {len(regressions)} regression(s) beyond {args.threshold:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+        print(f"[SUCCESS] No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
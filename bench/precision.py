@@ -0,0 +1,128 @@
+"""
+Compare inference precisions (fp32 vs int8-dynamic) on CPU.
+- Loads one model service per precision and times load + synthesis
+- Reports mean/median latency and real-time factor (seconds of compute per second of audio)
+- Scores output similarity as cosine similarity between the speaker embedding of each
+  output and of the reference, both computed with the fp32 speaker encoder
+
+Usage:
+  python bench/precision.py -s reference.wav --runs 3
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import torch  # noqa: E402
+
+from audio_io import resample  # noqa: E402
+from clone_voice import PRECISIONS, SPEAKER_ENCODER_SAMPLE_RATE, ModelService  # noqa: E402
+
+DEFAULT_TEXTS = [
+    "The quick brown fox jumps over the lazy dog.",
+    "Voice cloning lets a short reference recording speak any text in a similar voice.",
+]
+
+
+def _embedding(encoder_svc: ModelService, wav: np.ndarray, sample_rate: int) -> torch.Tensor:
+    audio = resample(np.asarray(wav, dtype=np.float32), sample_rate, SPEAKER_ENCODER_SAMPLE_RATE)
+    with torch.inference_mode():
+        x = torch.from_numpy(np.ascontiguousarray(audio)).unsqueeze(0)
+        return encoder_svc.model.hifigan_decoder.speaker_encoder.forward(x, l2_norm=True).reshape(-1)
+
+
+def _load(precision: str):
+    svc = ModelService("cpu", precision=precision)
+    started = time.perf_counter()
+    svc.load()
+    return svc, time.perf_counter() - started
+
+
+def bench_precision(svc: ModelService, load_s: float, args, reference_emb, encoder_svc) -> dict:
+    # Warm-up run (also fills the conditioning cache)
+    with svc.inference_slot():
+        svc.synthesize(text=args.texts[0], speaker_wav=args.speaker_wav, language=args.language)
+
+    latencies, rtfs, similarities = [], [], []
+    for run in range(args.runs):
+        for i, text in enumerate(args.texts):
+            torch.manual_seed(args.seed + run * len(args.texts) + i)
+            started = time.perf_counter()
+            with svc.inference_slot():
+                wav = svc.synthesize(text=text, speaker_wav=args.speaker_wav, language=args.language)
+            elapsed = time.perf_counter() - started
+            audio_s = len(wav) / svc.output_sample_rate
+            latencies.append(elapsed)
+            rtfs.append(elapsed / audio_s if audio_s else float("inf"))
+            emb = _embedding(encoder_svc, wav, svc.output_sample_rate)
+            similarities.append(float(torch.nn.functional.cosine_similarity(emb, reference_emb, dim=0)))
+    return {
+        "precision": svc.precision,
+        "load_s": round(load_s, 3),
+        "latency_mean_s": round(statistics.mean(latencies), 3),
+        "latency_median_s": round(statistics.median(latencies), 3),
+        "rtf_mean": round(statistics.mean(rtfs), 3),
+        "speaker_similarity_mean": round(statistics.mean(similarities), 4),
+        "samples": len(latencies),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark XTTS inference precisions on CPU.")
+    parser.add_argument("--speaker_wav", "-s", required=True, help="Reference voice file.")
+    parser.add_argument("--language", "-l", default="en", help="Language code (default: en).")
+    parser.add_argument("--text", "-t", action="append", dest="texts", help="Text to synthesize (repeatable).")
+    parser.add_argument("--runs", type=int, default=3, help="Timed passes over the texts (default: 3).")
+    parser.add_argument("--threads", type=int, default=0, help="torch threads (default: torch's choice).")
+    parser.add_argument("--seed", type=int, default=0, help="Base sampling seed, identical across precisions.")
+    parser.add_argument(
+        "--precision",
+        action="append",
+        choices=PRECISIONS,
+        help="Precision to benchmark (repeatable; default: all).",
+    )
+    parser.add_argument("--json", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+    args.texts = args.texts or DEFAULT_TEXTS
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    if not os.path.isfile(args.speaker_wav):
+        print(f"[ERROR] Reference voice file not found: {args.speaker_wav}", file=sys.stderr)
+        sys.exit(1)
+
+    # Similarity is always measured with the fp32 encoder so modes are scored alike
+    encoder_svc, encoder_load_s = _load("fp32")
+    _, reference_emb = encoder_svc.get_conditioning_latents(args.speaker_wav)
+    reference_emb = reference_emb.reshape(-1)
+
+    results = []
+    for precision in args.precision or PRECISIONS:
+        print(f"[INFO] Benchmarking {precision} ...", flush=True)
+        svc, load_s = (encoder_svc, encoder_load_s) if precision == "fp32" else _load(precision)
+        results.append(bench_precision(svc, load_s, args, reference_emb, encoder_svc))
+
+    print(f"{'precision':<14}{'load s':>8}{'mean s':>9}{'median s':>10}{'RTF':>8}{'similarity':>12}")
+    for r in results:
+        print(
+            f"{r['precision']:<14}{r['load_s']:>8.1f}{r['latency_mean_s']:>9.2f}{r['latency_median_s']:>10.2f}"
+            f"{r['rtf_mean']:>8.2f}{r['speaker_similarity_mean']:>12.3f}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"threads": torch.get_num_threads(), "results": results}, f, indent=2)
+        print(f"[INFO] Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
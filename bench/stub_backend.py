@@ -0,0 +1,177 @@
+"""
+Deterministic stand-in for the Coqui XTTS model, for benchmarking without weights.
+- Implements the parts of the Xtts API that ModelService calls (conditioning, GPT
+  generate/latent pass, HiFi-GAN decoder, tokenizer, streaming inference)
+- Output length follows the text length; audio is a deterministic tone per sentence
+- Compute cost is simulated per second of produced audio, by sleeping (default) or
+  by spinning on the CPU
+- install() swaps it into clone_voice so the real pipeline (reference decoding,
+  conditioning cache, text splitting, batching, replicas, file writes) runs around it
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import torch
+
+from text_split import CHAR_LIMITS, split_text
+
+SAMPLE_RATE = 24000
+SAMPLES_PER_CODE = 1024  # GPT code stride: ~23 codes per second of audio
+CODES_PER_CHAR = 1.4  # ~16 characters of speech per second
+LATENT_DIM = 1024
+STOP_TEXT_TOKEN = 0
+STOP_AUDIO_TOKEN = 1025
+
+
+@dataclass
+class StubCost:
+    """Simulated compute, in wall seconds per second of produced audio (plus fixed costs)."""
+
+    generation_rtf: float = 0.2
+    vocoding_rtf: float = 0.02
+    conditioning_seconds: float = 0.05
+    load_seconds: float = 0.0
+    busy: bool = False  # spin instead of sleep, to model CPU contention
+
+
+def _spend(seconds: float, busy: bool) -> None:
+    if seconds <= 0:
+        return
+    if not busy:
+        time.sleep(seconds)
+        return
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def _seed(*parts) -> int:
+    digest = hashlib.sha256(repr(parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "little")
+
+
+class _Tokenizer:
+    char_limits = dict(CHAR_LIMITS)
+
+    def encode(self, text: str, lang: str = "en") -> list:
+        # One token per UTF-8 byte, shifted so 0 stays the stop token
+        return [b + 1 for b in text.encode("utf-8")]
+
+
+class _SpeakerEncoder:
+    def __init__(self, cost: StubCost) -> None:
+        self.cost = cost
+
+    def forward(self, audio_16k, l2_norm: bool = True):
+        _spend(self.cost.conditioning_seconds / 2, self.cost.busy)
+        g = torch.Generator().manual_seed(_seed("spk", float(audio_16k.abs().sum()), audio_16k.shape[-1]))
+        emb = torch.randn(1, 512, generator=g)
+        return torch.nn.functional.normalize(emb, dim=1) if l2_norm else emb
+
+
+class _Decoder:
+    """HiFi-GAN stand-in: latents (B, frames, dim) -> waveform (B, 1, frames * stride)."""
+
+    def __init__(self, cost: StubCost) -> None:
+        self.cost = cost
+        self.speaker_encoder = _SpeakerEncoder(cost)
+
+    def __call__(self, latents, g=None):
+        batch, frames, _ = latents.shape
+        n = frames * SAMPLES_PER_CODE
+        # Rows run in parallel in a real batch, so cost follows the longest row
+        _spend(n / SAMPLE_RATE * self.cost.vocoding_rtf, self.cost.busy)
+        t = torch.arange(n, dtype=torch.float32) / SAMPLE_RATE
+        # One tone per row, pitched by its first latent value (latents lie in [0, 1])
+        freq = 110.0 + 220.0 * latents[:, 0, :1].float()
+        wav = 0.3 * torch.sin(2 * torch.pi * freq * t.unsqueeze(0))
+        return wav.unsqueeze(1)
+
+
+class _Gpt:
+    code_stride_len = SAMPLES_PER_CODE
+    stop_text_token = STOP_TEXT_TOKEN
+    stop_audio_token = STOP_AUDIO_TOKEN
+
+    def __init__(self, cost: StubCost) -> None:
+        self.cost = cost
+
+    def generate(self, cond_latents, text_inputs, **kwargs):
+        lengths = (text_inputs != STOP_TEXT_TOKEN).sum(dim=1).tolist()
+        n_codes = [max(1, int(round(n * CODES_PER_CHAR))) for n in lengths]
+        longest = max(n_codes)
+        _spend(longest * SAMPLES_PER_CODE / SAMPLE_RATE * self.cost.generation_rtf, self.cost.busy)
+        codes = torch.full((len(n_codes), longest + 1), STOP_AUDIO_TOKEN, dtype=torch.long)
+        for i, n in enumerate(n_codes):
+            g = torch.Generator().manual_seed(_seed("codes", text_inputs[i].tolist()))
+            codes[i, :n] = torch.randint(0, 1024, (n,), generator=g)
+        if len(n_codes) == 1:
+            codes = codes[:, :longest]
+        return codes
+
+    def __call__(self, text_inputs, text_lengths, audio_codes, wav_lengths, cond_latents=None, **kwargs):
+        return audio_codes.unsqueeze(-1).float().expand(-1, -1, LATENT_DIM) / 1024.0
+
+
+class StubXtts:
+    def __init__(self, cost: StubCost) -> None:
+        self.cost = cost
+        self.config = SimpleNamespace(
+            audio=SimpleNamespace(output_sample_rate=SAMPLE_RATE),
+            temperature=0.75,
+            length_penalty=1.0,
+            repetition_penalty=10.0,
+            top_k=50,
+            top_p=0.85,
+            gpt_cond_len=30,
+            gpt_cond_chunk_len=4,
+            max_ref_len=30,
+            sound_norm_refs=False,
+        )
+        self.args = SimpleNamespace(gpt_max_text_tokens=402)
+        self.gpt_batch_size = 1
+        self.tokenizer = _Tokenizer()
+        self.gpt = _Gpt(cost)
+        self.hifigan_decoder = _Decoder(cost)
+
+    def get_gpt_cond_latents(self, audio, sr, length=30, chunk_length=4):
+        _spend(self.cost.conditioning_seconds / 2, self.cost.busy)
+        g = torch.Generator().manual_seed(_seed("cond", float(audio.abs().sum()), audio.shape[-1]))
+        return torch.randn(1, 32, LATENT_DIM, generator=g)
+
+    def inference_stream(self, text, language, gpt_cond_latent, speaker_embedding, stream_chunk_size=20, **kwargs):
+        lang = language.split("-")[0]
+        for sent in split_text(text, lang) or [text]:
+            tokens = torch.tensor([self.tokenizer.encode(sent.lower(), lang)])
+            codes = self.gpt.generate(gpt_cond_latent, tokens)
+            for start in range(0, codes.shape[1], stream_chunk_size):
+                latents = self.gpt(tokens, None, codes[:, start : start + stream_chunk_size], None)
+                yield self.hifigan_decoder(latents, g=speaker_embedding).reshape(-1)
+
+
+class StubTTS:
+    """Drop-in for TTS.api.TTS: TTS(model_name).to(device).synthesizer.tts_model."""
+
+    cost = StubCost()
+
+    def __init__(self, model_name: str = "", *args, **kwargs) -> None:
+        _spend(self.cost.load_seconds, False)
+        self.synthesizer = SimpleNamespace(tts_model=StubXtts(self.cost))
+
+    def to(self, device):
+        return self
+
+
+def install(cost: StubCost) -> None:
+    """Make clone_voice build stub models instead of loading XTTS."""
+    import clone_voice
+
+    StubTTS.cost = cost
+    with clone_voice._BACKEND_LOCK:
+        clone_voice.torch = torch
+        clone_voice._HAS_CUDA = False
+        clone_voice.split_sentence = lambda text, lang, limit: split_text(text, lang) or [text]
+        clone_voice.TTS = StubTTS
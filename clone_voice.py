@@ -3,44 +3,164 @@ Voice cloning utility for Coqui TTS XTTS v2 with a cached, reusable model servic
 - Provides a CLI for one-off synthesis
 - Exposes a clone_voice() API that reuses a loaded model across calls
 - Exposes warm_model() and is_model_loaded() for backend progress integration
+- Caches speaker conditioning latents per reference audio (memory LRU + optional disk store)
+- Trims silence from references and caps them to their most voiced seconds before conditioning
+- Keeps a configurable number of model replicas per device, one inference at a time each
+- Optionally micro-batches concurrent requests into padded GPT/vocoder batches
+- Streams audio chunks as they are vocoded (stream_voice() and the --stream CLI flag)
+- Splits long text into sentences synthesized in parallel across replicas, joined with a crossfade
+- Optionally runs the model in a pool of worker processes, one pinned torch thread budget each
+- Optionally quantizes the GPT and vocoder linear layers to int8 for faster CPU inference
+- Optionally reports per-stage timings (conditioning, generation, vocoding, write)
+- Synthesizes whole JSONL/CSV manifests with one model load (the --manifest CLI flag)
+- Keeps a model warm in a resident daemon (--serve) that later CLI runs forward to
+- Precomputes conditioning for registered voices (prepare_voice()) and persists it next to them
 """
 
 import argparse
 import os
 import sys
 import threading
+import time
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Optional
 
-try:
-    import torch
-    _HAS_CUDA = torch.cuda.is_available()
-except Exception:
-    torch = None
-    _HAS_CUDA = False
+from audio_io import crossfade_concat, load_reference, to_pcm16, write_wav
+from batching import MicroBatcher
+from daemon import forward as forward_to_daemon, serve as serve_daemon
+from latent_cache import LatentCache, hash_audio
+from manifest import load_manifest, print_summary, run_manifest
+from metrics import REGISTRY
+from text_split import split_text
 
-try:
-    from torch.serialization import add_safe_globals
-except Exception:
-    add_safe_globals = None
+# torch and Coqui TTS take seconds to import, so they are loaded on first use
+# (see _load_backend) rather than when this module is imported.
+torch = None
+TTS = None
+add_safe_globals = None
+BaseDatasetConfig = None
+XttsConfig = None
+XttsAudioConfig = None
+split_sentence = None
+_HAS_CUDA = False
+_BACKEND_LOCK = threading.Lock()
 
-try:
-    from TTS.config.shared_configs import BaseDatasetConfig
-except Exception:
-    BaseDatasetConfig = None
+MODEL_LOAD_SECONDS = REGISTRY.histogram(
+    "vc_model_load_seconds",
+    "Time to load (and optionally quantize) a model instance.",
+    labels=("precision",),
+    buckets=(1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600),
+)
+REFERENCE_CONVERSION_SECONDS = REGISTRY.histogram(
+    "vc_reference_conversion_seconds",
+    "Time to decode and resample a reference clip.",
+)
+SYNTHESIS_RTF = REGISTRY.histogram(
+    "vc_synthesis_rtf",
+    "Real-time factor: wall-clock seconds of synthesis per second of audio (lower is faster).",
+    buckets=(0.1, 0.2, 0.33, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0, 10.0, 20.0),
+)
+SYNTHESIS_AUDIO_SECONDS = REGISTRY.counter("vc_synthesis_audio_seconds_total", "Seconds of audio synthesized.")
+SYNTHESIS_WALL_SECONDS = REGISTRY.counter("vc_synthesis_wall_seconds_total", "Wall-clock seconds spent synthesizing.")
 
-try:
-    from TTS.tts.configs.xtts_config import XttsConfig
-except Exception:
-    XttsConfig = None
+MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
 
-try:
-    from TTS.tts.models.xtts import XttsAudioConfig
-except Exception:
-    XttsAudioConfig = None
+# Speaker conditioning cache: entries kept in memory per device, and an optional
+# directory where computed latents are persisted across restarts.
+LATENT_CACHE_SIZE = int(os.environ.get("VC_LATENT_CACHE_SIZE", "64"))
+LATENT_CACHE_DIR = os.environ.get("VC_LATENT_CACHE_DIR") or None
+# Registered voices (see voices.py): their references live directly in VOICES_DIR, and
+# their conditioning is always persisted to VOICES_DIR/latents, whatever the cache settings.
+VOICES_DIR = os.path.abspath(os.environ.get("VC_VOICES_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "voices"))
+VOICE_LATENTS_DIR = os.path.join(VOICES_DIR, "latents")
+# Sample rates the reference audio is needed at: GPT conditioning mels and the
+# speaker encoder. Uploads are decoded once and resampled directly to both.
+REFERENCE_SAMPLE_RATE = 22050
+SPEAKER_ENCODER_SAMPLE_RATE = 16000
+# Reference preprocessing: silence is trimmed and the clip is cut to its most voiced
+# REFERENCE_MAX_SECONDS (0 = trim only) before conditioning. VC_REF_PREPROCESS=0 disables it.
+REFERENCE_PREPROCESS = os.environ.get("VC_REF_PREPROCESS", "1").strip().lower() not in ("", "0", "false", "no")
+REFERENCE_MAX_SECONDS = float(os.environ.get("VC_REF_MAX_SECONDS", "20"))
+# Independent model instances per device; each runs one synthesis at a time
+MODEL_REPLICAS = max(1, int(os.environ.get("VC_MODEL_REPLICAS", "1")))
+# Streaming: number of GPT tokens decoded per vocoded chunk (smaller = earlier first audio)
+STREAM_CHUNK_SIZE = int(os.environ.get("VC_STREAM_CHUNK_SIZE", "20"))
+# Micro-batching: requests arriving within the window are synthesized together.
+# A max batch size of 1 disables batching.
+BATCH_MAX_SIZE = max(1, int(os.environ.get("VC_BATCH_MAX_SIZE", "1")))
+BATCH_WINDOW_MS = float(os.environ.get("VC_BATCH_WINDOW_MS", "20"))
+# Long text: texts that split into several sentence chunks are synthesized chunk
+# by chunk in parallel and joined with a crossfade of this length.
+CROSSFADE_MS = float(os.environ.get("VC_CROSSFADE_MS", "30"))
+MIN_CHUNK_CHARS = int(os.environ.get("VC_MIN_CHUNK_CHARS", "20"))
+# Process pool: with N > 0, synthesis runs in N worker processes (each with its own
+# model and torch thread budget) instead of in this process. 0 keeps everything in-process.
+WORKER_PROCESSES = max(0, int(os.environ.get("VC_WORKER_PROCESSES", "0")))
+WORKER_THREADS = int(os.environ.get("VC_WORKER_THREADS", "0")) or max(1, (os.cpu_count() or 1) // max(1, WORKER_PROCESSES))
+# Inference precision: full fp32 weights, or int8 dynamic quantization of the
+# GPT and vocoder linear layers (CPU only). Services are cached per precision.
+PRECISIONS = ("fp32", "int8-dynamic")
+DEFAULT_PRECISION = os.environ.get("VC_PRECISION", "fp32").strip().lower()
 
-from TTS.api import TTS
 
-MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
+def _load_backend() -> None:
+    """Import torch and Coqui TTS once, on first use."""
+    global torch, TTS, add_safe_globals, BaseDatasetConfig, XttsConfig, XttsAudioConfig, split_sentence, _HAS_CUDA
+    if TTS is not None:
+        return
+    with _BACKEND_LOCK:
+        if TTS is not None:
+            return
+        started = time.perf_counter()
+        try:
+            import torch as _torch
+            torch = _torch
+            _HAS_CUDA = torch.cuda.is_available()
+        except Exception:
+            torch = None
+            _HAS_CUDA = False
+
+        try:
+            from torch.serialization import add_safe_globals as _add_safe_globals
+            add_safe_globals = _add_safe_globals
+        except Exception:
+            add_safe_globals = None
+
+        try:
+            from TTS.config.shared_configs import BaseDatasetConfig as _BaseDatasetConfig
+            BaseDatasetConfig = _BaseDatasetConfig
+        except Exception:
+            BaseDatasetConfig = None
+
+        try:
+            from TTS.tts.configs.xtts_config import XttsConfig as _XttsConfig
+            XttsConfig = _XttsConfig
+        except Exception:
+            XttsConfig = None
+
+        try:
+            from TTS.tts.models.xtts import XttsAudioConfig as _XttsAudioConfig
+            XttsAudioConfig = _XttsAudioConfig
+        except Exception:
+            XttsAudioConfig = None
+
+        try:
+            from TTS.tts.layers.xtts.tokenizer import split_sentence as _split_sentence
+            split_sentence = _split_sentence
+        except Exception:
+            split_sentence = None
+
+        from TTS.api import TTS as _TTS
+        TTS = _TTS
+        print(f"[INFO] Imported torch and TTS in {time.perf_counter() - started:.1f} s", flush=True)
+
+
+def _default_device() -> str:
+    _load_backend()
+    return "cuda" if _HAS_CUDA else "cpu"
 
 
 def _collect_safe_globals():
@@ -56,13 +176,98 @@ def _collect_safe_globals():
     return safe_classes
 
 
+def _add_timing(timings: Optional[dict], stage: str, started: float) -> None:
+    """Add the seconds since `started` to `timings[stage]` (no-op without a dict)."""
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - started)
+
+
+def _merge_timings(timings: Optional[dict], other: Optional[dict]) -> None:
+    if timings is not None and other:
+        for stage, seconds in other.items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+def _normalize_precision(precision: Optional[str]) -> str:
+    precision = (precision or DEFAULT_PRECISION).strip().lower()
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}'. Choose one of: {', '.join(PRECISIONS)}")
+    return precision
+
+
+def _conv1d_to_linear(module, conv1d_cls) -> None:
+    """Replace GPT-2 style Conv1D projections (weight stored as in x out) with nn.Linear."""
+    for name, child in module.named_children():
+        if isinstance(child, conv1d_cls):
+            n_in, n_out = child.weight.shape
+            linear = torch.nn.Linear(n_in, n_out)
+            linear.weight.data = child.weight.data.t().contiguous()
+            linear.bias.data = child.bias.data
+            setattr(module, name, linear)
+        else:
+            _conv1d_to_linear(child, conv1d_cls)
+
+
+def _quantize_int8_dynamic(model) -> None:
+    """Quantize the linear layers of the GPT and the vocoder to int8 in place.
+
+    The GPT-2 backbone keeps its attention/MLP projections in transformers'
+    Conv1D modules, which quantize_dynamic does not recognize, so they are
+    converted to equivalent nn.Linear layers first.
+    """
+    try:
+        from transformers.pytorch_utils import Conv1D
+    except Exception:
+        Conv1D = None
+    if Conv1D is not None:
+        _conv1d_to_linear(model.gpt, Conv1D)
+    for module in (model.gpt, model.hifigan_decoder):
+        torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
 class ModelService:
     """Thread-safe, reusable XTTS model service."""
 
-    def __init__(self, device: Optional[str] = None) -> None:
-        self.device = device or ("cuda" if _HAS_CUDA else "cpu")
+    def __init__(
+        self,
+        device: Optional[str] = None,
+        latent_cache: Optional[LatentCache] = None,
+        precision: Optional[str] = None,
+    ) -> None:
+        self.device = device or _default_device()
+        self.precision = _normalize_precision(precision)
+        if self.precision == "int8-dynamic" and self.device != "cpu":
+            raise ValueError("int8-dynamic precision is only supported on CPU.")
         self._tts = None
         self._load_lock = threading.Lock()
+        self.latent_cache = latent_cache or LatentCache(LATENT_CACHE_SIZE, LATENT_CACHE_DIR)
+        # (path, mtime, size) -> content hash, so unchanged files skip decoding
+        self._ref_hashes: "OrderedDict[tuple, str]" = OrderedDict()
+        self._ref_hashes_lock = threading.Lock()
+        # Serializes inference on this replica; `active` counts holders and waiters
+        self._infer_lock = threading.Lock()
+        self._active_lock = threading.Lock()
+        self.active = 0
+
+    def reserve(self) -> None:
+        """Count a caller that is about to take the inference slot."""
+        with self._active_lock:
+            self.active += 1
+
+    @contextmanager
+    def inference_slot(self, reserved: bool = False):
+        """Hold this replica exclusively for the duration of one synthesis.
+
+        Pass `reserved=True` when reserve() was already called for this caller.
+        """
+        if not reserved:
+            self.reserve()
+        try:
+            with self._infer_lock:
+                yield self
+        finally:
+            with self._active_lock:
+                self.active -= 1
 
     def _register_safe_globals(self) -> None:
         if not add_safe_globals:
@@ -82,9 +287,17 @@ class ModelService:
         with self._load_lock:
             if self._tts is not None:
                 return
-            print(f"[INFO] Loading model '{MODEL_NAME}' on device: {self.device} ...", flush=True)
+            _load_backend()
+            started = time.perf_counter()
+            print(f"[INFO] Loading model '{MODEL_NAME}' on device: {self.device} ({self.precision}) ...", flush=True)
             self._register_safe_globals()
-            self._tts = TTS(MODEL_NAME).to(self.device)
+            tts = TTS(MODEL_NAME).to(self.device)
+            if self.precision == "int8-dynamic":
+                quant_started = time.perf_counter()
+                _quantize_int8_dynamic(tts.synthesizer.tts_model)
+                print(f"[INFO] Quantized GPT and vocoder to int8 in {time.perf_counter() - quant_started:.1f} s", flush=True)
+            self._tts = tts
+            MODEL_LOAD_SECONDS.observe(time.perf_counter() - started, precision=self.precision)
 
     @property
     def tts(self):
@@ -92,66 +305,712 @@ class ModelService:
             self.load()
         return self._tts
 
+    @property
+    def model(self):
+        """The underlying Xtts model instance."""
+        return self.tts.synthesizer.tts_model
+
+    @staticmethod
+    def _load_reference(speaker_wav: str) -> dict:
+        started = time.perf_counter()
+        # Registered voices were trimmed and normalized once at registration
+        preprocess = REFERENCE_PREPROCESS and not is_registered_voice(speaker_wav)
+        audio = load_reference(
+            speaker_wav,
+            rates=(REFERENCE_SAMPLE_RATE, SPEAKER_ENCODER_SAMPLE_RATE),
+            max_seconds=REFERENCE_MAX_SECONDS if preprocess else None,
+        )
+        REFERENCE_CONVERSION_SECONDS.observe(time.perf_counter() - started)
+        return audio
+
+    def _reference_hash(self, speaker_wav: str):
+        """Return (content_hash, decoded_audio_or_None) for a reference file.
+
+        Decoded audio is a {sample_rate: samples} dict from audio_io.load_reference.
+        """
+        st = os.stat(speaker_wav)
+        sig = (os.path.abspath(speaker_wav), st.st_mtime_ns, st.st_size)
+        with self._ref_hashes_lock:
+            audio_hash = self._ref_hashes.get(sig)
+            if audio_hash is not None:
+                self._ref_hashes.move_to_end(sig)
+                return audio_hash, None
+        audio = self._load_reference(speaker_wav)
+        audio_hash = hash_audio(audio[REFERENCE_SAMPLE_RATE], REFERENCE_SAMPLE_RATE)
+        with self._ref_hashes_lock:
+            self._ref_hashes[sig] = audio_hash
+            while len(self._ref_hashes) > max(LATENT_CACHE_SIZE, 1) * 4:
+                self._ref_hashes.popitem(last=False)
+        return audio_hash, audio
+
+    def get_conditioning_latents(self, speaker_wav: str):
+        """Return (gpt_cond_latent, speaker_embedding) for a reference file.
+
+        Mirrors Xtts.get_conditioning_latents with the model config defaults, but
+        looks results up by the hash of the decoded audio first.
+        """
+        if not os.path.isfile(speaker_wav):
+            raise FileNotFoundError(f"Reference voice file not found: {speaker_wav}")
+        model = self.model
+        cfg = model.config
+        gpt_cond_len = getattr(cfg, "gpt_cond_len", 30)
+        gpt_cond_chunk_len = getattr(cfg, "gpt_cond_chunk_len", 4)
+        max_ref_len = getattr(cfg, "max_ref_len", 30)
+        sound_norm_refs = bool(getattr(cfg, "sound_norm_refs", False))
+
+        audio_hash, audio = self._reference_hash(speaker_wav)
+        key = f"{audio_hash}-{gpt_cond_len}-{gpt_cond_chunk_len}-{max_ref_len}-{int(sound_norm_refs)}"
+        if self.precision != "fp32":
+            # Quantized conditioning encoders give slightly different latents
+            key = f"{key}-{self.precision}"
+        cached = self.latent_cache.get(key, self.device)
+        voice_store = _voice_latents(speaker_wav)
+        if cached is None and voice_store is not None:
+            cached = voice_store.get(key, self.device)
+            if cached is not None:
+                self.latent_cache.put(key, cached)
+        if cached is not None:
+            return cached
+
+        if audio is None:
+            audio = self._load_reference(speaker_wav)
+        sr = REFERENCE_SAMPLE_RATE
+        enc_sr = SPEAKER_ENCODER_SAMPLE_RATE
+        with torch.inference_mode():
+            audio_22k = torch.from_numpy(audio[sr][: sr * max_ref_len].copy()).unsqueeze(0).to(self.device)
+            audio_16k = torch.from_numpy(audio[enc_sr][: enc_sr * max_ref_len].copy()).unsqueeze(0).to(self.device)
+            if sound_norm_refs:
+                audio_22k = (audio_22k / torch.abs(audio_22k).max()) * 0.75
+                audio_16k = (audio_16k / torch.abs(audio_16k).max()) * 0.75
+            # Same as Xtts.get_speaker_embedding, minus its internal 22.05 -> 16 kHz resample
+            speaker_embedding = (
+                model.hifigan_decoder.speaker_encoder.forward(audio_16k, l2_norm=True).unsqueeze(-1).to(self.device)
+            )
+            gpt_cond_latent = model.get_gpt_cond_latents(
+                audio_22k, sr, length=gpt_cond_len, chunk_length=gpt_cond_chunk_len
+            )
+        self.latent_cache.put(key, (gpt_cond_latent, speaker_embedding))
+        if voice_store is not None:
+            voice_store.put(key, (gpt_cond_latent, speaker_embedding))
+        return gpt_cond_latent, speaker_embedding
+
+    def reference_hash(self, speaker_wav: str) -> str:
+        """Content hash of the decoded reference; the prefix of its conditioning cache keys."""
+        return self._reference_hash(speaker_wav)[0]
+
+    @property
+    def output_sample_rate(self) -> int:
+        return int(self.model.config.audio.output_sample_rate)
+
+    def _sampling_kwargs(self) -> dict:
+        cfg = self.model.config
+        return {
+            "temperature": cfg.temperature,
+            "length_penalty": cfg.length_penalty,
+            "repetition_penalty": cfg.repetition_penalty,
+            "top_k": cfg.top_k,
+            "top_p": cfg.top_p,
+        }
+
+    def _sync(self) -> None:
+        """Wait for queued GPU work so stage timings are not attributed to the next stage."""
+        if self.device.startswith("cuda"):
+            torch.cuda.synchronize()
+
+    def synthesize(self, *, text: str, speaker_wav: str, language: str, timings: Optional[dict] = None):
+        """Synthesize text with cached conditioning and return the waveform.
+
+        Follows Xtts.inference (sentence split, GPT sampling, latent pass,
+        HiFi-GAN) step by step so conditioning, generation and vocoding can be
+        timed separately; their seconds are added to `timings` when given.
+        Callers must hold inference_slot().
+        """
+        started = time.perf_counter()
+        gpt_cond_latent, speaker_embedding = self.get_conditioning_latents(speaker_wav)
+        _add_timing(timings, "conditioning", started)
+
+        model = self.model
+        gpt = model.gpt
+        lang = language.split("-")[0]
+        sampling = self._sampling_kwargs()
+        sentences = split_sentence(text, lang, model.tokenizer.char_limits[lang]) if split_sentence else [text]
+        wavs = []
+        with torch.inference_mode():
+            gpt_cond_latent = gpt_cond_latent.to(self.device)
+            speaker_embedding = speaker_embedding.to(self.device)
+            for sent in sentences:
+                started = time.perf_counter()
+                tokens = model.tokenizer.encode(sent.strip().lower(), lang=lang)
+                if len(tokens) >= model.args.gpt_max_text_tokens:
+                    raise ValueError(
+                        f"XTTS can only generate text with a maximum of {model.args.gpt_max_text_tokens} tokens."
+                    )
+                text_tokens = torch.IntTensor(tokens).unsqueeze(0).to(self.device)
+                codes = gpt.generate(
+                    cond_latents=gpt_cond_latent,
+                    text_inputs=text_tokens,
+                    input_tokens=None,
+                    do_sample=True,
+                    top_p=sampling["top_p"],
+                    top_k=sampling["top_k"],
+                    temperature=sampling["temperature"],
+                    num_return_sequences=getattr(model, "gpt_batch_size", 1),
+                    num_beams=1,
+                    length_penalty=sampling["length_penalty"],
+                    repetition_penalty=sampling["repetition_penalty"],
+                    output_attentions=False,
+                )
+                latents = gpt(
+                    text_tokens,
+                    torch.tensor([text_tokens.shape[-1]], device=self.device),
+                    codes,
+                    torch.tensor([codes.shape[-1] * gpt.code_stride_len], device=self.device),
+                    cond_latents=gpt_cond_latent,
+                    return_attentions=False,
+                    return_latent=True,
+                )
+                self._sync()
+                _add_timing(timings, "generation", started)
+
+                started = time.perf_counter()
+                wavs.append(model.hifigan_decoder(latents, g=speaker_embedding).cpu().squeeze())
+                _add_timing(timings, "vocoding", started)
+        return torch.cat(wavs, dim=0).numpy()
+
+    def synthesize_stream(self, *, text: str, speaker_wav: str, language: str, stream_chunk_size: int = STREAM_CHUNK_SIZE):
+        """Yield float32 waveform chunks as XTTS incremental inference vocodes them.
+
+        The replica is held for as long as the generator is being consumed.
+        """
+        started = time.perf_counter()
+        with self.inference_slot():
+            gpt_cond_latent, speaker_embedding = self.get_conditioning_latents(speaker_wav)
+            chunks = self.model.inference_stream(
+                text,
+                language,
+                gpt_cond_latent,
+                speaker_embedding,
+                stream_chunk_size=stream_chunk_size,
+                enable_text_splitting=True,
+                **self._sampling_kwargs(),
+            )
+            first = True
+            for chunk in chunks:
+                if first:
+                    first = False
+                    print(f"[INFO] First audio chunk after {(time.perf_counter() - started) * 1000:.0f} ms", flush=True)
+                yield chunk.detach().cpu().numpy().reshape(-1)
+
+    def synthesize_batch(self, language: str, items: list, timings: Optional[dict] = None) -> list:
+        """Synthesize several (text, speaker_wav) pairs of one language together.
+
+        Every sentence of every item becomes one row of a padded batch: text
+        tokens are right-padded with the stop token (as in XTTS training), the
+        GPT samples all rows in one generate() call, and the vocoder decodes the
+        padded latents at once. Rows are then trimmed and re-joined per item.
+        Stage timings, when requested, cover the whole batch.
+        """
+        if len(items) == 1:
+            text, speaker_wav = items[0]
+            return [self.synthesize(text=text, speaker_wav=speaker_wav, language=language, timings=timings)]
+
+        model = self.model
+        gpt = model.gpt
+        lang = language.split("-")[0]
+        sampling = self._sampling_kwargs()
+
+        rows = []  # (item_index, token_ids, gpt_cond_latent, speaker_embedding)
+        for idx, (text, speaker_wav) in enumerate(items):
+            started = time.perf_counter()
+            gpt_cond_latent, speaker_embedding = self.get_conditioning_latents(speaker_wav)
+            _add_timing(timings, "conditioning", started)
+            sentences = split_sentence(text, lang, model.tokenizer.char_limits[lang]) if split_sentence else [text]
+            for sent in sentences:
+                tokens = model.tokenizer.encode(sent.strip().lower(), lang=lang)
+                if len(tokens) >= model.args.gpt_max_text_tokens:
+                    raise ValueError(
+                        f"XTTS can only generate text with a maximum of {model.args.gpt_max_text_tokens} tokens."
+                    )
+                rows.append((idx, tokens, gpt_cond_latent, speaker_embedding))
+
+        with torch.inference_mode():
+            started = time.perf_counter()
+            text_lens = torch.tensor([len(r[1]) for r in rows], device=self.device)
+            text_tokens = torch.full(
+                (len(rows), int(text_lens.max())), gpt.stop_text_token, dtype=torch.int32, device=self.device
+            )
+            for i, r in enumerate(rows):
+                text_tokens[i, : len(r[1])] = torch.tensor(r[1], dtype=torch.int32, device=self.device)
+            cond = torch.cat([r[2] for r in rows], dim=0)
+            speaker = torch.cat([r[3] for r in rows], dim=0)
+
+            codes = gpt.generate(
+                cond_latents=cond,
+                text_inputs=text_tokens,
+                input_tokens=None,
+                do_sample=True,
+                top_p=sampling["top_p"],
+                top_k=sampling["top_k"],
+                temperature=sampling["temperature"],
+                num_return_sequences=1,
+                num_beams=1,
+                length_penalty=sampling["length_penalty"],
+                repetition_penalty=sampling["repetition_penalty"],
+                output_attentions=False,
+            )
+            # Generation pads finished rows with the stop token; find each row's length
+            is_stop = codes == gpt.stop_audio_token
+            has_stop = is_stop.any(dim=1)
+            first_stop = is_stop.int().argmax(dim=1).long()
+            code_lens = torch.where(has_stop, first_stop, torch.full_like(first_stop, codes.shape[1])).clamp(min=1)
+            codes = codes.masked_fill(is_stop, 0)
+
+            latents = gpt(
+                text_tokens,
+                text_lens,
+                codes,
+                code_lens * gpt.code_stride_len,
+                cond_latents=cond,
+                return_attentions=False,
+                return_latent=True,
+            )
+            # Zero padded frames so they cannot bleed into the vocoder's valid region
+            frame_idx = torch.arange(latents.shape[1], device=self.device)
+            latents = latents * (frame_idx[None, :] < code_lens[:, None]).unsqueeze(-1)
+            self._sync()
+            _add_timing(timings, "generation", started)
+
+            started = time.perf_counter()
+            wavs = model.hifigan_decoder(latents, g=speaker).cpu()
+            _add_timing(timings, "vocoding", started)
+            samples_per_frame = wavs.shape[-1] / latents.shape[1]
+
+        per_item: list = [[] for _ in items]
+        for i, r in enumerate(rows):
+            n = int(round(int(code_lens[i]) * samples_per_frame))
+            per_item[r[0]].append(wavs[i].reshape(-1)[:n])
+        return [torch.cat(chunks, dim=0).numpy() for chunks in per_item]
+
     def tts_to_file(self, *, text: str, speaker_wav: str, language: str, file_path: str) -> None:
         if not os.path.isfile(speaker_wav):
             raise FileNotFoundError(f"Reference voice file not found: {speaker_wav}")
         os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
         print(f"[INFO] Generating audio => {file_path}", flush=True)
-        self.tts.tts_to_file(
-            text=text,
-            speaker_wav=speaker_wav,
-            language=language,
-            file_path=file_path,
-        )
+        with self.inference_slot():
+            wav = self.synthesize(text=text, speaker_wav=speaker_wav, language=language)
+        write_wav(file_path, wav, self.output_sample_rate)
 
 
-# Global cache of services per device
-_SERVICES: dict[str, ModelService] = {}
+# Global cache of service replicas per (device, precision)
+_SERVICES: dict[tuple, list[ModelService]] = {}
 _SERVICES_LOCK = threading.Lock()
+# Conditioning caches shared by every service on the same device
+_LATENT_CACHES: dict[str, LatentCache] = {}
+
 
+def _device_key(device: Optional[str]) -> str:
+    if not device and WORKER_PROCESSES:
+        # Worker processes pick their own default; the dispatcher never imports torch
+        return "auto"
+    return (device or _default_device()).lower()
 
-def get_service(device: Optional[str] = None) -> ModelService:
-    key = (device or ("cuda" if _HAS_CUDA else "cpu")).lower()
+
+def _service_key(device: Optional[str], precision: Optional[str] = None) -> tuple:
+    return _device_key(device), _normalize_precision(precision)
+
+
+_VOICE_LATENTS: Optional[LatentCache] = None
+
+
+def is_registered_voice(speaker_wav: str) -> bool:
+    """True for a registered voice's stored clip (a file directly in VOICES_DIR)."""
+    return os.path.dirname(os.path.abspath(speaker_wav)) == VOICES_DIR
+
+
+def _voice_latents(speaker_wav: str) -> Optional[LatentCache]:
+    """Disk-only conditioning store for registered voices, or None for other references."""
+    global _VOICE_LATENTS
+    if not is_registered_voice(speaker_wav):
+        return None
     with _SERVICES_LOCK:
-        svc = _SERVICES.get(key)
-        if svc is None:
-            svc = ModelService(key)
-            svc.load()
-            _SERVICES[key] = svc
-        return svc
+        if _VOICE_LATENTS is None:
+            # No memory entries of its own: hits are promoted into the per-device LRU
+            _VOICE_LATENTS = LatentCache(0, VOICE_LATENTS_DIR)
+        return _VOICE_LATENTS
+
+
+def _latent_cache_for(device: str) -> LatentCache:
+    cache = _LATENT_CACHES.get(device)
+    if cache is None:
+        cache = LatentCache(LATENT_CACHE_SIZE, LATENT_CACHE_DIR)
+        _LATENT_CACHES[device] = cache
+    return cache
 
 
-def is_model_loaded(device: Optional[str] = None) -> bool:
-    """Return True if the model service for the given device is present and loaded."""
-    key = (device or ("cuda" if _HAS_CUDA else "cpu")).lower()
+def model_replicas() -> int:
+    """Number of model instances serving requests (worker processes when the pool is enabled)."""
+    return WORKER_PROCESSES or MODEL_REPLICAS
+
+
+# Worker process pools per device (only used when WORKER_PROCESSES > 0)
+_PROCESS_POOLS: dict = {}
+# Serializes pool startup, so concurrent first calls start a single pool
+_PROCESS_POOLS_START_LOCK = threading.Lock()
+
+
+def _process_pool(key: tuple):
+    from worker_pool import ProcessWorkerPool
+
     with _SERVICES_LOCK:
-        svc = _SERVICES.get(key)
-    return bool(svc and getattr(svc, "_tts", None) is not None)
+        pool = _PROCESS_POOLS.get(key)
+    if pool is not None:
+        return pool
+    # Workers start outside _SERVICES_LOCK, so health probes and stats never wait on them
+    with _PROCESS_POOLS_START_LOCK:
+        with _SERVICES_LOCK:
+            pool = _PROCESS_POOLS.get(key)
+        if pool is None:
+            device = None if key[0] == "auto" else key[0]
+            pool = ProcessWorkerPool(WORKER_PROCESSES, WORKER_THREADS, device=device, precision=key[1])
+            with _SERVICES_LOCK:
+                _PROCESS_POOLS[key] = pool
+    return pool
 
 
-def warm_model(device: Optional[str] = None) -> None:
-    """Ensure the model for the given device is loaded into memory."""
-    svc = get_service(device)
+def _replicas(key: tuple) -> list[ModelService]:
+    device, precision = key
+    with _SERVICES_LOCK:
+        pool = _SERVICES.get(key)
+        if pool is None:
+            cache = _latent_cache_for(device)
+            pool = [ModelService(device, latent_cache=cache, precision=precision) for _ in range(MODEL_REPLICAS)]
+            _SERVICES[key] = pool
+        return pool
+
+
+def get_service(device: Optional[str] = None, precision: Optional[str] = None) -> ModelService:
+    """Return the least busy loaded replica for the given device and precision."""
+    svc = min(_replicas(_service_key(device, precision)), key=lambda s: s.active)
     svc.load()
+    return svc
+
+
+@contextmanager
+def acquire_service(device: Optional[str] = None, precision: Optional[str] = None):
+    """Pick the least busy replica and hold its inference slot.
+
+    Selection and reservation happen under one lock, so concurrent callers
+    spread across replicas instead of queueing on the same idle one.
+    """
+    pool = _replicas(_service_key(device, precision))
+    with _SERVICES_LOCK:
+        svc = min(pool, key=lambda s: s.active)
+        svc.reserve()
+    try:
+        svc.load()
+    except BaseException:
+        with svc._active_lock:
+            svc.active -= 1
+        raise
+    with svc.inference_slot(reserved=True):
+        yield svc
+
+
+def is_model_loaded(device: Optional[str] = None, precision: Optional[str] = None) -> bool:
+    """Return True if every model replica for the given device is loaded."""
+    if TTS is None and not WORKER_PROCESSES:
+        # Nothing can be loaded before the backend is imported; keep this probe cheap
+        return False
+    key = _service_key(device, precision)
+    with _SERVICES_LOCK:
+        if WORKER_PROCESSES:
+            procs = _PROCESS_POOLS.get(key)
+            return bool(procs and procs.all_loaded())
+        pool = _SERVICES.get(key)
+    return bool(pool and all(getattr(svc, "_tts", None) is not None for svc in pool))
+
+
+def warm_model(device: Optional[str] = None, precision: Optional[str] = None) -> None:
+    """Ensure every model replica for the given device is loaded into memory."""
+    key = _service_key(device, precision)
+    if WORKER_PROCESSES:
+        pool = _process_pool(key)
+        if not pool.all_loaded():
+            # Workers load in parallel; record the time until all of them are ready
+            started = time.perf_counter()
+            pool.warm()
+            MODEL_LOAD_SECONDS.observe(time.perf_counter() - started, precision=key[1])
+        return
+    for svc in _replicas(key):
+        svc.load()
+
+
+# Micro-batchers per device (only used when BATCH_MAX_SIZE > 1)
+_BATCHERS: dict[tuple, MicroBatcher] = {}
+_BATCHERS_LOCK = threading.Lock()
+
+
+def _batcher_for(key: tuple) -> MicroBatcher:
+    with _BATCHERS_LOCK:
+        batcher = _BATCHERS.get(key)
+        if batcher is None:
+
+            def run_batch(language, requests):
+                items = [(r.text, r.speaker_wav) for r in requests]
+                timings: dict = {}
+                with acquire_service(*key) as svc:
+                    try:
+                        wavs = svc.synthesize_batch(language, items, timings=timings)
+                    except Exception as e:
+                        print(f"[WARN] Batched synthesis failed, running items one by one: {e}", flush=True)
+                        timings = {}
+                        wavs = [svc.synthesize(text=t, speaker_wav=w, language=language, timings=timings) for t, w in items]
+                # Every request in the batch waited for the whole batch, so each reports its timings
+                return [(wav, svc.output_sample_rate, dict(timings)) for wav in wavs]
+
+            batcher = MicroBatcher(run_batch, BATCH_WINDOW_MS, BATCH_MAX_SIZE, concurrency=MODEL_REPLICAS)
+            _BATCHERS[key] = batcher
+        return batcher
+
+
+def _stats_device(device: Optional[str]) -> Optional[str]:
+    """Device key for a stats lookup, or None if resolving the default would import the backend.
+
+    Nothing has been served before the backend is loaded, so stats probes stay
+    cheap on a cold process instead of importing torch.
+    """
+    if not device and TTS is None and not WORKER_PROCESSES:
+        return None
+    return _device_key(device)
+
+
+def latent_cache_stats(device: Optional[str] = None) -> dict:
+    """Hit/miss counters of the device's speaker conditioning cache."""
+    key = _stats_device(device)
+    if key is None:
+        return {"entries": 0, "max_entries": LATENT_CACHE_SIZE, "hits": 0, "disk_hits": 0, "misses": 0, "disk_dir": LATENT_CACHE_DIR}
+    with _SERVICES_LOCK:
+        return _latent_cache_for(key).stats()
+
+
+def batch_stats(device: Optional[str] = None, precision: Optional[str] = None) -> Optional[dict]:
+    """Batch-size statistics for the device's micro-batcher, if batching is active."""
+    key = _stats_device(device)
+    if key is None:
+        return None
+    with _BATCHERS_LOCK:
+        batcher = _BATCHERS.get((key, _normalize_precision(precision)))
+    return batcher.stats() if batcher else None
+
+
+def worker_pool_stats(device: Optional[str] = None, precision: Optional[str] = None) -> Optional[dict]:
+    """Per-process load of the worker pool, if the pool is enabled and started."""
+    key = _stats_device(device)
+    if key is None:
+        return None
+    with _SERVICES_LOCK:
+        pool = _PROCESS_POOLS.get((key, _normalize_precision(precision)))
+    return pool.stats() if pool else None
+
+
+def synthesis_params(precision: Optional[str] = None) -> dict:
+    """Settings that affect synthesized audio, for keying output caches."""
+    return {
+        "model": MODEL_NAME,
+        "precision": _normalize_precision(precision),
+        "reference_max_seconds": REFERENCE_MAX_SECONDS if REFERENCE_PREPROCESS else None,
+        "crossfade_ms": CROSSFADE_MS,
+        "min_chunk_chars": MIN_CHUNK_CHARS,
+    }
 
 
-def clone_voice(text: str, speaker_wav: str, language: str, output: str, device: Optional[str] = None) -> None:
+def prepare_voice(speaker_wav: str, device: Optional[str] = None, precision: Optional[str] = None) -> str:
+    """Compute and cache the conditioning for a reference; return its audio hash.
+
+    For a registered voice (a file directly in VOICES_DIR) the latents are also
+    persisted to VOICE_LATENTS_DIR, so later requests skip conditioning even
+    after a restart or an LRU eviction.
+    """
+    if not os.path.isfile(speaker_wav):
+        raise FileNotFoundError(f"Reference voice file not found: {speaker_wav}")
+    key = _service_key(device, precision)
+    if WORKER_PROCESSES:
+        return _process_pool(key).call("prepare", speaker_wav=speaker_wav)
+    with acquire_service(*key) as svc:
+        svc.get_conditioning_latents(speaker_wav)
+        return svc.reference_hash(speaker_wav)
+
+
+def _synthesize_chunk(key: tuple, text: str, speaker_wav: str, language: str):
+    """Synthesize one chunk on a free replica (or via the batcher); return (wav, sample_rate, timings)."""
+    if WORKER_PROCESSES:
+        return _process_pool(key).call("synthesize", text=text, speaker_wav=speaker_wav, language=language)
+    if BATCH_MAX_SIZE > 1:
+        return _batcher_for(key).submit(text, speaker_wav, language)
+    timings: dict = {}
+    with acquire_service(*key) as svc:
+        wav = svc.synthesize(text=text, speaker_wav=speaker_wav, language=language, timings=timings)
+        return wav, svc.output_sample_rate, timings
+
+
+def _record_synthesis(audio_seconds: float, wall_seconds: float) -> None:
+    SYNTHESIS_AUDIO_SECONDS.inc(audio_seconds)
+    SYNTHESIS_WALL_SECONDS.inc(wall_seconds)
+    if audio_seconds > 0:
+        SYNTHESIS_RTF.observe(wall_seconds / audio_seconds)
+
+
+def synthesize(
+    text: str,
+    speaker_wav: str,
+    language: str,
+    device: Optional[str] = None,
+    precision: Optional[str] = None,
+    timings: Optional[dict] = None,
+):
+    """Synthesize text and return (waveform, sample_rate).
+
+    Text that splits into several sentence chunks is synthesized chunk by chunk
+    in parallel across replicas (or worker processes); results are joined in input order.
+    Per-stage seconds, summed over chunks, are added to `timings` when given.
+    """
+    if not os.path.isfile(speaker_wav):
+        raise FileNotFoundError(f"Reference voice file not found: {speaker_wav}")
+    key = _service_key(device, precision)
+    started = time.perf_counter()
+    chunks = split_text(text, language, min_chars=MIN_CHUNK_CHARS)
+    if len(chunks) <= 1:
+        wav, sample_rate, chunk_timings = _synthesize_chunk(key, text, speaker_wav, language)
+        _merge_timings(timings, chunk_timings)
+    else:
+        workers = min(len(chunks), WORKER_PROCESSES or MODEL_REPLICAS * BATCH_MAX_SIZE)
+        print(f"[INFO] Long text: {len(chunks)} chunks on {workers} workers", flush=True)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chunk") as pool:
+            # map() yields in submission order, so output order is deterministic
+            results = list(pool.map(lambda chunk: _synthesize_chunk(key, chunk, speaker_wav, language), chunks))
+        sample_rate = results[0][1]
+        for _, _, chunk_timings in results:
+            _merge_timings(timings, chunk_timings)
+        fade = int(sample_rate * CROSSFADE_MS / 1000.0)
+        wav = crossfade_concat([r[0] for r in results], fade)
+    _record_synthesis(len(wav) / sample_rate, time.perf_counter() - started)
+    return wav, sample_rate
+
+
+def clone_voice(
+    text: str,
+    speaker_wav: str,
+    language: str,
+    output: str,
+    device: Optional[str] = None,
+    precision: Optional[str] = None,
+    timings: Optional[dict] = None,
+) -> None:
     """Clone a voice using a cached XTTS v2 model and synthesize text to a WAV file.
 
     This function is thread-safe and reuses a single model instance per device
-    across repeated calls in the same process (e.g., a Flask app).
+    across repeated calls in the same process (e.g., a Flask app). With
+    micro-batching enabled, concurrent calls are synthesized together. Pass a
+    dict as `timings` to receive conditioning/generation/vocoding/write seconds.
     """
-    svc = get_service(device)
-    svc.tts_to_file(text=text, speaker_wav=speaker_wav, language=language, file_path=output)
+    print(f"[INFO] Generating audio => {output}", flush=True)
+    wav, sample_rate = synthesize(text, speaker_wav, language, device, precision, timings)
+    started = time.perf_counter()
+    write_wav(output, wav, sample_rate)
+    _add_timing(timings, "write", started)
     print("[SUCCESS] Done.")
 
 
+def stream_voice(
+    text: str,
+    speaker_wav: str,
+    language: str,
+    device: Optional[str] = None,
+    precision: Optional[str] = None,
+):
+    """Start streaming synthesis; return (sample_rate, iterator of float32 chunks)."""
+    if not os.path.isfile(speaker_wav):
+        raise FileNotFoundError(f"Reference voice file not found: {speaker_wav}")
+    if WORKER_PROCESSES:
+        return _process_pool(_service_key(device, precision)).stream(text=text, speaker_wav=speaker_wav, language=language)
+    svc = get_service(device, precision)
+    return svc.output_sample_rate, svc.synthesize_stream(text=text, speaker_wav=speaker_wav, language=language)
+
+
+def stream_to_file(
+    text: str,
+    speaker_wav: str,
+    language: str,
+    output: str,
+    device: Optional[str] = None,
+    precision: Optional[str] = None,
+) -> None:
+    """Stream synthesis into a WAV file, appending each chunk as it is vocoded."""
+    started = time.perf_counter()
+    sample_rate, chunks = stream_voice(text, speaker_wav, language, device, precision)
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    print(f"[INFO] Streaming audio => {output}", flush=True)
+    first_chunk_ms = None
+    with wave.open(output, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        for chunk in chunks:
+            if first_chunk_ms is None:
+                first_chunk_ms = (time.perf_counter() - started) * 1000
+            # Peak level is unknown until the end, so chunks are clipped rather than normalized
+            wf.writeframes(to_pcm16(chunk, normalize=False).tobytes())
+    if first_chunk_ms is not None:
+        print(f"[INFO] First chunk written after {first_chunk_ms:.0f} ms", flush=True)
+    print("[SUCCESS] Done.")
+
+
+def synthesize_manifest(
+    path: str,
+    language: str = "en",
+    speaker_wav: Optional[str] = None,
+    device: Optional[str] = None,
+    precision: Optional[str] = None,
+    workers: int = 0,
+) -> dict:
+    """Synthesize every row of a JSONL/CSV manifest with one loaded model; return a summary.
+
+    Rows need `text` and `output`; `language` and `speaker_wav` fall back to the
+    arguments. Rows whose output file already exists are skipped, so re-running
+    an interrupted manifest resumes it. `workers` defaults to one per replica slot.
+    """
+    items = load_manifest(path, language=language, speaker_wav=speaker_wav)
+    workers = workers or model_replicas() * BATCH_MAX_SIZE
+    print(f"[INFO] Manifest {path}: {len(items)} rows, {workers} workers", flush=True)
+    warm_model(device, precision)
+
+    def synth_row(item: dict, output: str, timings: dict) -> float:
+        wav, sample_rate = synthesize(item["text"], item["speaker_wav"], item["language"], device, precision, timings)
+        started = time.perf_counter()
+        write_wav(output, wav, sample_rate)
+        _add_timing(timings, "write", started)
+        return len(wav) / sample_rate
+
+    summary = run_manifest(items, synth_row, workers)
+    print_summary(summary)
+    return summary
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Clone a voice with Coqui TTS XTTS v2 and synthesize text to a WAV file.",
     )
-    parser.add_argument("--text", "-t", required=True, help="Text to synthesize.")
-    parser.add_argument("--speaker_wav", "-s", required=True, help="Path to the reference voice WAV file.")
+    parser.add_argument("--text", "-t", help="Text to synthesize.")
+    parser.add_argument(
+        "--manifest",
+        "-m",
+        help="JSONL or CSV file of rows (text, language, speaker_wav, output) to synthesize in one run.",
+    )
+    parser.add_argument(
+        "--speaker_wav",
+        "-s",
+        help="Path to the reference voice WAV file (manifest default when given with --manifest).",
+    )
     parser.add_argument("--language", "-l", default="en", help="Target language code (default: en).")
     parser.add_argument("--output", "-o", default="output.wav", help="Output WAV file path (default: output.wav).")
     parser.add_argument(
@@ -160,19 +1019,83 @@ def parse_args() -> argparse.Namespace:
         choices=["cpu", "cuda"],
         help="Execution device. Defaults to CUDA if available, otherwise CPU.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--precision",
+        choices=PRECISIONS,
+        help=(
+            "Inference precision (default: VC_PRECISION or fp32; with a daemon running, the daemon's). "
+            "int8-dynamic quantizes GPT/vocoder linear layers; CPU only."
+        ),
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write audio progressively as chunks are generated and report first-chunk latency.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Concurrent manifest rows (default: model replicas x batch size).",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Keep the model loaded and serve later CLI runs over a local socket until interrupted.",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Load the model in this process even if a daemon started with --serve is running.",
+    )
+    args = parser.parse_args()
+    if args.serve:
+        if args.text or args.manifest:
+            parser.error("--serve does not take --text or --manifest")
+        return args
+    if bool(args.text) == bool(args.manifest):
+        parser.error("exactly one of --text or --manifest is required")
+    if args.text and not args.speaker_wav:
+        parser.error("--speaker_wav is required with --text")
+    if args.manifest and args.stream:
+        parser.error("--stream cannot be combined with --manifest")
+    return args
 
 
 if __name__ == "__main__":
     args = parse_args()
     try:
-        clone_voice(
-            text=args.text,
-            speaker_wav=args.speaker_wav,
-            language=args.language,
-            output=args.output,
-            device=args.device,
-        )
+        if args.serve:
+            serve_daemon(args.device, args.precision)
+            sys.exit(0)
+        if args.manifest:
+            summary = synthesize_manifest(
+                args.manifest,
+                language=args.language,
+                speaker_wav=args.speaker_wav,
+                device=args.device,
+                precision=args.precision,
+                workers=args.workers,
+            )
+            sys.exit(1 if summary["failed"] else 0)
+        request = {
+            "text": args.text,
+            # The daemon has its own working directory
+            "speaker_wav": os.path.abspath(args.speaker_wav),
+            "language": args.language,
+            "output": os.path.abspath(args.output),
+            "device": args.device,
+        }
+        if args.precision:
+            # Left out when unset, so a daemon applies its own
+            request["precision"] = args.precision
+        op = "stream" if args.stream else "clone"
+        if args.no_daemon or forward_to_daemon(op, **request) is None:
+            request.setdefault("precision", DEFAULT_PRECISION)
+            synth = stream_to_file if args.stream else clone_voice
+            synth(**request)
+        else:
+            print(f"[SUCCESS] Done => {args.output}")
     except Exception as e:
         print(f"[ERROR] {e}", file=sys.stderr)
         sys.exit(1)
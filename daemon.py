@@ -0,0 +1,157 @@
+"""
+Resident model daemon for the clone_voice.py CLI.
+- `clone_voice.py --serve` loads the model once and serves requests on a local Unix socket
+- The normal CLI forwards to the daemon when one is running and falls back to loading
+  the model in-process otherwise
+- The socket lives in a per-user 0700 directory, and connections are authenticated with
+  a random key stored next to it (readable by the owner only)
+- Each connection is handled on its own thread; concurrency is bounded by the model replicas
+"""
+
+import os
+import signal
+import sys
+import tempfile
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Optional
+
+from worker_pool import _PASSTHROUGH_ERRORS, _rebuild_error
+
+# Unix domain sockets are not available to multiprocessing on Windows
+SUPPORTED = sys.platform != "win32"
+
+
+def _default_socket_path() -> str:
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    return os.path.join(base, f"voice-clone-{user}", "daemon.sock")
+
+
+SOCKET_PATH = os.environ.get("VC_DAEMON_SOCKET") or _default_socket_path()
+
+
+def _key_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".key"
+
+
+def connect(path: str = SOCKET_PATH):
+    """Return a connection to a running daemon, or None when none is reachable."""
+    if not SUPPORTED or not os.path.exists(path):
+        return None
+    try:
+        with open(_key_path(path), "rb") as f:
+            authkey = f.read()
+        return Client(path, family="AF_UNIX", authkey=authkey)
+    except (OSError, EOFError, AuthenticationError):
+        return None
+
+
+def request(conn, op: str, **kwargs):
+    """Send one request over a daemon connection and return its result."""
+    conn.send({"op": op, "kwargs": kwargs})
+    try:
+        msg = conn.recv()
+    except (EOFError, OSError):
+        raise RuntimeError("Model daemon closed the connection.")
+    if not msg.get("ok"):
+        raise _rebuild_error(msg.get("type", ""), msg.get("error", "Daemon error"))
+    return msg.get("result")
+
+
+def forward(op: str, path: str = SOCKET_PATH, **kwargs) -> Optional[dict]:
+    """Run `op` on the daemon if one is running; return its result, or None to run locally."""
+    conn = connect(path)
+    if conn is None:
+        return None
+    with conn:
+        print(f"[INFO] Using model daemon at {path}", flush=True)
+        return request(conn, op, **kwargs)
+
+
+# ---------------- daemon process ---------------- #
+def _dispatch(cv, op: str, kwargs: dict, device: Optional[str], precision: Optional[str]):
+    # Options the client left unset fall back to the daemon's own
+    kwargs = {k: v for k, v in kwargs.items() if v is not None}
+    kwargs.setdefault("device", device)
+    kwargs.setdefault("precision", precision)
+    if op == "clone":
+        timings: dict = {}
+        cv.clone_voice(timings=timings, **kwargs)
+        return {"timings": timings}
+    if op == "stream":
+        cv.stream_to_file(**kwargs)
+        return {}
+    if op == "ping":
+        return {"pid": os.getpid(), "loaded": cv.is_model_loaded(kwargs["device"], kwargs["precision"])}
+    raise ValueError(f"Unknown daemon operation: {op}")
+
+
+def _handle(conn, device: Optional[str], precision: Optional[str]) -> None:
+    import clone_voice as cv
+
+    with conn:
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                return
+            try:
+                result = _dispatch(cv, msg.get("op"), msg.get("kwargs") or {}, device, precision)
+                reply = {"ok": True, "result": result}
+            except Exception as e:
+                print(f"[ERROR] {e}", flush=True)
+                name = type(e).__name__
+                reply = {"ok": False, "type": name if name in _PASSTHROUGH_ERRORS else "", "error": str(e)}
+            try:
+                conn.send(reply)
+            except (EOFError, OSError):
+                return
+
+
+def serve(device: Optional[str] = None, precision: Optional[str] = None, path: str = SOCKET_PATH) -> None:
+    """Load the model and serve CLI requests on `path` until interrupted."""
+    import clone_voice as cv
+
+    if not SUPPORTED:
+        raise RuntimeError("Daemon mode needs Unix domain sockets, which are not available on this platform.")
+    existing = connect(path)
+    if existing is not None:
+        existing.close()
+        raise RuntimeError(f"A model daemon is already running at {path}")
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)  # stale socket from a daemon that did not shut down cleanly
+    authkey = os.urandom(32)
+    fd = os.open(_key_path(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(authkey)
+
+    cv.warm_model(device, precision)
+    listener = Listener(path, family="AF_UNIX", authkey=authkey)
+    os.chmod(path, 0o600)
+    # SIGTERM ends the accept loop the same way Ctrl+C does, so cleanup runs
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"[SUCCESS] Model daemon ready on {path} (pid {os.getpid()})", flush=True)
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError, AuthenticationError) as e:
+                # Failed handshake (wrong key, client gone); keep serving
+                print(f"[WARN] Rejected daemon connection: {e}", flush=True)
+                continue
+            threading.Thread(target=_handle, args=(conn, device, precision), name="daemon-conn", daemon=True).start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        for leftover in (path, _key_path(path)):
+            try:
+                os.remove(leftover)
+            except OSError:
+                pass
+        print("[INFO] Model daemon stopped.", flush=True)
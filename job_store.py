@@ -0,0 +1,586 @@
+"""
+Job registry for asynchronous clone jobs.
+- Pluggable store interface (JobStore) with in-memory and SQLite backends
+- Constant-time lookups and updates keyed by job id
+- Expiry-ordered storage reaped by a background thread (no per-request scans)
+- Per-job change notification for push-based progress (SSE), as blocking waits or
+  one-shot callbacks for event-loop servers
+- Monotonic start/end timestamps and durations recorded on every step transition
+"""
+
+import json
+from abc import ABC, abstractmethod
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+FINAL_STATUSES = ("done", "error")
+
+
+def _snapshot(job: dict) -> dict:
+    snap = dict(job)
+    snap["steps"] = [dict(st) for st in job["steps"]]
+    return snap
+
+
+def apply_step(step: dict, status: str, sub: Optional[str] = None, stages: Optional[dict] = None, now: Optional[float] = None) -> Optional[float]:
+    """Update a step dict in place, stamping time.monotonic() start/end times.
+
+    A step gets `started` when it first becomes active and `ended`/`duration`
+    when it is done or failed (a step finished without ever being active has
+    zero duration). Returns the duration when the step ended, else None.
+    """
+    now = time.monotonic() if now is None else now
+    step["status"] = status
+    if sub is not None:
+        step["sub"] = sub
+    if stages is not None:
+        step["stages"] = stages
+    if status == "active":
+        if step.get("started") is None:
+            step["started"] = now
+        return None
+    if status in FINAL_STATUSES:
+        if step.get("started") is None:
+            step["started"] = now
+        step["ended"] = now
+        step["duration"] = round(now - step["started"], 4)
+        return step["duration"]
+    return None
+
+
+class JobStore(ABC):
+    """Interface shared by job store backends.
+
+    Jobs are dicts with status, steps, error, audio_url, created and version
+    keys; every update bumps version so watchers can detect changes.
+    """
+
+    @abstractmethod
+    def add(self, job_id: str, job: dict) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def remove(self, job_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def set_step(self, job_id: str, idx: int, status: str, sub: Optional[str] = None, stages: Optional[dict] = None) -> Optional[float]:
+        """Update one step (see apply_step); returns its duration if it just ended."""
+
+    @abstractmethod
+    def set_status(self, job_id: str, status: str) -> None:
+        ...
+
+    @abstractmethod
+    def set_error(self, job_id: str, msg: str) -> None:
+        ...
+
+    @abstractmethod
+    def set_audio(self, job_id: str, audio_url: str) -> None:
+        ...
+
+    @abstractmethod
+    def wait_for_change(self, job_id: str, since: int, timeout: float):
+        """Wait until the job's version differs from `since`.
+
+        Returns None if the job does not exist, else (version, job), where job
+        is None if the wait timed out without a change.
+        """
+
+    @abstractmethod
+    def watch(self, job_id: str, callback) -> None:
+        """Call `callback()` once on the job's next local change or removal.
+
+        The callback runs on the updating thread with store locks held, so it
+        must only hand off (e.g. loop.call_soon_threadsafe). Changes made by
+        other processes do not fire it; callers poll for those.
+        """
+
+    @abstractmethod
+    def unwatch(self, job_id: str, callback) -> None:
+        """Drop a callback registered with watch() that has not fired."""
+
+    @staticmethod
+    def _fire(callbacks) -> None:
+        for callback in callbacks or ():
+            try:
+                callback()
+            except Exception as e:
+                print(f"[WARN] Job watcher failed: {e}")
+
+    @abstractmethod
+    def reap(self, now: Optional[float] = None) -> int:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+    @abstractmethod
+    def status_counts(self) -> dict:
+        """Number of jobs per status, cheap enough for frequent metric scrapes."""
+
+    def _reap_loop(self) -> None:
+        while True:
+            time.sleep(self.reap_interval)
+            try:
+                self.reap()
+            except Exception as e:
+                print(f"[WARN] Job reaper failed: {e}")
+
+    def start_reaper(self) -> None:
+        if getattr(self, "_reaper", None) is not None:
+            return
+        self._reaper = threading.Thread(target=self._reap_loop, name="job-reaper", daemon=True)
+        self._reaper.start()
+
+
+class MemoryJobStore(JobStore):
+    """In-process job registry.
+
+    Jobs are kept in creation order, which is also TTL expiry order, so the
+    reaper only looks at the oldest entries. Finished jobs are tracked in a
+    second ordered map so the MAX_JOBS overflow can drop the oldest finished
+    jobs without sorting.
+    """
+
+    def __init__(self, ttl_seconds: float, max_jobs: int, reap_interval: float = 30.0) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_jobs = max_jobs
+        self.reap_interval = reap_interval
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._events: dict[str, threading.Event] = {}
+        self._watchers: dict[str, list] = {}
+        # Jobs per status, maintained on every transition
+        self._status_counts: dict[str, int] = {}
+        self._reaper: Optional[threading.Thread] = None
+        self.reaped_expired = 0
+        self.reaped_overflow = 0
+
+    # ---- change notification (caller holds the lock) ----
+    def _count_locked(self, status: str, delta: int) -> None:
+        self._status_counts[status] = self._status_counts.get(status, 0) + delta
+
+    def _set_status_locked(self, job: dict, status: str) -> None:
+        if job["status"] != status:
+            self._count_locked(job["status"], -1)
+            self._count_locked(status, 1)
+            job["status"] = status
+
+    def _changed_locked(self, job_id: str, job: dict) -> None:
+        job["version"] = job.get("version", 0) + 1
+        if job["status"] in FINAL_STATUSES and job_id not in self._finished:
+            self._finished[job_id] = None
+        ev = self._events.pop(job_id, None)
+        if ev:
+            ev.set()
+        self._fire(self._watchers.pop(job_id, None))
+
+    def _drop_locked(self, job_id: str) -> None:
+        job = self._jobs.pop(job_id, None)
+        if job:
+            self._count_locked(job["status"], -1)
+        self._finished.pop(job_id, None)
+        ev = self._events.pop(job_id, None)
+        if ev:
+            ev.set()
+        self._fire(self._watchers.pop(job_id, None))
+
+    # ---- CRUD ----
+    def add(self, job_id: str, job: dict) -> None:
+        with self._lock:
+            self._drop_locked(job_id)
+            self._jobs[job_id] = job
+            self._count_locked(job["status"], 1)
+            if job["status"] in FINAL_STATUSES:
+                self._finished[job_id] = None
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a copy of the job, or None."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return _snapshot(job) if job else None
+
+    def remove(self, job_id: str) -> None:
+        with self._lock:
+            self._drop_locked(job_id)
+
+    def set_step(self, job_id: str, idx: int, status: str, sub: Optional[str] = None, stages: Optional[dict] = None) -> Optional[float]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return None
+            duration = apply_step(job["steps"][idx], status, sub, stages)
+            self._changed_locked(job_id, job)
+            return duration
+
+    def set_status(self, job_id: str, status: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                self._set_status_locked(job, status)
+                self._changed_locked(job_id, job)
+
+    def set_error(self, job_id: str, msg: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                self._set_status_locked(job, "error")
+                job["error"] = msg
+                self._changed_locked(job_id, job)
+
+    def set_audio(self, job_id: str, audio_url: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job["audio_url"] = audio_url
+                self._changed_locked(job_id, job)
+
+    def wait_for_change(self, job_id: str, since: int, timeout: float):
+        """Wait until the job's version differs from `since`.
+
+        Returns None if the job no longer exists, otherwise (version, job_copy)
+        where job_copy is None when the wait timed out without a change.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return None
+            if job["version"] != since:
+                return job["version"], _snapshot(job)
+            ev = self._events.setdefault(job_id, threading.Event())
+        ev.wait(timeout)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return None
+            if job["version"] != since:
+                return job["version"], _snapshot(job)
+            return since, None
+
+    def watch(self, job_id: str, callback) -> None:
+        with self._lock:
+            self._watchers.setdefault(job_id, []).append(callback)
+
+    def unwatch(self, job_id: str, callback) -> None:
+        with self._lock:
+            callbacks = self._watchers.get(job_id)
+            if callbacks and callback in callbacks:
+                callbacks.remove(callback)
+                if not callbacks:
+                    del self._watchers[job_id]
+
+    # ---- expiry ----
+    def reap(self, now: Optional[float] = None, batch: int = 1000) -> int:
+        """Drop expired jobs and finished overflow; locks are held per small batch."""
+        now = time.time() if now is None else now
+        removed = 0
+        while True:
+            with self._lock:
+                n = 0
+                while self._jobs and n < batch:
+                    jid, job = next(iter(self._jobs.items()))
+                    if now - job.get("created", now) <= self.ttl_seconds:
+                        break
+                    self._drop_locked(jid)
+                    self.reaped_expired += 1
+                    n += 1
+                while len(self._jobs) > self.max_jobs and self._finished and n < batch:
+                    jid = next(iter(self._finished))
+                    self._drop_locked(jid)
+                    self.reaped_overflow += 1
+                    n += 1
+            removed += n
+            if n < batch:
+                return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "jobs": len(self._jobs),
+                "finished": len(self._finished),
+                "watchers": len(self._events),
+                "reaped_expired": self.reaped_expired,
+                "reaped_overflow": self.reaped_overflow,
+            }
+
+    def status_counts(self) -> dict:
+        # dict() copies in one step under the GIL, so the store lock is not needed
+        return {status: n for status, n in dict(self._status_counts).items() if n}
+
+
+class SqliteJobStore(JobStore):
+    """Job registry in a SQLite database shared by several web worker processes.
+
+    The database runs in WAL mode so status reads never block writers. Lookups
+    go through the primary key; expiry and overflow use indexes on created and
+    (status, updated). Watchers in the same process are woken immediately;
+    changes made by other processes are picked up by a cheap version poll.
+    Every job records the process that owns it. Each process's reaper refreshes
+    the heartbeat of its own unfinished jobs, including ones still queued, and
+    only jobs whose heartbeat went stale (the owner died or was restarted
+    mid-synthesis) are marked as failed.
+    """
+
+    _SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            steps TEXT NOT NULL,
+            error TEXT,
+            audio_url TEXT,
+            created REAL NOT NULL,
+            updated REAL NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0,
+            owner TEXT,
+            heartbeat REAL
+        )""",
+        "CREATE INDEX IF NOT EXISTS jobs_created ON jobs(created)",
+        "CREATE INDEX IF NOT EXISTS jobs_status_updated ON jobs(status, updated)",
+        "CREATE INDEX IF NOT EXISTS jobs_owner ON jobs(owner)",
+    )
+    # Columns added after the first release, for databases created without them
+    _MIGRATIONS = (
+        ("owner", "ALTER TABLE jobs ADD COLUMN owner TEXT"),
+        ("heartbeat", "ALTER TABLE jobs ADD COLUMN heartbeat REAL"),
+    )
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float,
+        max_jobs: int,
+        reap_interval: float = 30.0,
+        stale_seconds: float = 300.0,
+        poll_interval: float = 0.25,
+    ) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_jobs = max_jobs
+        self.reap_interval = reap_interval
+        # Heartbeats are refreshed every reap_interval, so stale_seconds should be several of those
+        self.stale_seconds = stale_seconds
+        self.poll_interval = poll_interval
+        # Unique per process start, so a restarted process reusing a pid does not adopt old jobs
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._local = threading.local()
+        self._events: dict[str, threading.Event] = {}
+        self._watchers: dict[str, list] = {}
+        self._events_lock = threading.Lock()
+        self._reaper = None
+        self.reaped_expired = 0
+        self.reaped_overflow = 0
+        self.reaped_stale = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute(self._SCHEMA[0])
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, stmt in self._MIGRATIONS:
+                if column not in columns:
+                    conn.execute(stmt)
+            for stmt in self._SCHEMA[1:]:
+                conn.execute(stmt)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row_to_job(row) -> dict:
+        status, steps, error, audio_url, created, version = row
+        return {
+            "status": status,
+            "steps": json.loads(steps),
+            "error": error,
+            "audio_url": audio_url,
+            "created": created,
+            "version": version,
+        }
+
+    def _notify(self, job_id: str) -> None:
+        with self._events_lock:
+            ev = self._events.pop(job_id, None)
+            self._fire(self._watchers.pop(job_id, None))
+        if ev:
+            ev.set()
+
+    def watch(self, job_id: str, callback) -> None:
+        with self._events_lock:
+            self._watchers.setdefault(job_id, []).append(callback)
+
+    def unwatch(self, job_id: str, callback) -> None:
+        with self._events_lock:
+            callbacks = self._watchers.get(job_id)
+            if callbacks and callback in callbacks:
+                callbacks.remove(callback)
+                if not callbacks:
+                    del self._watchers[job_id]
+
+    def _update(self, job_id: str, mutate) -> None:
+        """Read-modify-write one job inside an IMMEDIATE transaction."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT status, steps, error, audio_url, created, version FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return
+            job = self._row_to_job(row)
+            mutate(job)
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = ?, steps = ?, error = ?, audio_url = ?, updated = ?, heartbeat = ?, "
+                "version = version + 1 WHERE id = ?",
+                (job["status"], json.dumps(job["steps"]), job["error"], job["audio_url"], now, now, job_id),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._notify(job_id)
+
+    def add(self, job_id: str, job: dict) -> None:
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO jobs (id, status, steps, error, audio_url, created, updated, version, owner, heartbeat) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                job_id, job["status"], json.dumps(job["steps"]), job["error"], job["audio_url"],
+                job.get("created", now), now, job.get("version", 0), self.owner, now,
+            ),
+        )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        row = self._conn().execute(
+            "SELECT status, steps, error, audio_url, created, version FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def remove(self, job_id: str) -> None:
+        self._conn().execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        self._notify(job_id)
+
+    def set_step(self, job_id: str, idx: int, status: str, sub: Optional[str] = None, stages: Optional[dict] = None) -> Optional[float]:
+        result = []
+
+        def mutate(job):
+            result.append(apply_step(job["steps"][idx], status, sub, stages))
+        self._update(job_id, mutate)
+        return result[0] if result else None
+
+    def set_status(self, job_id: str, status: str) -> None:
+        self._update(job_id, lambda job: job.update(status=status))
+
+    def set_error(self, job_id: str, msg: str) -> None:
+        self._update(job_id, lambda job: job.update(status="error", error=msg))
+
+    def set_audio(self, job_id: str, audio_url: str) -> None:
+        self._update(job_id, lambda job: job.update(audio_url=audio_url))
+
+    def wait_for_change(self, job_id: str, since: int, timeout: float):
+        deadline = time.monotonic() + timeout
+        ev = None
+        try:
+            while True:
+                job = self.get(job_id)
+                if job is None:
+                    return None
+                if job["version"] != since:
+                    return job["version"], job
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return since, None
+                with self._events_lock:
+                    ev = self._events.setdefault(job_id, threading.Event())
+                ev.wait(min(self.poll_interval, remaining))
+        finally:
+            # Jobs changed only by other processes never reach _notify here, so the
+            # waiter drops its event itself; any other waiter falls back to polling
+            if ev is not None:
+                with self._events_lock:
+                    if self._events.get(job_id) is ev:
+                        del self._events[job_id]
+
+    def reap(self, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        conn = self._conn()
+        expired = conn.execute("DELETE FROM jobs WHERE created < ?", (now - self.ttl_seconds,)).rowcount
+        # Jobs this process still runs or holds in its queue stay alive however long they take
+        conn.execute(
+            "UPDATE jobs SET heartbeat = ? WHERE owner = ? AND status NOT IN ('done', 'error')",
+            (now, self.owner),
+        )
+        stale = conn.execute(
+            "UPDATE jobs SET status = 'error', error = 'Job interrupted (server restarted or worker lost).', "
+            "updated = ?, version = version + 1 WHERE status NOT IN ('done', 'error') AND COALESCE(heartbeat, updated) < ?",
+            (now, now - self.stale_seconds),
+        ).rowcount
+        total = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        overflow = 0
+        if total > self.max_jobs:
+            overflow = conn.execute(
+                "DELETE FROM jobs WHERE id IN (SELECT id FROM jobs WHERE status IN ('done', 'error') ORDER BY updated LIMIT ?)",
+                (total - self.max_jobs,),
+            ).rowcount
+        self.reaped_expired += expired
+        self.reaped_stale += stale
+        self.reaped_overflow += overflow
+        return expired + overflow
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        jobs = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        finished = conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('done', 'error')").fetchone()[0]
+        with self._events_lock:
+            watchers = len(self._events)
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "owner": self.owner,
+            "jobs": jobs,
+            "finished": finished,
+            "watchers": watchers,
+            "reaped_expired": self.reaped_expired,
+            "reaped_overflow": self.reaped_overflow,
+            "reaped_stale": self.reaped_stale,
+        }
+
+    def status_counts(self) -> dict:
+        # Served from the (status, updated) index on this thread's connection; WAL
+        # readers never wait for writers.
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+
+def create_job_store(backend: str, ttl_seconds: float, max_jobs: int, reap_interval: float = 30.0, path: Optional[str] = None) -> JobStore:
+    """Build the configured job store ("memory" or "sqlite")."""
+    backend = (backend or "memory").strip().lower()
+    if backend == "memory":
+        return MemoryJobStore(ttl_seconds, max_jobs, reap_interval)
+    if backend == "sqlite":
+        if not path:
+            raise ValueError("The sqlite job store needs a database path.")
+        return SqliteJobStore(path, ttl_seconds, max_jobs, reap_interval)
+    raise ValueError(f"Unknown job store backend: {backend}")
@@ -0,0 +1,127 @@
+"""
+Speaker conditioning cache for XTTS v2.
+- Keys conditioning by a SHA-256 of the decoded reference audio
+- Keeps a bounded in-memory LRU of (gpt_cond_latent, speaker_embedding) pairs
+- Optionally persists entries to a disk store so restarts stay warm
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+Conditioning = Tuple[Any, Any]
+
+
+def hash_audio(samples: Any, sample_rate: int) -> str:
+    """Return a stable content hash for decoded audio samples.
+
+    Accepts a torch tensor or NumPy array; the hash covers the float32 sample
+    bytes plus the sample rate, so the same voice encoded in different
+    containers resolves to the same key.
+    """
+    if hasattr(samples, "detach"):
+        samples = samples.detach().cpu().numpy()
+    data = samples.astype("float32", copy=False).tobytes()
+    h = hashlib.sha256()
+    h.update(str(int(sample_rate)).encode("ascii"))
+    h.update(data)
+    return h.hexdigest()
+
+
+class LatentCache:
+    """Thread-safe LRU of speaker conditioning with an optional disk store."""
+
+    def __init__(self, max_entries: int = 64, disk_dir: Optional[str] = None) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[str, Conditioning]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir or "", f"{key}.pt")
+
+    def _remember(self, key: str, value: Conditioning) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str, device: Optional[str] = None) -> Optional[Conditioning]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+        value = self._load_from_disk(key, device)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: Conditioning) -> None:
+        with self._lock:
+            self._remember(key, value)
+        self._save_to_disk(key, value)
+
+    def _load_from_disk(self, key: str, device: Optional[str]) -> Optional[Conditioning]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        if not os.path.isfile(path):
+            return None
+        try:
+            import torch
+            data = torch.load(path, map_location=device or "cpu")
+            return data["gpt_cond_latent"], data["speaker_embedding"]
+        except Exception as e:
+            print(f"[WARN] Could not read cached conditioning {path}: {e}")
+            return None
+
+    def _save_to_disk(self, key: str, value: Conditioning) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        if os.path.isfile(path):
+            return
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            import torch
+            gpt_cond_latent, speaker_embedding = value
+            torch.save(
+                {
+                    "gpt_cond_latent": gpt_cond_latent.detach().cpu(),
+                    "speaker_embedding": speaker_embedding.detach().cpu(),
+                },
+                tmp_path,
+            )
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[WARN] Could not persist conditioning {path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "disk_dir": self.disk_dir,
+            }
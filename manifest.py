@@ -0,0 +1,181 @@
+"""
+Batch manifests for the clone_voice.py CLI.
+- Reads JSONL or CSV/TSV rows with text, language, speaker_wav and output fields
+- Resolves relative paths against the manifest's directory and validates every row before synthesis
+- Runs rows on a thread pool against the already-loaded model; further rows for a speaker
+  are queued only after its first row has filled the conditioning cache
+- Skips rows whose output already exists, and writes through a temporary file, so an
+  interrupted run can simply be restarted
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+FIELDS = ("text", "language", "speaker_wav", "output")
+# Validation problems listed before giving up, so large manifests fail readably
+MAX_REPORTED_PROBLEMS = 10
+
+
+def _read_rows(path: str):
+    """Yield (line_number, row_dict) from a JSONL, CSV or TSV manifest."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if ext in (".csv", ".tsv"):
+            reader = csv.DictReader(f, delimiter="\t" if ext == ".tsv" else ",")
+            for row in reader:
+                yield reader.line_num, {k.strip(): v for k, v in row.items() if k}
+            return
+        for line_num, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_num}: invalid JSON ({e.msg})") from None
+            if not isinstance(row, dict):
+                raise ValueError(f"{path}:{line_num}: expected a JSON object")
+            yield line_num, row
+
+
+def load_manifest(path: str, language: str = "en", speaker_wav: Optional[str] = None) -> list:
+    """Read and validate a manifest; return a list of row dicts.
+
+    `language` and `speaker_wav` fill rows that leave those fields empty. Relative
+    paths in the manifest are taken relative to the manifest file. Raises
+    ValueError listing the first problems found.
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Manifest not found: {path}")
+    base = os.path.dirname(os.path.abspath(path))
+
+    def resolve(value: str) -> str:
+        return os.path.normpath(os.path.join(base, os.path.expanduser(value)))
+
+    items, problems, outputs = [], [], {}
+    for line_num, row in _read_rows(path):
+        values = {k: str(row.get(k) or "").strip() for k in FIELDS}
+        item = {
+            "line": line_num,
+            "text": values["text"],
+            "language": values["language"] or language,
+            "speaker_wav": resolve(values["speaker_wav"]) if values["speaker_wav"] else speaker_wav,
+            "output": resolve(values["output"]) if values["output"] else "",
+        }
+        if not item["text"]:
+            problems.append(f"line {line_num}: empty text")
+        if not item["output"]:
+            problems.append(f"line {line_num}: missing output")
+        elif item["output"] in outputs:
+            problems.append(f"line {line_num}: output {item['output']} already used on line {outputs[item['output']]}")
+        else:
+            outputs[item["output"]] = line_num
+        if not item["speaker_wav"]:
+            problems.append(f"line {line_num}: missing speaker_wav")
+        elif not os.path.isfile(item["speaker_wav"]):
+            problems.append(f"line {line_num}: reference voice file not found: {item['speaker_wav']}")
+        items.append(item)
+
+    if problems:
+        shown = "\n  ".join(problems[:MAX_REPORTED_PROBLEMS])
+        more = f"\n  ... and {len(problems) - MAX_REPORTED_PROBLEMS} more" if len(problems) > MAX_REPORTED_PROBLEMS else ""
+        raise ValueError(f"Invalid manifest {path}:\n  {shown}{more}")
+    if not items:
+        raise ValueError(f"Manifest {path} has no rows")
+    return items
+
+
+def _is_done(output: str) -> bool:
+    try:
+        return os.path.getsize(output) > 0
+    except OSError:
+        return False
+
+
+def run_manifest(items: list, synth: Callable, workers: int) -> dict:
+    """Synthesize manifest rows with `workers` threads; return a summary dict.
+
+    `synth(item, output_path, timings)` writes the audio for one row to
+    `output_path` and returns its duration in seconds. Rows whose output already
+    exists are skipped. Failures are reported and counted without stopping the run.
+    """
+    pending = [item for item in items if not _is_done(item["output"])]
+    skipped = len(items) - len(pending)
+    if skipped:
+        print(f"[INFO] Skipping {skipped} row(s) with existing output", flush=True)
+
+    # Rows grouped by reference file, in manifest order
+    groups: "OrderedDict[str, list]" = OrderedDict()
+    for item in pending:
+        groups.setdefault(item["speaker_wav"], []).append(item)
+
+    lock = threading.Lock()
+    summary = {"rows": len(items), "skipped": skipped, "done": 0, "failed": 0, "audio_seconds": 0.0}
+    stage_totals: dict = {}
+    total = len(pending)
+    started = time.perf_counter()
+
+    def run_one(item: dict) -> None:
+        output = item["output"]
+        partial = f"{output}.part"
+        timings: dict = {}
+        item_started = time.perf_counter()
+        try:
+            audio_s = synth(item, partial, timings)
+            os.replace(partial, output)
+        except Exception as e:
+            with lock:
+                summary["failed"] += 1
+            print(f"[ERROR] line {item['line']} ({output}): {e}", flush=True)
+            try:
+                os.remove(partial)
+            except OSError:
+                pass
+            return
+        elapsed = time.perf_counter() - item_started
+        with lock:
+            summary["done"] += 1
+            summary["audio_seconds"] += audio_s
+            for stage, seconds in timings.items():
+                stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+            finished = summary["done"] + summary["failed"]
+        print(f"[INFO] [{finished}/{total}] {output} ({audio_s:.1f} s audio in {elapsed:.1f} s)", flush=True)
+
+    def run_group(pool: ThreadPoolExecutor, group: list) -> list:
+        # The first row computes (and caches) the speaker conditioning; the rest reuse it
+        run_one(group[0])
+        return [pool.submit(run_one, item) for item in group[1:]]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="manifest") as pool:
+        leaders = [pool.submit(run_group, pool, group) for group in groups.values()]
+        for future in leaders:
+            for follower in future.result():
+                follower.result()
+
+    wall = time.perf_counter() - started
+    summary["wall_seconds"] = wall
+    summary["stage_seconds"] = stage_totals
+    return summary
+
+
+def print_summary(summary: dict) -> None:
+    wall = summary["wall_seconds"]
+    audio = summary["audio_seconds"]
+    status = "[SUCCESS]" if not summary["failed"] else "[WARN]"
+    print(
+        f"{status} Manifest finished: {summary['done']} synthesized, {summary['skipped']} skipped, "
+        f"{summary['failed']} failed of {summary['rows']} rows in {wall:.1f} s"
+    )
+    if summary["done"] and wall > 0:
+        print(
+            f"[INFO] Throughput: {summary['done'] / wall:.2f} rows/s, {audio / wall:.2f} audio s per wall s "
+            f"({audio:.1f} s of audio)"
+        )
+        stages = ", ".join(f"{k} {v / summary['done']:.2f} s" for k, v in sorted(summary["stage_seconds"].items()))
+        if stages:
+            print(f"[INFO] Mean stage time per row: {stages}")
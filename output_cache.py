@@ -0,0 +1,185 @@
+"""
+Content-addressed cache of synthesized WAV files.
+- Keys on normalized text, language, reference audio hash and synthesis parameters
+- Stores entries as <key>.wav in one directory, hard-linked from the job output when possible
+- Evicts least recently used entries once the byte budget is exceeded, along with any
+  FLAC/Opus variants encoded next to them
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+from audio_io import OUTPUT_FORMATS
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of the input text (XTTS lower-cases text before tokenizing)."""
+    text = unicodedata.normalize("NFC", text)
+    return " ".join(text.split()).lower()
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class OutputCache:
+    """Size-bounded LRU of output WAVs stored on disk."""
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.enabled:
+            os.makedirs(directory, exist_ok=True)
+            self._load_index()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(text: str, language: str, reference_hash: str, params: dict) -> str:
+        payload = json.dumps(
+            {
+                "text": normalize_text(text),
+                "language": language.strip().lower(),
+                "reference": reference_hash,
+                "params": params,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def filename(self, key: str) -> str:
+        return f"{key}.wav"
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, self.filename(key))
+
+    def _load_index(self) -> None:
+        # One scan at startup; afterwards the index is maintained in memory
+        found = []
+        variants = []
+        extensions = {ext for _, ext in OUTPUT_FORMATS.values()} - {".wav"}
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            stem, ext = os.path.splitext(entry.name)
+            if ext == ".wav":
+                st = entry.stat()
+                found.append((st.st_mtime, stem, st.st_size))
+            elif ext in extensions:
+                variants.append((stem, entry.stat().st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._bytes += size
+        for key, size in variants:
+            if key in self._entries:
+                self._entries[key] += size
+                self._bytes += size
+        self._evict_locked()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached file path for `key` or None, counting hit/miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if key in self._entries and os.path.isfile(self.path(key)):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self.path(key)
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, source_path: str) -> Optional[str]:
+        """Store `source_path` under `key` (hard link, or copy across devices)."""
+        if not self.enabled or not os.path.isfile(source_path):
+            return None
+        dest = self.path(key)
+        tmp = f"{dest}.{threading.get_ident()}.tmp"
+        try:
+            try:
+                os.link(source_path, tmp)
+            except OSError:
+                shutil.copyfile(source_path, tmp)
+            os.replace(tmp, dest)
+        except OSError as e:
+            print(f"[WARN] Could not cache output {source_path}: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return None
+        size = os.path.getsize(dest)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)
+            self._entries[key] = size
+            self._bytes += size
+            self._evict_locked()
+        return dest
+
+    def add_variant(self, path: str) -> None:
+        """Account for an encoded copy (FLAC/Opus) of a cached output.
+
+        The copy is charged to its entry and removed with it on eviction; a copy
+        whose entry was evicted while it was being encoded is deleted.
+        """
+        key = os.path.splitext(os.path.basename(path))[0]
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] += size
+                self._bytes += size
+                self._evict_locked()
+                return
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict_locked(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            base = os.path.join(self.directory, key)
+            for _, ext in OUTPUT_FORMATS.values():
+                try:
+                    os.remove(base + ext)
+                except OSError:
+                    pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,145 @@
+"""
+Content-addressed store for uploaded reference clips.
+- Streams uploads in chunks while hashing them (SHA-256 of the file bytes)
+- Stores each distinct clip once as <sha256>.<ext>; a repeated upload writes nothing new
+- Holds each clip in the storage manager while a request uses it, so quota and TTL
+  eviction (storage.py) never remove a clip that is still needed
+- The hash doubles as the reference key for downstream caches
+"""
+
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+from typing import BinaryIO, Optional, Tuple
+
+from storage import StorageManager
+
+_NAME = re.compile(r"^([0-9a-f]{64})\.([a-z0-9]+)$")
+STORAGE_CLASS = "uploads"
+
+
+class ReferenceStore:
+    """Directory of reference clips named by content hash."""
+
+    def __init__(
+        self,
+        directory: str,
+        storage: Optional[StorageManager] = None,
+        chunk_size: int = 256 * 1024,
+        spool_bytes: int = 8 * 1024 * 1024,
+    ) -> None:
+        self.directory = directory
+        self.storage = storage
+        self.chunk_size = chunk_size
+        # Uploads up to this size are hashed in memory, so a duplicate never touches disk
+        self.spool_bytes = spool_bytes
+        self._lock = threading.Lock()
+        self._paths: dict = {}  # sha256 -> path
+        self.uploads = 0
+        self.dedupe_hits = 0
+        self.bytes_written = 0
+        self.bytes_deduped = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        for entry in os.scandir(self.directory):
+            m = _NAME.match(entry.name)
+            if m and entry.is_file():
+                self._paths[m.group(1)] = entry.path
+
+    def forget(self, path: str) -> None:
+        """Drop a clip deleted by the storage manager from the hash index."""
+        m = _NAME.match(os.path.basename(path))
+        if m:
+            with self._lock:
+                if self._paths.get(m.group(1)) == path:
+                    del self._paths[m.group(1)]
+
+    def _hold(self, path: str) -> None:
+        if self.storage is not None:
+            self.storage.hold(path)
+
+    def save(self, stream: BinaryIO, filename: str) -> Tuple[str, str]:
+        """Store an upload stream and take a hold on it; return (sha256, path).
+
+        The caller must call release(path) once the clip is no longer needed.
+        """
+        ext = os.path.splitext(filename)[1].lower().lstrip(".") or "bin"
+        h = hashlib.sha256()
+        buffer = io.BytesIO()
+        spill = None  # named temp file once the upload outgrows the memory buffer
+        size = 0
+        try:
+            while True:
+                block = stream.read(self.chunk_size)
+                if not block:
+                    break
+                h.update(block)
+                size += len(block)
+                if spill is None and size > self.spool_bytes:
+                    spill = tempfile.NamedTemporaryFile(dir=self.directory, suffix=".part", delete=False)
+                    spill.write(buffer.getvalue())
+                    buffer = None
+                if spill is not None:
+                    spill.write(block)
+                else:
+                    buffer.write(block)
+            digest = h.hexdigest()
+            with self._lock:
+                self.uploads += 1
+                path = self._paths.get(digest)
+                if path is not None:
+                    # Held before the existence check, so eviction cannot remove it in between
+                    self._hold(path)
+                    if os.path.isfile(path):
+                        self.dedupe_hits += 1
+                        self.bytes_deduped += size
+                        return digest, path
+                    self.release(path)
+                path = os.path.join(self.directory, f"{digest}.{ext}")
+                self._paths[digest] = path
+                self._hold(path)
+            try:
+                if spill is not None:
+                    spill.close()
+                    os.replace(spill.name, path)
+                    spill = None
+                else:
+                    tmp = f"{path}.{threading.get_ident()}.part"
+                    with open(tmp, "wb") as f:
+                        f.write(buffer.getbuffer())
+                    os.replace(tmp, path)
+            except OSError:
+                self.release(path)
+                raise
+            if self.storage is not None:
+                self.storage.add(path, STORAGE_CLASS)
+            with self._lock:
+                self.bytes_written += size
+            return digest, path
+        finally:
+            if spill is not None:
+                spill.close()
+                try:
+                    os.remove(spill.name)
+                except OSError:
+                    pass
+
+    def release(self, path: str) -> None:
+        """Drop the hold taken by save()."""
+        if self.storage is not None:
+            self.storage.release(path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "files": len(self._paths),
+                "uploads": self.uploads,
+                "dedupe_hits": self.dedupe_hits,
+                "bytes_written": self.bytes_written,
+                "bytes_deduped": self.bytes_deduped,
+            }
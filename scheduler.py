@@ -0,0 +1,361 @@
+"""
+Bounded job scheduler for synthesis work.
+- Fixed-size pool of worker threads (sized to the available model replicas)
+- Bounded queue with fast rejection once it is full, plus a per-client cap
+- Priority classes: interactive jobs run before batch jobs; a batch job that has waited
+  longer than its limit is served next, so batch work is delayed but never starved
+- Within a class, clients get fair shares of model time (start-time fair queuing on
+  estimated job cost), and each client's own jobs run shortest first
+- Reports queue positions so the UI can show where a job is waiting, and per-class wait times
+"""
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+# Dispatch order of the priority classes
+PRIORITIES = ("interactive", "batch")
+
+
+class QueueFull(Exception):
+    """Raised when the scheduler queue (or the client's share of it) is at capacity."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Server is busy. Please retry shortly.")
+        self.retry_after = retry_after
+
+
+class _Task:
+    __slots__ = ("job_id", "fn", "kwargs", "future", "enqueued", "priority", "client", "cost", "seq")
+
+    def __init__(self, job_id: str, fn: Callable[..., Any], kwargs: dict, priority: str, client: str, cost: float, seq: int) -> None:
+        self.job_id = job_id
+        self.fn = fn
+        self.kwargs = kwargs
+        self.future: Future = Future()
+        self.enqueued = time.monotonic()
+        self.priority = priority
+        self.client = client
+        self.cost = cost
+        self.seq = seq
+
+
+class _Client:
+    """A client's waiting jobs in one class, shortest first, and its virtual finish time."""
+
+    __slots__ = ("tasks", "finish")
+
+    def __init__(self) -> None:
+        self.tasks: list = []  # heap of (cost, seq, task)
+        self.finish = 0.0
+
+
+class _Class:
+    __slots__ = ("clients", "arrivals", "vtime", "dispatched", "wait_total", "wait_max")
+
+    def __init__(self) -> None:
+        self.clients: dict[str, _Client] = {}
+        self.arrivals: "OrderedDict[int, _Task]" = OrderedDict()  # waiting tasks, oldest first
+        self.vtime = 0.0  # start tag of the last dispatched task
+        self.dispatched = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+
+def _pick(clients: dict, vtime: float):
+    """Fair-queuing choice among clients: (name, start, finish) of the smallest finish tag."""
+    best = None
+    for name, client in clients.items():
+        if not client.tasks:
+            continue
+        cost, seq, _ = client.tasks[0]
+        start = max(vtime, client.finish)
+        key = (start + cost, seq)
+        if best is None or key < best[0]:
+            best = (key, name, start)
+    if best is None:
+        return None
+    return best[1], best[2], best[0][0]
+
+
+def _charge(clients: dict, vtime: float, task: _Task) -> float:
+    """Take `task` out of its client's queue out of turn and charge its cost; return the new vtime."""
+    client = clients[task.client]
+    client.tasks.remove((task.cost, task.seq, task))
+    heapq.heapify(client.tasks)
+    start = max(vtime, client.finish)
+    client.finish = start + task.cost
+    return start
+
+
+class JobScheduler:
+    """Thread pool with a bounded priority queue and queue-position callbacks.
+
+    `on_position(job_id, position)` is called for every waiting job whenever its
+    1-based queue position changes, including right after submission; positions
+    are the current dispatch order, which later arrivals may still change.
+    `on_dispatch(job_id, priority, wait_seconds)` is called when a job starts.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_queue: int,
+        on_position: Optional[Callable[[str, int], None]] = None,
+        max_per_client: int = 0,
+        batch_max_wait: float = 120.0,
+        on_dispatch: Optional[Callable[[str, str, float], None]] = None,
+    ) -> None:
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        # Waiting jobs one client may hold (0 = up to the whole queue)
+        self.max_per_client = max(0, int(max_per_client)) or self.max_queue
+        self.batch_max_wait = batch_max_wait
+        self._on_position = on_position
+        self._on_dispatch = on_dispatch
+        self._classes = {name: _Class() for name in PRIORITIES}
+        self._waiting = 0
+        self._per_client: dict[str, int] = {}
+        self._positions: dict[str, int] = {}  # job_id -> last reported position
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._running = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        # Exponential moving average of task run time, used for Retry-After
+        self._avg_run_seconds = 10.0
+
+    def _ensure_workers(self) -> None:
+        if self._threads:
+            return
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"synth-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def _retry_after_locked(self) -> int:
+        waiting = self._waiting + 1
+        return max(1, math.ceil(self._avg_run_seconds * waiting / self.workers))
+
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait before retrying."""
+        with self._cond:
+            return self._retry_after_locked()
+
+    def is_full(self) -> bool:
+        with self._cond:
+            return self._waiting >= self.max_queue
+
+    def submit(
+        self,
+        job_id: str,
+        fn: Callable[..., Any],
+        /,
+        *,
+        priority: str = "interactive",
+        client: str = "",
+        cost: float = 1.0,
+        **kwargs: Any,
+    ) -> Future:
+        """Queue `fn(**kwargs)` and return a Future, or raise QueueFull.
+
+        `job_id` and `fn` are positional-only, so `kwargs` may carry a `job_id` of its own.
+
+        `cost` is the job's estimated run time in any unit used consistently
+        (the web app uses text length); it orders a client's jobs shortest first
+        and is charged against the client's fair share.
+        """
+        if priority not in self._classes:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {', '.join(PRIORITIES)}")
+        with self._cond:
+            if self._waiting >= self.max_queue or self._per_client.get(client, 0) >= self.max_per_client:
+                self.rejected += 1
+                raise QueueFull(self._retry_after_locked())
+            self._ensure_workers()
+            task = _Task(job_id, fn, kwargs, priority, client, max(0.0, float(cost)), next(self._seq))
+            cls = self._classes[priority]
+            queue = cls.clients.get(client)
+            if queue is None:
+                queue = cls.clients[client] = _Client()
+            heapq.heappush(queue.tasks, (task.cost, task.seq, task))
+            cls.arrivals[task.seq] = task
+            self._waiting += 1
+            self._per_client[client] = self._per_client.get(client, 0) + 1
+            self.submitted += 1
+            changed = self._positions_changed_locked()
+            self._cond.notify()
+        self._notify_positions(changed)
+        return task.future
+
+    # ---------------- dispatch order ---------------- #
+    def _overdue(self, tasks, now: float):
+        """Batch tasks (oldest first) that have waited longer than batch_max_wait."""
+        for task in tasks:
+            if now - task.enqueued <= self.batch_max_wait:
+                return
+            yield task
+
+    def _pop_locked(self) -> _Task:
+        now = time.monotonic()
+        batch = self._classes["batch"]
+        for task in self._overdue(batch.arrivals.values(), now):
+            # The oldest batch job has waited long enough: it runs next, whatever
+            # its cost or its client's share; then the normal order resumes
+            batch.vtime = _charge(batch.clients, batch.vtime, task)
+            return self._dispatched_locked(batch, task, now)
+        for name in PRIORITIES:
+            cls = self._classes[name]
+            choice = _pick(cls.clients, cls.vtime)
+            if choice is None:
+                continue
+            client_name, start, finish = choice
+            client = cls.clients[client_name]
+            _, _, task = heapq.heappop(client.tasks)
+            client.finish = finish
+            cls.vtime = start
+            return self._dispatched_locked(cls, task, now)
+        raise RuntimeError("No waiting task")
+
+    def _dispatched_locked(self, cls: _Class, task: _Task, now: float) -> _Task:
+        # Idle clients are forgotten once they no longer have service in advance
+        for idle in [n for n, c in cls.clients.items() if not c.tasks and c.finish <= cls.vtime]:
+            del cls.clients[idle]
+        del cls.arrivals[task.seq]
+        self._waiting -= 1
+        count = self._per_client[task.client] - 1
+        if count:
+            self._per_client[task.client] = count
+        else:
+            del self._per_client[task.client]
+        self._positions.pop(task.job_id, None)
+        wait = now - task.enqueued
+        cls.dispatched += 1
+        cls.wait_total += wait
+        cls.wait_max = max(cls.wait_max, wait)
+        return task
+
+    def _order_locked(self) -> list:
+        """Waiting tasks in the order they would be dispatched if nothing else arrived."""
+        # Replay the dispatch choices on a copy of the class state
+        state = {}
+        for name, cls in self._classes.items():
+            clients = {}
+            for n, c in cls.clients.items():
+                copy = _Client()
+                copy.tasks = list(c.tasks)
+                copy.finish = c.finish
+                clients[n] = copy
+            state[name] = [clients, cls.vtime]
+        order = []
+        batch = state["batch"]
+        for task in self._overdue(self._classes["batch"].arrivals.values(), time.monotonic()):
+            batch[1] = _charge(batch[0], batch[1], task)
+            order.append(task)
+        for name in PRIORITIES:
+            clients, vtime = state[name]
+            while True:
+                choice = _pick(clients, vtime)
+                if choice is None:
+                    break
+                client_name, vtime, finish = choice
+                client = clients[client_name]
+                order.append(heapq.heappop(client.tasks)[2])
+                client.finish = finish
+        return order
+
+    def _positions_changed_locked(self) -> list:
+        # Replays the whole queue (bounded by max_queue), so only when someone listens
+        if not self._on_position:
+            return []
+        changed = []
+        for i, task in enumerate(self._order_locked()):
+            if self._positions.get(task.job_id) != i + 1:
+                self._positions[task.job_id] = i + 1
+                changed.append((task.job_id, i + 1))
+        return changed
+
+    def position(self, job_id: str) -> Optional[int]:
+        with self._cond:
+            if self._on_position:
+                return self._positions.get(job_id)
+            for i, task in enumerate(self._order_locked()):
+                if task.job_id == job_id:
+                    return i + 1
+        return None
+
+    def _notify_positions(self, changed: list) -> None:
+        if not self._on_position:
+            return
+        for job_id, position in changed:
+            try:
+                self._on_position(job_id, position)
+            except Exception as e:
+                print(f"[WARN] Queue position callback failed: {e}")
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._waiting:
+                    self._cond.wait()
+                task = self._pop_locked()
+                self._running += 1
+                changed = self._positions_changed_locked()
+            self._notify_positions(changed)
+            if self._on_dispatch:
+                try:
+                    self._on_dispatch(task.job_id, task.priority, time.monotonic() - task.enqueued)
+                except Exception as e:
+                    print(f"[WARN] Dispatch callback failed: {e}")
+
+            started = time.monotonic()
+            try:
+                if task.future.set_running_or_notify_cancel():
+                    task.future.set_result(task.fn(**task.kwargs))
+            except BaseException as e:
+                task.future.set_exception(e)
+            finally:
+                elapsed = time.monotonic() - started
+                with self._cond:
+                    self._running -= 1
+                    self.completed += 1
+                    self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * elapsed
+
+    def depth(self) -> tuple:
+        """(waiting, running) read without taking the scheduler lock, for metric scrapes."""
+        return self._waiting, self._running
+
+    def waiting_by_priority(self) -> dict:
+        """Waiting jobs per priority class, for metric scrapes."""
+        with self._cond:
+            return {name: len(cls.arrivals) for name, cls in self._classes.items()}
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "running": self._running,
+                "queued": self._waiting,
+                "max_queue": self.max_queue,
+                "max_per_client": self.max_per_client,
+                "clients_waiting": len(self._per_client),
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "avg_run_seconds": round(self._avg_run_seconds, 3),
+                "classes": {
+                    name: {
+                        "queued": len(cls.arrivals),
+                        "dispatched": cls.dispatched,
+                        "avg_wait_seconds": round(cls.wait_total / cls.dispatched, 3) if cls.dispatched else 0.0,
+                        "max_wait_seconds": round(cls.wait_max, 3),
+                    }
+                    for name, cls in self._classes.items()
+                },
+            }
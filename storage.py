@@ -0,0 +1,264 @@
+"""
+Storage manager for the web app's upload and output directories.
+- Tracks files in an in-memory index, one LRU-ordered map per storage class
+- Enforces a total byte quota (least recently used first) and per-class idle TTLs
+- Never deletes files held by active jobs (reference-counted holds)
+- Directories are scanned once at startup; after that, eviction only pops entries
+  from the front of the LRU maps, so its cost does not grow with the file count
+- Runs eviction on a background thread, woken early when the quota is exceeded
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+
+class _StorageClass:
+    def __init__(self, name: str, directory: str, ttl_seconds: float, on_evict: Optional[Callable[[str], None]]) -> None:
+        self.name = name
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self.entries: "OrderedDict[str, list]" = OrderedDict()  # path -> [size, last_used], oldest first
+        self.bytes = 0
+        self.expired = 0
+        self.evicted = 0
+
+
+class StorageManager:
+    """Byte quota plus per-class TTL over a set of directories."""
+
+    def __init__(self, max_bytes: int, sweep_interval: float = 60.0) -> None:
+        self.max_bytes = max(0, int(max_bytes))  # 0 = no quota
+        self.sweep_interval = sweep_interval
+        self._lock = threading.Lock()
+        self._classes: Dict[str, _StorageClass] = {}
+        self._class_of: Dict[str, _StorageClass] = {}  # path -> class
+        self._holds: Dict[str, int] = {}  # path -> active holders
+        self._bytes = 0
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_sweep_seconds = 0.0
+
+    def add_class(
+        self,
+        name: str,
+        directory: str,
+        ttl_seconds: float,
+        on_evict: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        """Manage the files directly inside `directory` (subdirectories are left alone).
+
+        `ttl_seconds` <= 0 disables age-based expiry for the class; `on_evict` is
+        called with the path of every file the manager deletes.
+        """
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._classes[name] = _StorageClass(name, os.path.abspath(directory), ttl_seconds, on_evict)
+
+    # ---------------- index updates (called on the request path) ---------------- #
+    def add(self, path: str, class_name: str) -> None:
+        """Index a new or rewritten file as most recently used."""
+        path = os.path.abspath(path)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._lock:
+            cls = self._classes[class_name]
+            self._drop_locked(path)
+            cls.entries[path] = [size, time.time()]
+            cls.bytes += size
+            self._bytes += size
+            self._class_of[path] = cls
+            over = self.max_bytes and self._bytes > self.max_bytes
+        if over:
+            self._wake.set()
+
+    def touch(self, path: str) -> None:
+        """Mark an indexed file as just used."""
+        path = os.path.abspath(path)
+        with self._lock:
+            cls = self._class_of.get(path)
+            if cls is not None:
+                cls.entries[path][1] = time.time()
+                cls.entries.move_to_end(path)
+
+    def hold(self, path: str) -> None:
+        """Protect a file (indexed or not yet written) from deletion until release()."""
+        path = os.path.abspath(path)
+        with self._lock:
+            self._holds[path] = self._holds.get(path, 0) + 1
+
+    def release(self, path: str) -> None:
+        path = os.path.abspath(path)
+        with self._lock:
+            count = self._holds.get(path, 0) - 1
+            if count > 0:
+                self._holds[path] = count
+            else:
+                self._holds.pop(path, None)
+            cls = self._class_of.get(path)
+            if cls is not None:
+                # Release counts as a use, so the idle TTL starts now
+                cls.entries[path][1] = time.time()
+                cls.entries.move_to_end(path)
+
+    def _drop_locked(self, path: str) -> None:
+        cls = self._class_of.pop(path, None)
+        if cls is not None:
+            size, _ = cls.entries.pop(path)
+            cls.bytes -= size
+            self._bytes -= size
+
+    # ---------------- eviction ---------------- #
+    def _delete_locked(self, cls: _StorageClass, path: str) -> bool:
+        # Files are removed under the lock, so hold() either wins or sees the file gone
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"[WARN] Could not delete {path}: {e}")
+            return False
+        self._drop_locked(path)
+        return True
+
+    def _expire_locked(self, cls: _StorageClass, now: float) -> list:
+        if cls.ttl_seconds <= 0:
+            return []
+        cutoff = now - cls.ttl_seconds
+        # Oldest first: stop at the first entry still within the TTL. Held files are
+        # skipped, and there are only as many of those as active jobs.
+        due = []
+        for path, (_, last_used) in cls.entries.items():
+            if last_used > cutoff:
+                break
+            if path not in self._holds:
+                due.append(path)
+        removed = []
+        for path in due:
+            if self._delete_locked(cls, path):
+                cls.expired += 1
+                removed.append((cls, path))
+        return removed
+
+    @staticmethod
+    def _oldest(cls: _StorageClass, skip: int):
+        """(path, last_used) of the oldest entry after skipping `skip` held ones, or None."""
+        for i, (path, (_, last_used)) in enumerate(cls.entries.items()):
+            if i == skip:
+                return path, last_used
+        return None
+
+    def _evict_over_quota_locked(self) -> list:
+        removed = []
+        skipped: Dict[str, int] = {name: 0 for name in self._classes}
+        while self.max_bytes and self._bytes > self.max_bytes:
+            # Least recently used file across all classes, skipping held ones
+            best = None
+            for cls in self._classes.values():
+                oldest = self._oldest(cls, skipped[cls.name])
+                if oldest is not None and (best is None or oldest[1] < best[2]):
+                    best = (cls, oldest[0], oldest[1])
+            if best is None:
+                break  # everything left is held
+            cls, path, _ = best
+            if path in self._holds or not self._delete_locked(cls, path):
+                skipped[cls.name] += 1
+                continue
+            cls.evicted += 1
+            removed.append((cls, path))
+        return removed
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Expire idle files and enforce the quota; return the number of files deleted."""
+        now = time.time() if now is None else now
+        started = time.perf_counter()
+        with self._lock:
+            removed = []
+            for cls in self._classes.values():
+                removed.extend(self._expire_locked(cls, now))
+            removed.extend(self._evict_over_quota_locked())
+        for cls, path in removed:
+            if cls.on_evict is not None:
+                try:
+                    cls.on_evict(path)
+                except Exception as e:
+                    print(f"[WARN] Eviction callback failed for {path}: {e}")
+        self.last_sweep_seconds = time.perf_counter() - started
+        if removed:
+            print(f"[INFO] Storage: removed {len(removed)} file(s) in {self.last_sweep_seconds * 1000:.0f} ms", flush=True)
+        return len(removed)
+
+    # ---------------- startup scan and background thread ---------------- #
+    def scan(self) -> None:
+        """Index existing files once (oldest first, by mtime); files added meanwhile keep their place."""
+        for cls in list(self._classes.values()):
+            found = []
+            try:
+                with os.scandir(cls.directory) as it:
+                    for entry in it:
+                        if entry.is_file(follow_symlinks=False):
+                            st = entry.stat()
+                            found.append((st.st_mtime, os.path.abspath(entry.path), st.st_size))
+            except OSError as e:
+                print(f"[WARN] Could not scan {cls.directory}: {e}")
+                continue
+            found.sort()
+            with self._lock:
+                merged: "OrderedDict[str, list]" = OrderedDict()
+                for mtime, path, size in found:
+                    if path not in self._class_of:
+                        merged[path] = [size, mtime]
+                        self._class_of[path] = cls
+                        cls.bytes += size
+                        self._bytes += size
+                merged.update(cls.entries)
+                cls.entries = merged
+            print(f"[INFO] Storage: indexed {len(found)} file(s) in {cls.directory}", flush=True)
+
+    def _run(self) -> None:
+        try:
+            self.scan()
+        except Exception as e:
+            print(f"[WARN] Storage scan failed: {e}")
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"[WARN] Storage sweep failed: {e}")
+            self._wake.wait(self.sweep_interval)
+            self._wake.clear()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="storage-manager", daemon=True)
+        self._thread.start()
+
+    def usage(self) -> dict:
+        """{class: (files, bytes)}, cheap enough for metric scrapes."""
+        with self._lock:
+            return {name: (len(cls.entries), cls.bytes) for name, cls in self._classes.items()}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "held_files": len(self._holds),
+                "last_sweep_ms": round(self.last_sweep_seconds * 1000, 2),
+                "classes": {
+                    name: {
+                        "files": len(cls.entries),
+                        "bytes": cls.bytes,
+                        "ttl_seconds": cls.ttl_seconds,
+                        "expired": cls.expired,
+                        "evicted": cls.evicted,
+                    }
+                    for name, cls in self._classes.items()
+                },
+            }
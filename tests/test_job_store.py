@@ -0,0 +1,93 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from job_store import JobStore, MemoryJobStore, SqliteJobStore
+
+
+def _job(status: str = "queued", created: float = None) -> dict:
+    return {
+        "status": status,
+        "steps": [{"label": "Synthesizing", "sub": "", "status": "pending"}],
+        "error": None,
+        "audio_url": None,
+        "created": time.time() if created is None else created,
+        "version": 0,
+    }
+
+
+def test_job_store_is_abstract():
+    with pytest.raises(TypeError):
+        JobStore()
+
+
+def test_memory_store_updates_and_wakes_waiters():
+    store = MemoryJobStore(3600, 100)
+    store.add("a", _job())
+    since = store.get("a")["version"]
+    threading.Timer(0.05, store.set_step, ("a", 0, "active")).start()
+    version, job = store.wait_for_change("a", since, 5)
+    assert version != since
+    assert job["steps"][0]["status"] == "active"
+    assert store.wait_for_change("missing", 0, 0.01) is None
+
+
+def test_memory_store_reaps_expired_and_overflow():
+    store = MemoryJobStore(ttl_seconds=60, max_jobs=2)
+    now = time.time()
+    store.add("old", _job(created=now - 120))
+    for job_id in ("done1", "done2", "live"):
+        store.add(job_id, _job("done" if job_id.startswith("done") else "running", created=now))
+    store.reap(now)
+    assert store.get("old") is None
+    # Over max_jobs: the oldest finished job goes, running jobs stay
+    assert store.get("done1") is None
+    assert store.get("live") is not None
+    stats = store.stats()
+    assert stats["reaped_expired"] == 1 and stats["reaped_overflow"] == 1
+
+
+def test_sqlite_reaps_only_jobs_with_a_stale_heartbeat(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    alive = SqliteJobStore(path, 3600, 100, stale_seconds=300)
+    dead = SqliteJobStore(path, 3600, 100, stale_seconds=300)
+    alive.add("mine", _job())
+    dead.add("orphan", _job())
+    # Long after both were added, only the live process's reaper keeps running
+    alive.reap(time.time() + 1000)
+    assert alive.get("mine")["status"] == "queued"
+    orphan = alive.get("orphan")
+    assert orphan["status"] == "error"
+    assert "interrupted" in orphan["error"]
+    assert alive.stats()["reaped_stale"] == 1
+
+
+def test_sqlite_wait_sees_changes_from_another_process(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    writer = SqliteJobStore(path, 3600, 100)
+    reader = SqliteJobStore(path, 3600, 100, poll_interval=0.02)
+    writer.add("a", _job())
+    since = reader.get("a")["version"]
+    threading.Timer(0.05, writer.set_status, ("a", "done")).start()
+    version, job = reader.wait_for_change("a", since, 5)
+    assert version != since and job["status"] == "done"
+    # Timed-out waits leave nothing behind either
+    assert reader.wait_for_change("a", version, 0.05) == (version, None)
+    assert reader.stats()["watchers"] == 0
+
+
+def test_sqlite_migrates_databases_without_owner_columns(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, steps TEXT NOT NULL, error TEXT, "
+        "audio_url TEXT, created REAL NOT NULL, updated REAL NOT NULL, version INTEGER NOT NULL DEFAULT 0)"
+    )
+    conn.commit()
+    conn.close()
+    store = SqliteJobStore(path, 3600, 100)
+    store.add("a", _job())
+    assert store.set_step("a", 0, "done") is not None
+    assert store.get("a")["steps"][0]["status"] == "done"
@@ -0,0 +1,157 @@
+import threading
+import time
+
+import pytest
+
+from scheduler import JobScheduler, QueueFull
+
+
+def _blocked(scheduler: JobScheduler) -> threading.Event:
+    """Occupy the scheduler's only worker until the returned event is set."""
+    gate = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        gate.wait(5)
+
+    scheduler.submit("gate", block, client="gate")
+    assert started.wait(5)
+    return gate
+
+
+def _run_order(scheduler: JobScheduler, submissions: list) -> list:
+    """Queue (job_id, options) pairs behind a blocked worker; return the order they ran in."""
+    ran = []
+    gate = _blocked(scheduler)
+    futures = [scheduler.submit(job_id, lambda job_id: ran.append(job_id), job_id=job_id, **options) for job_id, options in submissions]
+    gate.set()
+    for future in futures:
+        future.result(5)
+    return ran
+
+
+def test_submit_returns_result_and_forwards_job_id_kwarg():
+    scheduler = JobScheduler(1, 4)
+    future = scheduler.submit("task", lambda job_id, x: (job_id, x * 2), job_id="job", x=21)
+    assert future.result(5) == ("job", 42)
+    assert scheduler.stats()["completed"] == 1
+
+
+def test_submit_propagates_exceptions():
+    scheduler = JobScheduler(1, 4)
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        scheduler.submit("task", fail).result(5)
+
+
+def test_unknown_priority_is_rejected():
+    with pytest.raises(ValueError):
+        JobScheduler(1, 4).submit("task", lambda: None, priority="urgent")
+
+
+def test_queue_full_when_waiting_jobs_reach_max_queue():
+    scheduler = JobScheduler(1, 2)
+    gate = _blocked(scheduler)
+    scheduler.submit("a", lambda: None)
+    scheduler.submit("b", lambda: None)
+    assert scheduler.is_full()
+    with pytest.raises(QueueFull) as excinfo:
+        scheduler.submit("c", lambda: None)
+    assert excinfo.value.retry_after >= 1
+    assert scheduler.stats()["rejected"] == 1
+    gate.set()
+
+
+def test_per_client_cap():
+    scheduler = JobScheduler(1, 10, max_per_client=2)
+    gate = _blocked(scheduler)
+    scheduler.submit("a1", lambda: None, client="a")
+    scheduler.submit("a2", lambda: None, client="a")
+    with pytest.raises(QueueFull):
+        scheduler.submit("a3", lambda: None, client="a")
+    scheduler.submit("b1", lambda: None, client="b")
+    gate.set()
+
+
+def test_position_callbacks_follow_the_queue():
+    positions = {}
+    scheduler = JobScheduler(1, 10, on_position=lambda job_id, pos: positions.__setitem__(job_id, pos))
+    gate = _blocked(scheduler)
+    hold = threading.Event()
+    first = scheduler.submit("a", lambda: hold.wait(5), client="x")
+    second = scheduler.submit("b", lambda: None, client="x")
+    assert (positions["a"], positions["b"]) == (1, 2)
+    assert scheduler.position("b") == 2
+    gate.set()
+    # Once "a" is dispatched, "b" moves up
+    deadline = time.monotonic() + 5
+    while positions["b"] != 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert positions["b"] == 1
+    assert scheduler.position("a") is None
+    hold.set()
+    first.result(5)
+    second.result(5)
+
+
+def test_cancelled_job_is_skipped():
+    ran = []
+    scheduler = JobScheduler(1, 10)
+    gate = _blocked(scheduler)
+    cancelled = scheduler.submit("a", lambda: ran.append("a"))
+    kept = scheduler.submit("b", lambda: ran.append("b"))
+    assert cancelled.cancel()
+    gate.set()
+    kept.result(5)
+    assert ran == ["b"]
+
+
+def test_interactive_runs_before_batch():
+    scheduler = JobScheduler(1, 10)
+    ran = _run_order(scheduler, [
+        ("batch", {"priority": "batch"}),
+        ("interactive", {"priority": "interactive"}),
+    ])
+    assert ran == ["interactive", "batch"]
+
+
+def test_shortest_job_first_within_a_client():
+    scheduler = JobScheduler(1, 10)
+    ran = _run_order(scheduler, [
+        ("long", {"client": "a", "cost": 300}),
+        ("short", {"client": "a", "cost": 10}),
+        ("medium", {"client": "a", "cost": 100}),
+    ])
+    assert ran == ["short", "medium", "long"]
+
+
+def test_fair_share_between_clients():
+    scheduler = JobScheduler(1, 10)
+    ran = _run_order(scheduler, [
+        ("a1", {"client": "a", "cost": 10}),
+        ("a2", {"client": "a", "cost": 10}),
+        ("a3", {"client": "a", "cost": 10}),
+        ("b1", {"client": "b", "cost": 10}),
+    ])
+    # b's only job is not stuck behind all of a's
+    assert ran.index("b1") <= 1
+
+
+def test_overdue_batch_job_runs_next():
+    scheduler = JobScheduler(1, 10, batch_max_wait=0.1)
+    ran = []
+    gate = _blocked(scheduler)
+    old = scheduler.submit("old", lambda: ran.append("old"), priority="batch", client="a", cost=1000)
+    time.sleep(0.2)
+    others = [
+        scheduler.submit("short", lambda: ran.append("short"), priority="batch", client="b", cost=1),
+        scheduler.submit("interactive", lambda: ran.append("interactive"), priority="interactive", client="c", cost=1),
+    ]
+    gate.set()
+    for future in [old, *others]:
+        future.result(5)
+    assert ran[0] == "old"
@@ -0,0 +1,98 @@
+"""
+Language-aware text splitting for long-form synthesis.
+- Splits on sentence punctuation, including CJK full-width marks for zh/ja/ko
+- Breaks sentences that exceed XTTS per-language character limits at clause marks
+- Merges very short fragments so each chunk is worth a forward pass
+"""
+
+import re
+from typing import List
+
+# Per-language character limits used by the XTTS tokenizer
+CHAR_LIMITS = {
+    "en": 250, "de": 253, "fr": 273, "es": 239, "it": 213, "pt": 203, "pl": 224,
+    "zh": 82, "ar": 166, "cs": 186, "ru": 182, "nl": 251, "tr": 226, "ja": 71,
+    "hu": 224, "ko": 95, "hi": 150,
+}
+DEFAULT_CHAR_LIMIT = 200
+
+_CJK_LANGS = {"zh", "ja", "ko"}
+
+# Sentences: text up to end punctuation plus any closing quotes/brackets
+_SENTENCE = re.compile(r""".+?(?:[.!?…]+["'”’)\]]*(?=\s|$)|$)""")
+_CJK_SENTENCE = re.compile(r".+?(?:[。！？；!?;…]+[」』”’）)]*|$)")
+# Clause boundaries used when a sentence is still too long
+_CLAUSE_END = re.compile(r"(?<=[,;:–—])\s+")
+_CJK_CLAUSE_END = re.compile(r"(?<=[，、：,:])\s*")
+
+# Abbreviations that should not end a sentence (lower-case, without the dot)
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e", "sig", "sra", "dott"}
+
+
+def char_limit(language: str) -> int:
+    return CHAR_LIMITS.get(language.split("-")[0].lower(), DEFAULT_CHAR_LIMIT)
+
+
+def _split_sentences(text: str, lang: str) -> List[str]:
+    if lang in _CJK_LANGS:
+        return [s for s in _CJK_SENTENCE.findall(text) if s.strip()]
+    parts = [p.strip() for p in _SENTENCE.findall(text) if p.strip()]
+    # Re-join splits that happened right after a known abbreviation
+    sentences: List[str] = []
+    for part in parts:
+        if sentences:
+            last_word = sentences[-1].rstrip().rsplit(" ", 1)[-1].rstrip(".").lower()
+            if last_word in _ABBREVIATIONS:
+                sentences[-1] = f"{sentences[-1]} {part}"
+                continue
+        sentences.append(part)
+    return sentences
+
+
+def _split_long(sentence: str, lang: str, limit: int) -> List[str]:
+    if len(sentence) <= limit:
+        return [sentence]
+    clause_re = _CJK_CLAUSE_END if lang in _CJK_LANGS else _CLAUSE_END
+    joiner = "" if lang in _CJK_LANGS else " "
+    out: List[str] = []
+    current = ""
+    for clause in clause_re.split(sentence):
+        candidate = f"{current}{joiner}{clause}" if current else clause
+        if len(candidate) <= limit:
+            current = candidate
+            continue
+        if current:
+            out.append(current)
+        # A single clause above the limit is hard-wrapped (on spaces when possible)
+        while len(clause) > limit:
+            cut = clause.rfind(" ", 0, limit) if joiner else -1
+            cut = cut if cut > 0 else limit
+            out.append(clause[:cut])
+            clause = clause[cut:].lstrip()
+        current = clause
+    if current:
+        out.append(current)
+    return out
+
+
+def split_text(text: str, language: str, min_chars: int = 20) -> List[str]:
+    """Split text into ordered synthesis chunks that respect the XTTS char limit."""
+    lang = language.split("-")[0].lower()
+    limit = char_limit(lang)
+    text = re.sub(r"\s+", " ", text).strip()
+    if not text:
+        return []
+    pieces: List[str] = []
+    for sentence in _split_sentences(text, lang):
+        pieces.extend(p.strip() for p in _split_long(sentence.strip(), lang, limit) if p.strip())
+
+    joiner = "" if lang in _CJK_LANGS else " "
+    chunks: List[str] = []
+    for piece in pieces:
+        if chunks and (len(chunks[-1]) < min_chars or len(piece) < min_chars):
+            merged = f"{chunks[-1]}{joiner}{piece}"
+            if len(merged) <= limit:
+                chunks[-1] = merged
+                continue
+        chunks.append(piece)
+    return chunks
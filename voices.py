@@ -0,0 +1,169 @@
+"""
+Registry of named voices for the web API.
+- A reference is decoded, preprocessed and stored once as 16-bit PCM WAV (<voice_id>.wav),
+  so requests that name a voice decode no uploaded container format
+- Conditioning latents are computed at registration and persisted next to the voices
+  (clone_voice.prepare_voice), so synthesis for a registered voice skips conditioning
+- Metadata lives in <voice_id>.json and is loaded into memory at startup
+- Voices are held while requests use them; deleting a voice in use removes its files
+  once the last request finishes
+"""
+
+import glob
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+from audio_io import load_reference, write_wav
+
+_VOICE_ID = re.compile(r"^[0-9a-f]{32}$")
+MAX_NAME_CHARS = 100
+
+
+class VoiceRegistry:
+    """Directory of preprocessed reference clips addressed by voice id."""
+
+    def __init__(self, directory: str, sample_rate: int = 22050, max_seconds: Optional[float] = None) -> None:
+        self.directory = os.path.abspath(directory)
+        self.latents_dir = os.path.join(self.directory, "latents")
+        self.sample_rate = sample_rate
+        # Passed to audio_io.load_reference (None = no trimming)
+        self.max_seconds = max_seconds
+        self._lock = threading.Lock()
+        self._voices: Dict[str, dict] = {}
+        self._holds: Dict[str, int] = {}  # voice_id -> active requests
+        self._deleted: Dict[str, str] = {}  # voice_id -> audio_hash, unregistered but still held
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        for entry in os.scandir(self.directory):
+            stem, ext = os.path.splitext(entry.name)
+            if not _VOICE_ID.match(stem) or not entry.is_file():
+                continue
+            if ext == ".json":
+                try:
+                    with open(entry.path, "r", encoding="utf-8") as f:
+                        self._voices[stem] = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"[WARN] Skipping unreadable voice metadata {entry.path}: {e}")
+            elif ext == ".wav" and not os.path.isfile(os.path.join(self.directory, f"{stem}.json")):
+                # Registration interrupted before its metadata was written
+                self._remove_files(stem, None)
+
+    def _path(self, voice_id: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{voice_id}{ext}")
+
+    def create(self, source: str, name: str, prepare: Callable[[str], str], source_sha256: str = "") -> dict:
+        """Register the clip at `source`; return the new voice's metadata.
+
+        `prepare(path)` computes the conditioning for the stored clip and returns
+        its audio hash. Decode errors from audio_io propagate unchanged.
+        """
+        voice_id = uuid.uuid4().hex
+        path = self._path(voice_id, ".wav")
+        started = time.perf_counter()
+        audio = load_reference(source, rates=(self.sample_rate,), max_seconds=self.max_seconds)[self.sample_rate]
+        try:
+            # Stored as decoded: any trim and gain were applied once by load_reference
+            write_wav(path, audio, self.sample_rate, normalize=False)
+            audio_hash = prepare(path)
+            meta = {
+                "voice_id": voice_id,
+                "name": name.strip()[:MAX_NAME_CHARS],
+                "created": time.time(),
+                "seconds": round(audio.size / self.sample_rate, 2),
+                "sample_rate": self.sample_rate,
+                "source_sha256": source_sha256,
+                # Conditioning skips reference preprocessing for registered voices
+                "preprocessed": self.max_seconds is not None,
+                "audio_hash": audio_hash,
+            }
+            tmp = f"{self._path(voice_id, '.json')}.part"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp, self._path(voice_id, ".json"))
+        except BaseException:
+            self._remove_files(voice_id, None)
+            raise
+        with self._lock:
+            self._voices[voice_id] = meta
+        print(f"[INFO] Registered voice {voice_id} ({meta['seconds']} s) in {time.perf_counter() - started:.1f} s", flush=True)
+        return dict(meta)
+
+    def get(self, voice_id: str) -> Optional[dict]:
+        with self._lock:
+            meta = self._voices.get(voice_id)
+            return dict(meta) if meta else None
+
+    def list(self) -> list:
+        with self._lock:
+            return sorted((dict(m) for m in self._voices.values()), key=lambda m: m["created"])
+
+    # ---------------- use by requests ---------------- #
+    def hold(self, voice_id: str):
+        """Return (audio_hash, reference_path) for a voice and hold it until release(), or None."""
+        with self._lock:
+            meta = self._voices.get(voice_id)
+            if meta is None:
+                return None
+            self._holds[voice_id] = self._holds.get(voice_id, 0) + 1
+            return meta["audio_hash"], self._path(voice_id, ".wav")
+
+    def owns(self, path: str) -> bool:
+        """True if `path` is a registered voice's reference clip."""
+        return os.path.dirname(os.path.abspath(path)) == self.directory
+
+    def release(self, path: str) -> None:
+        voice_id = os.path.splitext(os.path.basename(path))[0]
+        with self._lock:
+            count = self._holds.get(voice_id, 0) - 1
+            if count > 0:
+                self._holds[voice_id] = count
+                return
+            self._holds.pop(voice_id, None)
+            if voice_id not in self._deleted:
+                return
+            audio_hash = self._orphaned_hash_locked(self._deleted.pop(voice_id))
+        self._remove_files(voice_id, audio_hash)
+
+    # ---------------- deletion ---------------- #
+    def _orphaned_hash_locked(self, audio_hash: str) -> Optional[str]:
+        """`audio_hash` if no remaining voice shares its latents, else None."""
+        if any(m["audio_hash"] == audio_hash for m in self._voices.values()):
+            return None
+        return audio_hash
+
+    def delete(self, voice_id: str) -> bool:
+        """Unregister a voice; its files go now, or when the last request using it ends."""
+        with self._lock:
+            meta = self._voices.pop(voice_id, None)
+            if meta is None:
+                return False
+            if self._holds.get(voice_id):
+                self._deleted[voice_id] = meta["audio_hash"]
+                return True
+            audio_hash = self._orphaned_hash_locked(meta["audio_hash"])
+        self._remove_files(voice_id, audio_hash)
+        return True
+
+    def _remove_files(self, voice_id: str, audio_hash: Optional[str]) -> None:
+        paths = [self._path(voice_id, ".wav"), self._path(voice_id, ".json")]
+        if audio_hash:
+            # Latent files are named <audio_hash>-<conditioning settings>.pt
+            paths.extend(glob.glob(os.path.join(self.latents_dir, f"{audio_hash}-*.pt")))
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"[WARN] Could not delete {path}: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"voices": len(self._voices), "in_use": len(self._holds), "pending_delete": len(self._deleted)}
@@ -0,0 +1,358 @@
+"""
+Multi-process model worker pool.
+- Starts N worker processes, each loading its own XTTS model with a pinned torch thread count
+- Routes synthesis calls to the least-loaded worker over multiprocessing connections
+- Run as a script, this module is the worker process itself
+"""
+
+import argparse
+import itertools
+import os
+import queue
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+from typing import Optional
+
+# Exceptions re-raised with their own type in the caller; anything else becomes RuntimeError
+_PASSTHROUGH_ERRORS = ("FileNotFoundError", "ValueError", "AudioDecodeError")
+_STREAM_END = object()
+# Longest a new worker process may take to connect back to the parent
+START_TIMEOUT_SECONDS = 120.0
+
+
+def _rebuild_error(name: str, message: str) -> Exception:
+    if name == "FileNotFoundError":
+        return FileNotFoundError(message)
+    if name == "AudioDecodeError":
+        from audio_io import AudioDecodeError
+        return AudioDecodeError(message)
+    if name == "ValueError":
+        return ValueError(message)
+    return RuntimeError(message)
+
+
+class _Worker:
+    """Parent-side handle of one worker process."""
+
+    def __init__(self, index: int, proc: subprocess.Popen, conn) -> None:
+        self.index = index
+        self.proc = proc
+        self.conn = conn
+        self.send_lock = threading.Lock()
+        self.pending: dict = {}
+        self.inflight = 0
+        self.served = 0
+        self.loaded = False
+        self.alive = True
+        self.reader = threading.Thread(target=self._read_loop, name=f"worker-{index}-reader", daemon=True)
+        self.reader.start()
+
+    def _read_loop(self) -> None:
+        try:
+            while True:
+                msg = self.conn.recv()
+                target = self.pending.get(msg["id"])
+                if target is None:
+                    continue
+                if isinstance(target, queue.Queue):
+                    if "chunk" in msg or "sample_rate" in msg:
+                        target.put(msg)
+                        continue
+                    self.pending.pop(msg["id"], None)
+                    target.put(msg if not msg.get("ok") else _STREAM_END)
+                    continue
+                self.pending.pop(msg["id"], None)
+                if msg.get("ok"):
+                    target.set_result(msg.get("result"))
+                else:
+                    target.set_exception(_rebuild_error(msg.get("type", ""), msg.get("error", "Worker error")))
+        except (EOFError, OSError):
+            pass
+        self.alive = False
+        err = RuntimeError(f"Model worker {self.index} exited unexpectedly.")
+        for target in list(self.pending.values()):
+            if isinstance(target, queue.Queue):
+                target.put({"ok": False, "type": "", "error": str(err)})
+            elif not target.done():
+                target.set_exception(err)
+        self.pending.clear()
+
+    def send(self, msg: dict, target) -> None:
+        self.pending[msg["id"]] = target
+        try:
+            with self.send_lock:
+                self.conn.send(msg)
+        except (OSError, EOFError) as e:
+            self.pending.pop(msg["id"], None)
+            raise RuntimeError(f"Model worker {self.index} is not reachable: {e}")
+
+
+class ProcessWorkerPool:
+    """Dispatches synthesis to worker processes, least-loaded first."""
+
+    def __init__(
+        self,
+        num_workers: int,
+        threads_per_worker: int,
+        device: Optional[str] = None,
+        precision: Optional[str] = None,
+    ) -> None:
+        self.num_workers = max(1, int(num_workers))
+        self.threads_per_worker = max(1, int(threads_per_worker))
+        self.device = device
+        self.precision = precision
+        self._authkey = secrets.token_bytes(32)
+        self._workers: list[Optional[_Worker]] = [None] * self.num_workers
+        self._restarting: set = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        try:
+            for i in range(self.num_workers):
+                self._workers[i] = self._spawn(i)
+        except BaseException:
+            self.close()
+            raise
+
+    def _spawn(self, index: int) -> _Worker:
+        """Start worker `index` and wait for it to connect; raise RuntimeError if it never does."""
+        env = dict(os.environ)
+        threads = str(self.threads_per_worker)
+        env.update({
+            "OMP_NUM_THREADS": threads,
+            "MKL_NUM_THREADS": threads,
+            "VC_WORKER_PROCESSES": "0",
+            "VC_WORKER_AUTHKEY": self._authkey.hex(),
+        })
+        # One listener per start, so a failed handshake cannot leave a stray connection behind
+        listener = Listener(authkey=self._authkey)
+        cmd = [sys.executable, os.path.abspath(__file__), "--address", repr(listener.address), "--threads", threads]
+        if self.device:
+            cmd += ["--device", self.device]
+        if self.precision:
+            cmd += ["--precision", self.precision]
+        proc = subprocess.Popen(cmd, env=env)
+        accepted = threading.Event()
+        failure: list = []
+
+        def watch() -> None:
+            deadline = time.monotonic() + START_TIMEOUT_SECONDS
+            while not accepted.wait(0.2):
+                if proc.poll() is not None:
+                    failure.append(f"exited with code {proc.returncode} during startup")
+                elif time.monotonic() > deadline:
+                    failure.append(f"did not connect within {START_TIMEOUT_SECONDS:.0f} s")
+                else:
+                    continue
+                # accept() has no timeout; connecting ourselves wakes it up
+                try:
+                    Client(listener.address, authkey=self._authkey).close()
+                except (OSError, EOFError):
+                    pass
+                return
+
+        watcher = threading.Thread(target=watch, name=f"worker-{index}-start", daemon=True)
+        watcher.start()
+        try:
+            conn = listener.accept()
+        except Exception as e:
+            conn = None
+            failure.append(f"failed the handshake: {e}")
+        finally:
+            accepted.set()
+            listener.close()
+        if failure:
+            if conn is not None:
+                conn.close()
+            proc.kill()
+            proc.wait()
+            raise RuntimeError(f"Model worker {index} {failure[0]}.")
+        print(f"[INFO] Started model worker {index} (pid {proc.pid}, {threads} threads)", flush=True)
+        return _Worker(index, proc, conn)
+
+    def _respawn_dead(self) -> None:
+        # Restarts run outside the pool lock, so other calls keep using the live workers
+        with self._lock:
+            dead = [i for i, w in enumerate(self._workers) if (w is None or not w.alive) and i not in self._restarting]
+            self._restarting.update(dead)
+        for i in dead:
+            print(f"[WARN] Restarting model worker {i}", flush=True)
+            try:
+                worker = self._spawn(i)
+            except Exception as e:
+                print(f"[ERROR] {e}", flush=True)
+                worker = None
+            with self._lock:
+                if worker is not None:
+                    self._workers[i] = worker
+                self._restarting.discard(i)
+
+    def _pick(self) -> _Worker:
+        self._respawn_dead()
+        with self._lock:
+            live = [w for w in self._workers if w is not None and w.alive]
+            if not live:
+                raise RuntimeError("No model worker is running.")
+            worker = min(live, key=lambda w: w.inflight)
+            worker.inflight += 1
+            return worker
+
+    def _release(self, worker: _Worker) -> None:
+        with self._lock:
+            worker.inflight -= 1
+            worker.served += 1
+
+    def call(self, op: str, **kwargs):
+        """Run one operation on the least-loaded worker and return its result."""
+        worker = self._pick()
+        try:
+            future: Future = Future()
+            worker.send({"id": next(self._ids), "op": op, "kwargs": kwargs}, future)
+            result = future.result()
+            if op in ("synthesize", "warm", "prepare"):
+                worker.loaded = True
+            return result
+        finally:
+            self._release(worker)
+
+    def stream(self, **kwargs):
+        """Start streaming synthesis on a worker; return (sample_rate, chunk iterator)."""
+        worker = self._pick()
+        replies: queue.Queue = queue.Queue()
+        try:
+            worker.send({"id": next(self._ids), "op": "stream", "kwargs": kwargs}, replies)
+            first = replies.get()
+        except BaseException:
+            self._release(worker)
+            raise
+        if first is _STREAM_END or "sample_rate" not in first:
+            self._release(worker)
+            if first is _STREAM_END:
+                raise RuntimeError("Worker produced no audio.")
+            raise _rebuild_error(first.get("type", ""), first.get("error", "Worker error"))
+        worker.loaded = True
+
+        def chunks():
+            try:
+                while True:
+                    msg = replies.get()
+                    if msg is _STREAM_END:
+                        return
+                    if "chunk" not in msg:
+                        raise _rebuild_error(msg.get("type", ""), msg.get("error", "Worker error"))
+                    yield msg["chunk"]
+            finally:
+                self._release(worker)
+
+        return first["sample_rate"], chunks()
+
+    def warm(self) -> None:
+        """Load the model in every worker, restarting dead ones first."""
+        self._respawn_dead()
+        with self._lock:
+            workers = [w for w in self._workers if w is not None and w.alive]
+        if len(workers) < self.num_workers:
+            raise RuntimeError(f"Only {len(workers)} of {self.num_workers} model workers are running.")
+        for w in workers:
+            future: Future = Future()
+            w.send({"id": next(self._ids), "op": "warm", "kwargs": {}}, future)
+            future.result()
+            w.loaded = True
+
+    def close(self) -> None:
+        """Stop every worker process."""
+        with self._lock:
+            workers = [w for w in self._workers if w is not None]
+        for w in workers:
+            try:
+                w.conn.close()
+            except OSError:
+                pass
+            w.proc.kill()
+            w.proc.wait()
+
+    def all_loaded(self) -> bool:
+        with self._lock:
+            return all(w is not None and w.alive and w.loaded for w in self._workers)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": [
+                    {
+                        "index": w.index,
+                        "pid": w.proc.pid,
+                        "alive": w.alive,
+                        "loaded": w.loaded,
+                        "inflight": w.inflight,
+                        "served": w.served,
+                    }
+                    for w in self._workers
+                    if w is not None
+                ],
+                "threads_per_worker": self.threads_per_worker,
+            }
+
+
+# ---------------- worker process ---------------- #
+def _serve(conn, device: Optional[str], precision: Optional[str]) -> None:
+    import clone_voice as cv
+
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            return
+        req_id, op, kwargs = msg["id"], msg["op"], msg.get("kwargs") or {}
+        try:
+            kwargs.setdefault("device", device)
+            kwargs.setdefault("precision", precision)
+            if op == "warm":
+                cv.warm_model(kwargs["device"], kwargs["precision"])
+                conn.send({"id": req_id, "ok": True, "result": None})
+            elif op == "synthesize":
+                timings: dict = {}
+                wav, sample_rate = cv.synthesize(timings=timings, **kwargs)
+                conn.send({"id": req_id, "ok": True, "result": (wav, sample_rate, timings)})
+            elif op == "prepare":
+                conn.send({"id": req_id, "ok": True, "result": cv.prepare_voice(**kwargs)})
+            elif op == "stream":
+                sample_rate, chunks = cv.stream_voice(**kwargs)
+                conn.send({"id": req_id, "sample_rate": sample_rate})
+                for chunk in chunks:
+                    conn.send({"id": req_id, "chunk": chunk})
+                conn.send({"id": req_id, "ok": True, "result": None})
+            else:
+                raise ValueError(f"Unknown worker operation: {op}")
+        except Exception as e:
+            name = type(e).__name__
+            conn.send({"id": req_id, "ok": False, "type": name if name in _PASSTHROUGH_ERRORS else "", "error": str(e)})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="XTTS model worker process (started by ProcessWorkerPool).")
+    parser.add_argument("--address", required=True, help="Listener address of the parent process.")
+    parser.add_argument("--threads", type=int, default=1, help="torch intra-op threads for this worker.")
+    parser.add_argument("--device", default=None, help="Execution device.")
+    parser.add_argument("--precision", default=None, help="Inference precision (fp32 or int8-dynamic).")
+    args = parser.parse_args()
+
+    import ast
+    address = ast.literal_eval(args.address)
+    authkey = bytes.fromhex(os.environ.pop("VC_WORKER_AUTHKEY"))
+    try:
+        import torch
+        torch.set_num_threads(args.threads)
+        torch.set_num_interop_threads(1)
+    except Exception:
+        pass
+    conn = Client(address, authkey=authkey)
+    _serve(conn, args.device, args.precision)
+
+
+if __name__ == "__main__":
+    main()